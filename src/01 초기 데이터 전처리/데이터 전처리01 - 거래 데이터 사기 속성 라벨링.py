@@ -1,37 +1,141 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 import json
 
-def prepare_transaction_data(transactions_file, fraud_labels_file, mcc_codes_file, output_file):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import save_frame, load_frame, FrameWriter
+from common.parsing import parse_money
+from common.schema import TRANSACTIONS_SCHEMA, FRAUD_LABELS_SCHEMA, read_dtypes, compact_frame, print_memory_report
+from common.tracing import span
+
+# 원본 거래 데이터 read_csv dtype (범주형 문자열은 category, amount는 '$' 제거 전이므로 문자열)
+TRANSACTIONS_READ_DTYPES = {**read_dtypes(TRANSACTIONS_SCHEMA), 'amount': str}
+
+# 스트리밍 모드에서 청크마다 타입이 달라지지 않도록 문자열로 고정할 컬럼
+STREAM_STR_DTYPES = {**read_dtypes(TRANSACTIONS_SCHEMA, categorical=False), 'amount': str}
+# 스트리밍 모드에서 청크별로 줄일 컬럼 (fraud는 청크마다 결측 여부가 달라지므로 float32로 고정)
+STREAM_SCHEMA = {col: dtype for col, dtype in TRANSACTIONS_SCHEMA.items() if col != 'fraud'}
+
+def dedupe_fraud_labels(df_fraud_labels):
     """
-    거래 데이터에 상점 유형(mcc_type)과 이상 거래 라벨(fraud) 컬럼을 추가해 새로운 CSV 파일로 저장
-    fraud 라벨링 시, sorted_fraud.csv에 없는 거래는 NaN으로 처리
+    사기 라벨 데이터의 중복 id는 파일에서 처음 나온 라벨만 사용 (일괄/스트리밍 모드 공통 규칙)
+
+    Args:
+        df_fraud_labels (pd.DataFrame): 사기 거래 라벨 데이터 (id 컬럼)
+
+    Returns:
+        pd.DataFrame: id가 중복되지 않는 라벨 데이터
+    """
+    duplicated = df_fraud_labels['id'].duplicated(keep='first')
+    if duplicated.any():
+        print(f"경고: 사기 라벨 데이터에 중복 id가 {int(duplicated.sum())}건 있어 첫 번째 라벨만 사용합니다.")
+        df_fraud_labels = df_fraud_labels[~duplicated].copy()
+    return df_fraud_labels
+
+def load_fraud_label_map(fraud_labels_file):
+    """
+    sorted_fraud.csv를 거래 id → fraud(0/1) 매핑으로 로드
+
+    Args:
+        fraud_labels_file (str): 사기 거래 라벨 CSV 파일 경로
+
+    Returns:
+        pd.Series: id를 index로, fraud 라벨(0.0/1.0/NaN)을 값으로 가지는 Series
+    """
+    df_fraud_labels = pd.read_csv(fraud_labels_file, usecols=['id', 'Status'], dtype=read_dtypes(FRAUD_LABELS_SCHEMA))
+    df_fraud_labels = dedupe_fraud_labels(df_fraud_labels)
+    status_to_fraud_map = {
+        'No': 0,
+        'Yes': 1
+    }
+    fraud_map = df_fraud_labels['Status'].str.strip().map(status_to_fraud_map)
+    fraud_map.index = df_fraud_labels['id']
+    return fraud_map
+
+def prepare_transaction_data_streaming(transactions_file, fraud_labels_file, mcc_codes_file, output_file,
+                                       chunksize=1_000_000, csv_export=False):
+    """
+    prepare_transaction_data의 스트리밍 버전
+    거래 데이터를 chunksize 행씩 읽어 라벨링한 뒤 바로 파일 끝에 추가 저장
+    메모리에는 fraud 라벨 매핑(id → 0/1)과 MCC 사전, 현재 청크만 유지
 
     Args:
         transactions_file (str): 원본 거래 데이터 CSV 파일 경로
         fraud_labels_file (str): 사기 거래 라벨 CSV 파일 경로
         mcc_codes_file (str): MCC 코드 매핑 JSON 파일 경로
-        output_file (str): 결과 데이터가 저장될 CSV 파일 경로
+        output_file (str): 결과 데이터가 저장될 파일 경로 (.parquet, .feather, .csv)
+        chunksize (int): 한 번에 처리할 거래 행 수
+        csv_export (bool): True면 컬럼 기반 형식과 함께 같은 이름의 CSV도 저장
     """
     try:
-        df_transactions = pd.read_csv(transactions_file, dtype={'zip': str, 'amount': str})
-        df_fraud_labels = pd.read_csv(fraud_labels_file)
+        fraud_map = load_fraud_label_map(fraud_labels_file)
 
         with open(mcc_codes_file, 'r', encoding='utf-8') as f:
             mcc_codes = json.load(f)
 
-        print("데이터 로드 완료.")
-        print(f"원본 거래 데이터 레코드 수: {len(df_transactions)}")
-        print(f"사기 라벨 데이터 레코드 수: {len(df_fraud_labels)}")
+        print("라벨 매핑 / MCC 사전 로드 완료.")
+        print(f"사기 라벨 데이터 레코드 수: {len(fraud_map)}")
 
-        # mcc_type 컬럼 추가
-        df_transactions['mcc_type'] = df_transactions['mcc'].astype(str).map(mcc_codes).fillna('Unknown')
-        print("'mcc_type' 컬럼 추가 완료.")
+        n_total, n_normal, n_fraud, n_unlabeled = 0, 0, 0, 0
+        with FrameWriter(output_file, csv_export=csv_export, encoding='utf-8-sig') as writer:
+            for chunk in pd.read_csv(transactions_file, dtype=STREAM_STR_DTYPES, chunksize=chunksize):
+                chunk['mcc_type'] = chunk['mcc'].astype(str).map(mcc_codes).fillna('Unknown')
+                chunk['fraud'] = chunk['id'].map(fraud_map).astype(np.float32)
+                chunk['amount'] = parse_money(chunk['amount'], errors='raise').astype(float).abs()   # '$', ',' 제거
+                chunk['date'] = pd.to_datetime(chunk['date'])
+                # 범주형은 다음 단계에서 변환 (청크마다 범주 목록이 달라 저장 스키마가 어긋나지 않도록)
+                chunk = compact_frame(chunk, STREAM_SCHEMA, categorical=False)
+                writer.write(chunk)
 
-        # fraud 컬럼 추가
-        status_to_fraud_map = {
-            'No': 0,
-            'Yes': 1
-        }
+                n_total += len(chunk)
+                n_normal += int((chunk['fraud'] == 0).sum())
+                n_fraud += int((chunk['fraud'] == 1).sum())
+                n_unlabeled += int(chunk['fraud'].isna().sum())
+                print(f"  > {n_total:,}건 처리")
+
+        print(f"처리된 데이터가 '{output_file}'에 성공적으로 저장되었습니다.")
+        print(f"최종 데이터 레코드 수: {n_total}")
+        print(f"정상 거래 수 (fraud=0): {n_normal}")
+        print(f"이상 거래 수 (fraud=1): {n_fraud}")
+        print(f"라벨 없는 거래 수 (fraud=NaN): {n_unlabeled}")
+
+    except FileNotFoundError as e:
+        print(f"오류: 파일이 없습니다 - {e}")
+    except json.JSONDecodeError as e:
+        print(f"오류: JSON 파일 파싱 중 문제가 발생했습니다 - {e}")
+    except KeyError as e:
+        print(f"오류: 필요한 컬럼이 데이터에 없습니다 - {e}")
+    except Exception as e:
+        print(f"처리 중 예상치 못한 오류가 발생했습니다: {e}")
+
+def label_transactions(df_transactions, df_fraud_labels, mcc_codes):
+    """
+    거래 데이터프레임에 상점 유형(mcc_type)과 이상 거래 라벨(fraud) 컬럼 추가
+    라벨 데이터의 중복 id는 첫 번째 라벨만 사용 (Join으로 거래 행이 늘어나지 않음, 스트리밍 모드와 같은 규칙)
+    amount는 양수 float, date는 datetime으로 변환
+    마지막에 common.schema.TRANSACTIONS_SCHEMA의 작은 dtype으로 변환 (라벨이 없는 거래가 있으면 fraud는 float32)
+
+    Args:
+        df_transactions (pd.DataFrame): 원본 거래 데이터
+        df_fraud_labels (pd.DataFrame): 사기 거래 라벨 데이터 (id, Status 컬럼)
+        mcc_codes (dict): MCC 코드 → 상점 유형 매핑
+
+    Returns:
+        pd.DataFrame: 라벨링된 거래 데이터
+    """
+    # mcc_type 컬럼 추가
+    df_transactions['mcc_type'] = df_transactions['mcc'].astype(str).map(mcc_codes).fillna('Unknown')
+    print("'mcc_type' 컬럼 추가 완료.")
+
+    # fraud 컬럼 추가
+    status_to_fraud_map = {
+        'No': 0,
+        'Yes': 1
+    }
+    with span("fraud 라벨 Join", rows_in=df_transactions) as sp:
+        df_fraud_labels = dedupe_fraud_labels(df_fraud_labels)
         df_fraud_labels['fraud_status_mapped'] = df_fraud_labels['Status'].str.strip().map(status_to_fraud_map)
         df_transactions = pd.merge(
             df_transactions,
@@ -41,24 +145,69 @@ def prepare_transaction_data(transactions_file, fraud_labels_file, mcc_codes_fil
         )
         df_transactions['fraud'] = df_transactions['fraud_status_mapped']
         df_transactions = df_transactions.drop(columns=['fraud_status_mapped'])
-        print("'fraud' 컬럼 추가 및 업데이트 완료 (0: 정상, 1: 이상, NaN: 라벨 없음).")
+        sp.set_rows(rows_out=df_transactions)
+    print("'fraud' 컬럼 추가 및 업데이트 완료 (0: 정상, 1: 이상, NaN: 라벨 없음).")
 
-        # amount 컬럼 "양수 실수"로 변환
+    # amount 컬럼 "양수 실수"로 변환
+    with span("amount/date 변환", rows_in=df_transactions):
         if 'amount' in df_transactions.columns:
-            df_transactions['amount'] = (
-                df_transactions['amount']
-                .replace('[\$,]', '', regex=True)   # '$', ',' 제거
-                .astype(float)
-                .abs()
-            )
+            df_transactions['amount'] = parse_money(df_transactions['amount'], errors='raise').astype(float).abs()   # '$', ',' 제거
             print("'amount' 컬럼 양수(float)로 변환 완료.")
 
-        df_transactions.to_csv(output_file, index=False, encoding='utf-8-sig')
-        print(f"처리된 데이터가 '{output_file}'에 성공적으로 저장되었습니다.")
+        # date 컬럼 datetime 변환 (다음 단계에서 다시 파싱하지 않도록 타입 보존)
+        df_transactions['date'] = pd.to_datetime(df_transactions['date'])
+
+    with span("dtype 변환", rows_in=df_transactions):
+        return compact_frame(df_transactions, TRANSACTIONS_SCHEMA)
+
+def prepare_transaction_data(transactions_file, fraud_labels_file, mcc_codes_file, output_file, csv_export=False,
+                             chunksize=None):
+    """
+    거래 데이터에 상점 유형(mcc_type)과 이상 거래 라벨(fraud) 컬럼을 추가해 새로운 파일로 저장
+    fraud 라벨링 시, sorted_fraud.csv에 없는 거래는 NaN으로 처리
+    출력 경로 확장자가 .parquet/.feather면 dtype을 보존하는 컬럼 기반 형식으로 저장
+
+    Args:
+        transactions_file (str): 원본 거래 데이터 CSV 파일 경로
+        fraud_labels_file (str): 사기 거래 라벨 CSV 파일 경로
+        mcc_codes_file (str): MCC 코드 매핑 JSON 파일 경로
+        output_file (str): 결과 데이터가 저장될 파일 경로 (.parquet, .feather, .csv)
+            None이면 저장하지 않고 결과만 반환 (스트리밍 모드에서는 필수)
+        csv_export (bool): True면 컬럼 기반 형식과 함께 같은 이름의 CSV도 저장
+        chunksize (int, optional): 지정 시 해당 행 수 단위의 스트리밍 모드로 처리
+
+    Returns:
+        pd.DataFrame: 라벨링된 거래 데이터 (스트리밍 모드 또는 오류 시 None)
+    """
+    if chunksize is not None:
+        prepare_transaction_data_streaming(transactions_file, fraud_labels_file, mcc_codes_file, output_file,
+                                           chunksize=chunksize, csv_export=csv_export)
+        return
+
+    try:
+        with span("CSV 로드") as sp:
+            df_transactions = pd.read_csv(transactions_file, dtype=TRANSACTIONS_READ_DTYPES)
+            df_fraud_labels = pd.read_csv(fraud_labels_file, dtype=read_dtypes(FRAUD_LABELS_SCHEMA))
+            sp.set_rows(rows_out=df_transactions)
+
+        with open(mcc_codes_file, 'r', encoding='utf-8') as f:
+            mcc_codes = json.load(f)
+
+        print("데이터 로드 완료.")
+        print(f"원본 거래 데이터 레코드 수: {len(df_transactions)}")
+        print(f"사기 라벨 데이터 레코드 수: {len(df_fraud_labels)}")
+
+        df_transactions = label_transactions(df_transactions, df_fraud_labels, mcc_codes)
+        print_memory_report(df_transactions, "거래 데이터 메모리")
+
+        if output_file is not None:
+            save_frame(df_transactions, output_file, csv_export=csv_export, encoding='utf-8-sig')
+            print(f"처리된 데이터가 '{output_file}'에 성공적으로 저장되었습니다.")
         print(f"최종 데이터 레코드 수: {len(df_transactions)}")
         print(f"정상 거래 수 (fraud=0): {df_transactions['fraud'].value_counts(dropna=False).get(0.0, 0)}")
         print(f"이상 거래 수 (fraud=1): {df_transactions['fraud'].value_counts(dropna=False).get(1.0, 0)}")
         print(f"라벨 없는 거래 수 (fraud=NaN): {df_transactions['fraud'].isna().sum()}")
+        return df_transactions
 
     except FileNotFoundError as e:
         print(f"오류: 파일이 없습니다 - {e}")
@@ -73,12 +222,14 @@ if __name__ == "__main__":
     transactions_data_path = '../raw/transactions_data.csv'
     sorted_fraud_path = '../raw/sorted_fraud.csv'
     mcc_codes_path = '../raw/mcc_codes.json'
-    output_data_path = '../raw/transactions_fraud_label.csv'
+    output_data_path = '../raw/transactions_fraud_label.parquet'
+    chunk_size = None   # 메모리보다 큰 원본은 1_000_000 등으로 지정해 스트리밍 모드로 처리
 
-    prepare_transaction_data(transactions_data_path, sorted_fraud_path, mcc_codes_path, output_data_path)
+    prepare_transaction_data(transactions_data_path, sorted_fraud_path, mcc_codes_path, output_data_path,
+                             chunksize=chunk_size)
 
     try:
-        df_final = pd.read_csv(output_data_path)
+        df_final = load_frame(output_data_path)
         print("\n--- 최종 생성된 파일의 상위 5개 행 ---")
         print(df_final.head())
         print("\n--- fraud 컬럼 값 분포 ---")
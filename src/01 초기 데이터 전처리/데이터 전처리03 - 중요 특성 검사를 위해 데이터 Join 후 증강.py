@@ -1,44 +1,255 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 
-def join_csv_and_balance():
-    try:
-        client_df = pd.read_csv("../raw/users_data.csv")
-        card_df = pd.read_csv("../raw/cards_data.csv")
-        trans_df = pd.read_csv("../raw/transactions_fraud_label_preprocess.csv", dtype={'zip': str})
-    except Exception as e:
-        print(f"파일 로딩 오류: {e}")
-        return None
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import save_frame, load_frame, iter_frames
+from common.lookup import LookupTable
+from common.parsing import load_users, load_cards
+from common.velocity import VELOCITY_KEY_COLS, VELOCITY_DISTINCT_COLS, VelocityState, compute_velocity_features
+from common.tracing import span
 
-    print("데이터 로드 완료.\n")
+# 카드별 속도 특성 계산에 필요한 거래 컬럼
+VELOCITY_INPUT_COLS = [*VELOCITY_KEY_COLS, "date", "amount", *VELOCITY_DISTINCT_COLS.values()]
+
+def load_selected_rows(file_path, positions, chunksize=None):
+    """
+    파일에서 지정한 행 위치만 positions 순서대로 읽음
+    chunksize 지정 시 청크 단위로 읽으면서 필요한 행만 남김 (전체 거래를 한 번에 올리지 않음)
+
+    Args:
+        file_path (str): 거래 데이터 파일 경로
+        positions (np.ndarray): 읽을 행 위치 (중복 없음)
+        chunksize (int, optional): 청크 행 수
+
+    Returns:
+        pd.DataFrame: 선택된 행 (positions 순서)
+    """
+    if chunksize is None:
+        return load_frame(file_path).iloc[positions].reset_index(drop=True)
+
+    wanted = np.zeros(positions.max() + 1 if len(positions) else 0, dtype=bool)
+    wanted[positions] = True
+
+    pieces, piece_pos = [], []
+    offset = 0
+    for chunk in iter_frames(file_path, chunksize):
+        chunk_pos = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        in_range = chunk_pos < len(wanted)
+        keep = np.zeros(len(chunk), dtype=bool)
+        keep[in_range] = wanted[chunk_pos[in_range]]
+        if keep.any():
+            pieces.append(chunk[keep])
+            piece_pos.append(chunk_pos[keep])
+
+    picked = pd.concat(pieces, ignore_index=True)
+    # 파일 순서 → positions 순서로 재정렬
+    rank = pd.Series(np.arange(len(positions)), index=positions)
+    return picked.iloc[np.argsort(rank.loc[np.concatenate(piece_pos)].to_numpy())].reset_index(drop=True)
 
+def velocity_for_positions(file_path, positions, chunksize):
+    """
+    파일을 청크 단위로 읽으며 카드별 속도 특성을 갱신하고, positions 행의 특성만 남김
+    (전체 거래의 속도 특성을 한 번에 계산하지 않으므로 메모리는 청크 + 카드별 최근 7일 거래 정도만 사용)
+    파일이 시각 순일 때 compute_velocity_features 전체 계산과 같은 결과 (VelocityState와 같은 조건)
+
+    Args:
+        file_path (str): 거래 데이터 파일 경로
+        positions (np.ndarray): 남길 행 위치 (중복 없음)
+        chunksize (int): 청크 행 수
+
+    Returns:
+        pd.DataFrame: 선택된 행의 속도 특성 (positions 순서, index는 0부터 연속)
+    """
+    wanted = np.zeros(positions.max() + 1 if len(positions) else 0, dtype=bool)
+    wanted[positions] = True
+
+    state = VelocityState()
+    pieces, piece_pos = [], []
+    offset = 0
+    latest = None
+    for chunk in iter_frames(file_path, chunksize, columns=VELOCITY_INPUT_COLS):
+        chunk_pos = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        if len(chunk):
+            dates = pd.to_datetime(chunk["date"])
+            if latest is not None and dates.min() < latest:
+                print("경고: 거래 데이터가 시각 순이 아니어서 청크 경계의 속도 특성이 전체 계산과 다를 수 있습니다.")
+            latest = dates.max() if latest is None else max(latest, dates.max())
+        features = state.update(chunk)
+
+        in_range = chunk_pos < len(wanted)
+        keep = np.zeros(len(chunk), dtype=bool)
+        keep[in_range] = wanted[chunk_pos[in_range]]
+        if keep.any():
+            pieces.append(features[keep])
+            piece_pos.append(chunk_pos[keep])
+
+    picked = pd.concat(pieces, ignore_index=True)
+    # 파일 순서 → positions 순서로 재정렬
+    rank = pd.Series(np.arange(len(positions)), index=positions)
+    return picked.iloc[np.argsort(rank.loc[np.concatenate(piece_pos)].to_numpy())].reset_index(drop=True)
+
+def build_lookups(client_df, card_df):
+    """
+    고객/카드 조회 테이블 생성
+
+    Args:
+        client_df (pd.DataFrame): 고객 데이터 (load_users 결과)
+        card_df (pd.DataFrame): 카드 데이터 (load_cards 결과)
+
+    Returns:
+        tuple: (고객 조회 테이블, 카드 조회 테이블)
+    """
     # 불필요한 컬럼 제거
     # card_on_dark_web 속성은 전부 No임
     card_df = card_df.drop(columns=["card_number", "cvv", "card_on_dark_web"])
 
-    # Join (거래 기준)
-    merged_df = trans_df.merge(client_df, left_on="client_id", right_on="id", suffixes=("", "_client"))
-    merged_df = merged_df.merge(card_df, left_on="card_id", right_on="id", suffixes=("", "_card"))
-    merged_df = merged_df.drop(columns=["id_client", "id_card", "client_id_card"])  # 중복된 고객/카드 id 제거, 카드 주인의 id 제거
-    print("거래 데이터 기준 Join 완료\n")
+    # 고객/카드 조회 테이블 (카드 주인의 id인 client_id는 거래의 client_id와 중복되므로 제외)
+    client_lookup = LookupTable(client_df, "id")
+    card_lookup = LookupTable(card_df.drop(columns=["client_id"]), "id")
+    return client_lookup, card_lookup
+
+def select_balanced_positions(key_df, client_lookup, card_lookup, ratio=10, random_state=42):
+    """
+    Join 가능한 거래 중 사기 거래 전부와 정상 거래 (사기 거래 수 × ratio)건의 행 위치 선택
+
+    Args:
+        key_df (pd.DataFrame): client_id, card_id, fraud 컬럼을 가진 거래 데이터
+        client_lookup (LookupTable): 고객 조회 테이블
+        card_lookup (LookupTable): 카드 조회 테이블
+        ratio (int): 사기 거래 대비 정상 거래 배수
+        random_state (int): 정상 거래 샘플링 시드
+
+    Returns:
+        np.ndarray: 선택된 행 위치 (사기 거래 → 샘플링된 정상 거래 순)
+    """
+    # Join 가능한 거래 (고객/카드 정보가 모두 있는 거래, 기존 inner join과 동일)
+    joinable = client_lookup.contains(key_df["client_id"]) & card_lookup.contains(key_df["card_id"])
 
     # 사기 거래 / 정상 거래 분리
-    df_fraud = merged_df[merged_df["fraud"] == 1]
-    df_notfraud = merged_df[merged_df["fraud"] == 0]
+    fraud_values = key_df["fraud"].to_numpy()
+    fraud_pos = np.flatnonzero(joinable & (fraud_values == 1))
+    notfraud_pos = np.flatnonzero(joinable & (fraud_values == 0))
     print("사기 거래 / 정상 거래 분리 완료")
 
-    # 정상 거래 다운샘플링 (사기 거래 수의 10배)
-    notfraud_sampled = df_notfraud.sample(n=len(df_fraud) * 10, random_state=42)
+    # 정상 거래 다운샘플링 (사기 거래 수의 ratio배)
+    notfraud_sampled = pd.Series(notfraud_pos).sample(n=len(fraud_pos) * ratio, random_state=random_state).to_numpy()
     print("정상 거래 다운샘플링 완료")
+    return np.concatenate([fraud_pos, notfraud_sampled])
+
+def attach_velocity(selected_df, velocity_df):
+    """
+    선택된 거래에 전체 거래 기준으로 계산한 카드별 속도 특성을 붙임
+    (샘플링 후에 계산하면 버려진 정상 거래가 창에서 빠지므로 샘플링 전에 계산)
+
+    Args:
+        selected_df (pd.DataFrame): 선택된 거래 (positions 순서, index는 0부터 연속)
+        velocity_df (pd.DataFrame): 선택된 거래의 속도 특성 (positions 순서, index는 0부터 연속)
+
+    Returns:
+        pd.DataFrame: 속도 특성이 추가된 거래
+    """
+    return pd.concat([selected_df, velocity_df], axis=1)
+
+def join_selected(selected_df, client_lookup, card_lookup):
+    """
+    선택된 거래에 고객/카드 컬럼을 붙이고 날짜순으로 정렬
+
+    Args:
+        selected_df (pd.DataFrame): 선택된 거래 (index는 0부터 연속)
+        client_lookup (LookupTable): 고객 조회 테이블
+        card_lookup (LookupTable): 카드 조회 테이블
+
+    Returns:
+        pd.DataFrame: Join된 거래 데이터
+    """
+    df_balanced = pd.concat([
+        selected_df,
+        client_lookup.gather(selected_df["client_id"]),
+        card_lookup.gather(selected_df["card_id"]),
+    ], axis=1)
+    print("선택된 거래 기준 Join 완료\n")
 
     # 합치기 (사기 거래 전부 + 다운샘플링된 정상 거래)
-    df_balanced = pd.concat([df_fraud, notfraud_sampled])
     df_balanced = df_balanced.sort_values('date').reset_index(drop=True)
     print("추출한 데이터 합치기 완료\n")
+    return df_balanced
+
+def join_and_balance(trans_df, client_df, card_df):
+    """
+    메모리에 있는 거래 데이터로 Join + 1:10 샘플링 수행 (파이프라인 실행용, 파일 저장 없음)
+
+    Args:
+        trans_df (pd.DataFrame): 결측치 처리된 거래 데이터
+        client_df (pd.DataFrame): 고객 데이터 (load_users 결과)
+        card_df (pd.DataFrame): 카드 데이터 (load_cards 결과)
+
+    Returns:
+        pd.DataFrame: Join 및 샘플링된 거래 데이터
+    """
+    client_lookup, card_lookup = build_lookups(client_df, card_df)
+    with span("샘플링 위치 선택", rows_in=trans_df) as sp:
+        positions = select_balanced_positions(trans_df, client_lookup, card_lookup)
+        sp.set_rows(rows_out=positions)
+    with span("속도 특성", rows_in=trans_df):
+        velocity_df = compute_velocity_features(trans_df).iloc[positions].reset_index(drop=True)
+    print("카드별 속도 특성 계산 완료")
+    with span("Join", rows_in=positions):
+        selected_df = attach_velocity(trans_df.iloc[positions].reset_index(drop=True), velocity_df)
+        return join_selected(selected_df, client_lookup, card_lookup)
+
+def join_csv_and_balance(csv_export=False, chunksize=None):
+    """
+    거래 데이터에 고객/카드 정보를 Join하고 사기 거래 : 정상 거래 = 1 : 10으로 샘플링해 저장
+    - 키/라벨 컬럼만 먼저 읽어 샘플링할 행을 정한 뒤, 선택된 행에만 Join 수행
+    - 고객/카드 테이블은 id → 행 위치 조회 테이블로 만들어 위치 기반으로 컬럼을 가져옴
+    - 고객/카드의 금액($)·MM/YYYY 날짜 컬럼은 로드 시 한 번만 파싱된 값을 사용
+    - 카드별 시간 창(1h/24h/7d) 속도 특성은 샘플링 전 전체 거래로 계산해 선택된 행에 붙임
+      (chunksize 지정 시 청크 단위로 VelocityState를 갱신하며 선택된 행의 특성만 남김)
+
+    Args:
+        csv_export (bool): True면 컬럼 기반 형식과 함께 같은 이름의 CSV도 저장
+        chunksize (int, optional): 지정 시 거래 데이터를 청크 단위로 읽음
+    """
+    trans_path = "../raw/transactions_fraud_label_preprocess.parquet"
+    # 청크 모드에서는 샘플링에 필요한 키/라벨 컬럼만 전체로 읽음
+    key_cols = [*VELOCITY_KEY_COLS, "fraud"] if chunksize else [*VELOCITY_INPUT_COLS, "fraud"]
+    try:
+        client_df = load_users("../raw/users_data.csv")
+        card_df = load_cards("../raw/cards_data.csv")
+        key_df = load_frame(trans_path, columns=key_cols)
+    except Exception as e:
+        print(f"파일 로딩 오류: {e}")
+        return None
+
+    print("데이터 로드 완료.\n")
+
+    client_lookup, card_lookup = build_lookups(client_df, card_df)
+    with span("샘플링 위치 선택", rows_in=key_df) as sp:
+        positions = select_balanced_positions(key_df, client_lookup, card_lookup)
+        sp.set_rows(rows_out=positions)
+
+    # 카드별 속도 특성은 샘플링 전 전체 거래로 계산하고 선택된 행만 남김
+    with span("속도 특성", rows_in=key_df):
+        if chunksize:
+            velocity_df = velocity_for_positions(trans_path, positions, chunksize)
+        else:
+            velocity_df = compute_velocity_features(key_df).iloc[positions].reset_index(drop=True)
+    print("카드별 속도 특성 계산 완료")
+    del key_df
+
+    # 선택된 거래만 읽어 Join (거래 기준)
+    with span("Join", rows_in=positions):
+        selected_df = attach_velocity(load_selected_rows(trans_path, positions, chunksize), velocity_df)
+        df_balanced = join_selected(selected_df, client_lookup, card_lookup)
 
     # Join 및 파생속성 생성 후 증강 파일 저장
-    df_balanced.to_csv("../raw/transaction_joined_balance.csv", index=False)
+    save_frame(df_balanced, "../raw/transaction_joined_balance.parquet", csv_export=csv_export)
     print("파일 저장 완료")
 
 
 if __name__ == "__main__":
-    join_csv_and_balance()
\ No newline at end of file
+    join_csv_and_balance()
@@ -1,54 +1,59 @@
+import os
+import sys
 import pandas as pd
-import numpy as np
-import shap
-import xgboost as xgb
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 import warnings
 warnings.filterwarnings("ignore")
 
-# 데이터 로드
-df = pd.read_csv("../raw/transaction_joined_balance_feature_preprocess.csv")
-
-
-# 범주형 변수 인코딩
-cat_cols = [
-    'client_id', 'merchant_id',
-    'use_chip', 'errors', 'mcc_type', 'gender', 'address', 'card_brand',
-    'card_type', 'has_chip', 'zip_prefix', 'merchant_state', 'merchant_city', 'expires_last_day'
-]
-for col in cat_cols:
-    if col in df.columns:
-        df[col] = LabelEncoder().fit_transform(df[col].astype(str))
-
-# feature, label 분리
-X = df.drop(columns=['fraud'])
-y = df['fraud']
-
-# 학습/테스트 분리
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, stratify=y, test_size=0.2, random_state=42
-)
-
-# XGBoost 모델 훈련
-model = xgb.XGBClassifier(
-    n_estimators=100, max_depth=6, learning_rate=0.1,
-    use_label_encoder=False, eval_metric='logloss'
-)
-model.fit(X_train, y_train)
-
-# SHAP 분석
-explainer = shap.Explainer(model)
-shap_values = explainer(X_test)
-
-# SHAP 중요도 수치 출력
-mean_abs_shap = np.abs(shap_values.values).mean(axis=0)
-shap_importance = pd.DataFrame({
-    'feature': X.columns,
-    'mean_abs_shap': mean_abs_shap
-}).sort_values(by='mean_abs_shap', ascending=False)
-
-print("\n[SHAP Feature Importance - 상위 영향도 속성 순서]")
-print(shap_importance)
-
-shap_importance.to_csv("../raw/shap_feature_importance.csv", index=False)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import load_frame
+from common.importance import encode_features, train_xgb, tree_shap_importance
+from common.encoding import EncodingRegistry
+
+### 범주형 어휘 파일 (모든 단계가 같은 정수 코드를 쓰도록 공유, 새 값이 나오면 뒤에 추가)
+ENCODING_REGISTRY_PATH = '../raw/categorical_vocab.parquet'
+
+def compute_shap_importance(df, registry=None):
+    """
+    XGBoost 모델을 학습하고 테스트 데이터의 평균 |SHAP| 값으로 속성 중요도 계산
+    (두 모델을 함께 병렬로 돌릴 때는 '중요 특성 선택 병렬 통합 실행' 스크립트 사용)
+
+    Args:
+        df (pd.DataFrame): 파생 속성 생성까지 끝난 데이터
+        registry (EncodingRegistry, optional): 범주형 어휘 (None이면 df로 새로 생성)
+
+    Returns:
+        pd.DataFrame: feature, mean_abs_shap 컬럼 (중요도 내림차순)
+    """
+    # 범주형 변수 인코딩 (common.importance.CATEGORICAL_COLS, 공유 어휘 코드)
+    X, y, feature_names = encode_features(df, registry)
+
+    # 학습/테스트 분리
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, stratify=y, test_size=0.2, random_state=42
+    )
+
+    # XGBoost 모델 훈련
+    model = train_xgb(X_train, y_train, feature_names, random_state=42, n_jobs=os.cpu_count())
+
+    # SHAP 분석 (XGBoost 내장 TreeSHAP, 배치 단위)
+    mean_abs_shap = tree_shap_importance(model, X_test, feature_names)
+    shap_importance = pd.DataFrame({
+        'feature': feature_names,
+        'mean_abs_shap': mean_abs_shap
+    }).sort_values(by='mean_abs_shap', ascending=False)
+
+    print("\n[SHAP Feature Importance - 상위 영향도 속성 순서]")
+    print(shap_importance)
+    return shap_importance
+
+
+if __name__ == "__main__":
+    # 데이터 로드
+    df = load_frame("../raw/transaction_joined_balance_feature_preprocess.parquet")
+
+    registry = EncodingRegistry.load(ENCODING_REGISTRY_PATH)
+    shap_importance = compute_shap_importance(df, registry)
+    if registry.changed:
+        registry.save(ENCODING_REGISTRY_PATH)
+    shap_importance.to_csv("../raw/shap_feature_importance.csv", index=False)
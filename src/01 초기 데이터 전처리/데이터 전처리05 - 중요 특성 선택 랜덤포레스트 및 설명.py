@@ -1,65 +1,65 @@
+import os
+import sys
 import pandas as pd
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 #import matplotlib.pyplot as plt
 #import seaborn as sns
-import numpy as np
-
-
-# 1. 데이터 로딩
-data = pd.read_csv('../raw/transaction_joined_balance_feature_preprocess.csv')
-
-
-# 4. 범주형 변수 인코딩
-categorical_cols = [
-    'client_id', 'merchant_id',
-    'use_chip', 'errors', 'mcc', 'gender', 'address', 'card_brand',
-    'card_type', 'has_chip', 'zip_prefix', 'merchant_state', 'merchant_city', 'expires_last_day'
-]
-for col in categorical_cols:
-    if col in data.columns:
-        data[col] = LabelEncoder().fit_transform(data[col].astype(str))
-
-# 5. 수치형 변수 정규화는 트리 기반 모델은 불필요
-'''num_cols = [
-    'amount', 'latitude', 'longitude',
-    'per_capita_income', 'yearly_income', 'total_debt', 'credit_score',
-    'num_credit_cards', 'num_cards_issued', 'credit_limit',
-    'year_pin_last_changed', 'hour', 'dayofweek', 'account_age_days'
-]
-for col in num_cols:
-    if col not in data.columns:
-        num_cols.remove(col)
-scaler = StandardScaler()
-data[num_cols] = scaler.fit_transform(data[num_cols])'''
-
-
-X = data.drop(columns=['fraud'])
-y = data['fraud']
-
-# 7. 학습/평가 데이터 분리
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-# 8. 랜덤포레스트 모델 학습 및 중요도 산출
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
-importances = clf.feature_importances_
-feature_names = X.columns
-
-# 9. 중요도 높은 feature 정렬 및 출력
-feat_imp = sorted(zip(feature_names, importances), key=lambda x: x[1], reverse=True)
-print("=== Fraud 탐지에 중요한 속성 (중요도 순) ===")
-for feat, imp in feat_imp:
-    print(f"{feat}: {imp:.4f}")
-
-# 데이터프레임 변환
-feat_imp_df = pd.DataFrame(feat_imp, columns=['feature', 'importance'])
-
-# CSV로 저장
-feat_imp_df.to_csv('../raw/random_forest_feature_importance.csv', index=False)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import load_frame
+from common.importance import encode_features, train_rf
+from common.encoding import EncodingRegistry
+
+### 범주형 어휘 파일 (모든 단계가 같은 정수 코드를 쓰도록 공유, 새 값이 나오면 뒤에 추가)
+ENCODING_REGISTRY_PATH = '../raw/categorical_vocab.parquet'
+
+
+def compute_rf_importance(data, registry=None):
+    """
+    랜덤포레스트 모델을 학습하고 feature_importances_로 속성 중요도 계산
+    (두 모델을 함께 병렬로 돌릴 때는 '중요 특성 선택 병렬 통합 실행' 스크립트 사용)
+
+    Args:
+        data (pd.DataFrame): 파생 속성 생성까지 끝난 데이터
+        registry (EncodingRegistry, optional): 범주형 어휘 (None이면 data로 새로 생성)
+
+    Returns:
+        pd.DataFrame: feature, importance 컬럼 (중요도 내림차순)
+    """
+    # 4. 범주형 변수 인코딩 (common.importance.CATEGORICAL_COLS, 공유 어휘 코드)
+    # 5. 수치형 변수 정규화는 트리 기반 모델은 불필요
+    X, y, feature_names = encode_features(data, registry)
+
+    # 7. 학습/평가 데이터 분리
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    # 8. 랜덤포레스트 모델 학습 및 중요도 산출
+    clf = train_rf(X_train, y_train, random_state=42, n_jobs=os.cpu_count())
+    importances = clf.feature_importances_
+
+    # 9. 중요도 높은 feature 정렬 및 출력
+    feat_imp = sorted(zip(feature_names, importances), key=lambda x: x[1], reverse=True)
+    print("=== Fraud 탐지에 중요한 속성 (중요도 순) ===")
+    for feat, imp in feat_imp:
+        print(f"{feat}: {imp:.4f}")
+
+    # 데이터프레임 변환
+    return pd.DataFrame(feat_imp, columns=['feature', 'importance'])
+
+
+if __name__ == "__main__":
+    # 1. 데이터 로딩
+    data = load_frame('../raw/transaction_joined_balance_feature_preprocess.parquet')
+
+    registry = EncodingRegistry.load(ENCODING_REGISTRY_PATH)
+    feat_imp_df = compute_rf_importance(data, registry)
+    if registry.changed:
+        registry.save(ENCODING_REGISTRY_PATH)
+
+    # CSV로 저장
+    feat_imp_df.to_csv('../raw/random_forest_feature_importance.csv', index=False)
 
 
 '''
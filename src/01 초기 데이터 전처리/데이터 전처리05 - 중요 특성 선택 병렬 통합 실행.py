@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import pandas as pd
+import warnings
+warnings.filterwarnings("ignore")
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import load_frame
+from common.importance import run_importance
+from common.encoding import EncodingRegistry
+
+### 시드 목록 (여러 개면 시드 간 표준편차를 함께 저장)
+SEEDS = (42, 43, 44)
+
+### SHAP 계산: 테스트 분할에서 라벨 비율을 유지해 뽑을 샘플 수 / 배치 행 수
+SHAP_SAMPLES = 20_000
+SHAP_BATCH_SIZE = 8192
+
+### 범주형 어휘 파일 (모든 단계가 같은 정수 코드를 쓰도록 공유, 새 값이 나오면 뒤에 추가)
+ENCODING_REGISTRY_PATH = '../raw/categorical_vocab.parquet'
+
+### 전체 스레드 수 (두 모델이 절반씩 사용)
+N_JOBS = os.cpu_count() or 1
+
+# 통합 결과의 모델 이름 → (값 컬럼 이름, 저장 파일)
+IMPORTANCE_OUTPUTS = {
+    'xgb_shap': ('mean_abs_shap', '../raw/shap_feature_importance.csv'),
+    'random_forest': ('importance', '../raw/random_forest_feature_importance.csv'),
+}
+
+def combine_importance(shap_importance, rf_importance):
+    """
+    두 모델의 중요도를 하나의 데이터프레임으로 합침 (파이프라인 노드 출력용)
+
+    Args:
+        shap_importance (pd.DataFrame): feature, mean_abs_shap, mean_abs_shap_std
+        rf_importance (pd.DataFrame): feature, importance, importance_std
+
+    Returns:
+        pd.DataFrame: model, feature, value, value_std 컬럼
+    """
+    frames = []
+    for model, df in [('xgb_shap', shap_importance), ('random_forest', rf_importance)]:
+        value_col = IMPORTANCE_OUTPUTS[model][0]
+        frames.append(pd.DataFrame({
+            'model': model,
+            'feature': df['feature'],
+            'value': df[value_col],
+            'value_std': df[f'{value_col}_std'],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def select_importance(combined, model):
+    """
+    통합 결과에서 모델 하나의 중요도를 기존 CSV 형식으로 꺼냄
+
+    Args:
+        combined (pd.DataFrame): combine_importance 결과
+        model (str): 'xgb_shap' 또는 'random_forest'
+
+    Returns:
+        pd.DataFrame: feature, <값 컬럼>, <값 컬럼>_std (중요도 내림차순)
+    """
+    value_col = IMPORTANCE_OUTPUTS[model][0]
+    selected = combined[combined['model'] == model]
+    return pd.DataFrame({
+        'feature': selected['feature'].to_numpy(),
+        value_col: selected['value'].to_numpy(),
+        f'{value_col}_std': selected['value_std'].to_numpy(),
+    })
+
+def compute_all_importance(df, seeds=SEEDS, shap_samples=SHAP_SAMPLES, shap_batch_size=SHAP_BATCH_SIZE,
+                           n_jobs=N_JOBS, registry=None):
+    """
+    XGBoost(SHAP) / 랜덤포레스트 중요도를 병렬로 계산하고 단계별 소요 시간 출력
+
+    Args:
+        df (pd.DataFrame): 파생 속성 생성까지 끝난 데이터
+        seeds (tuple): 분할/학습 시드 목록
+        shap_samples (int): SHAP 계산 샘플 수
+        shap_batch_size (int): SHAP 배치 행 수
+        n_jobs (int): 전체 스레드 수
+        registry (EncodingRegistry, optional): 범주형 어휘 (None이면 df로 새로 생성)
+
+    Returns:
+        pd.DataFrame: combine_importance 결과
+    """
+    shap_importance, rf_importance, timings = run_importance(
+        df, seeds=seeds, shap_samples=shap_samples, shap_batch_size=shap_batch_size, n_jobs=n_jobs,
+        registry=registry)
+
+    print("\n[단계별 소요 시간] (XGBoost / 랜덤포레스트 학습은 동시에 실행)")
+    for phase, seconds in timings.items():
+        print(f"   > {phase:<8}: {seconds:8.2f}초")
+
+    print("\n[SHAP Feature Importance - 상위 영향도 속성 순서]")
+    print(shap_importance.head(20))
+    print("\n=== Fraud 탐지에 중요한 속성 (랜덤포레스트, 중요도 순) ===")
+    print(rf_importance.head(20))
+    return combine_importance(shap_importance, rf_importance)
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    df = load_frame("../raw/transaction_joined_balance_feature_preprocess.parquet")
+    print(f"데이터 로드 완료 ({time.time() - start_time:.2f}초, {len(df):,}건)\n")
+
+    registry = EncodingRegistry.load(ENCODING_REGISTRY_PATH)
+    combined = compute_all_importance(df, registry=registry)
+    if registry.changed:
+        registry.save(ENCODING_REGISTRY_PATH)
+    for model, (_, output_file) in IMPORTANCE_OUTPUTS.items():
+        select_importance(combined, model).to_csv(output_file, index=False)
+    print(f"\n파일 저장 완료 (전체 {time.time() - start_time:.2f}초)")
@@ -1,138 +1,185 @@
-import pandas as pd
-import numpy as np
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import LabelEncoder
-import time
-from tqdm import tqdm
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import save_frame, load_frame, iter_frames
+from common.augmentation import normalize_transactions, augment_fraud, pad_fraud, finalize_training_set
+from common.validity import ValidityIndex
+from common.undersampling import knn_undersample
+from common.sharding import N_SHARDS, augment_sharded
+from common.tracing import span, tracing, print_summary
 
 ### 파라미터: 노이즈 범위 설정
 DATE_NOISE_MIN, DATE_NOISE_MAX = -30, 30   # date 노이즈: -30~+30분
 AMOUNT_NOISE_RATE = 0.1                    # amount 노이즈: ±10%
+RANDOM_STATE = 42                          # 노이즈/샘플링 시드 (같은 시드면 같은 결과)
 
-def add_time_noise(ts, min_min=DATE_NOISE_MIN, max_min=DATE_NOISE_MAX):
-    """datetime 내 랜덤 minutes 시프트"""
-    delta = np.random.randint(min_min, max_min + 1)
-    return ts + pd.Timedelta(minutes=delta)
-
-def add_amount_noise(val, rate=AMOUNT_NOISE_RATE):
-    """amount에 ±노이즈 비율 적용"""
-    noise = np.random.uniform(-rate, rate)
-    newval = max(0, val + val * noise)
-    return round(newval, 2)
-
-print("1. 데이터 로딩 및 정합성 처리")
-start_time = time.time()
-df = pd.read_csv('../raw/full_transactions_fraud_label_data_preprocesse.csv', dtype={'zip': str, 'mcc': str})
-
-print(f"   > 데이터 전체 로딩 완료 ({time.time() - start_time:.2f}초, {len(df):,}건)\n")
-df['zip'] = df['zip'].apply(lambda x: str(x).zfill(5) if x.isdigit() else str(x).strip())
-df['mcc'] = df['mcc'].apply(lambda x: str(x).zfill(4) if x.isdigit() else str(x).strip())
-df['date'] = pd.to_datetime(df['date'])
-if 'mcc_type' in df.columns:
-    df = df.drop(columns=['mcc_type'])
-print("   > 컬럼 정규화·필요없는 컬럼 제거 완료\n")
-
-zip_combo_set = set(df[['zip','merchant_state','merchant_city']].itertuples(index=False, name=None))
-client_card_set = set(df[['client_id','card_id']].itertuples(index=False, name=None))
-valid_mccs = set(df['mcc'])
-
-### 2. 사기 거래 증강 (슬라이딩 윈도우 + 변형)
-print("2. 사기 거래 슬라이딩 윈도우 증강/변형 시작")
+### 파라미터: 슬라이딩 윈도우 크기 / 이동 간격
 WINDOW_SIZE, STRIDE = 5, 1
-fraud_df = df[df['fraud'] == 1].copy()
-orig_fraud_count = len(fraud_df)
-
-grouped = list(df.groupby(['client_id', 'card_id']))
-augmented = []
-
-for g_idx, ((client_id, card_id), group) in enumerate(tqdm(grouped, desc="그룹별 윈도우 슬라이싱"), 1):
-    group = group.reset_index(drop=True)
-    if (client_id, card_id) not in client_card_set:
-        continue
-    for start in range(0, len(group)-WINDOW_SIZE+1, STRIDE):
-        window = group.iloc[start:start+WINDOW_SIZE].copy()
-        if window['fraud'].sum() > 0:
-            valid_flag = True
-            for _, row in window.iterrows():
-                if (row['zip'], row['merchant_state'], row['merchant_city']) not in zip_combo_set or row['mcc'] not in valid_mccs:
-                    valid_flag = False
-                    break
-            if valid_flag:
-                for i, row in window.iterrows():
-                    if row['fraud'] == 1:
-                        new_row = row.copy()
-                        # amount 노이즈
-                        new_row['amount'] = add_amount_noise(row['amount'])
-                        # date 노이즈
-                        new_row['date'] = add_time_noise(row['date'])
-                        # use_chip 변형 없이 그대로 유지 (온라인 거래는 반드시 Online Transaction, 아닌 경우 chip/swipe만)
-                        augmented.append(new_row)
-
-aug_fraud_df = pd.DataFrame(augmented)
-aug_fraud_df = pd.concat([fraud_df, aug_fraud_df], ignore_index=True).drop_duplicates()
-print(f"   > 변형포함 증강-최종 사기 거래 수: {len(aug_fraud_df):,}")
-
-# 4~8배 미만 시 추가 복제
-target_fraud = max(orig_fraud_count * 4, len(aug_fraud_df))
-if len(aug_fraud_df) < target_fraud:
-    extra = aug_fraud_df.sample(target_fraud - len(aug_fraud_df), replace=True, random_state=42)
-    aug_fraud_df = pd.concat([aug_fraud_df, extra]).reset_index(drop=True)
-print(f"   > 증강-최종 사기 거래 수(최종): {len(aug_fraud_df):,}\n")
-
-### 3. 정상 거래 KNN 유사 기반 언더샘플링
-print("3. 정상 거래 KNN 유사 기반 언더샘플링")
-non_fraud_df = df[df['fraud'] == 0].copy()
-
-zip_le = LabelEncoder().fit(df['zip'])
-mcc_le = LabelEncoder().fit(df['mcc'])
-aug_fraud_df['zip_enc'] = zip_le.transform(aug_fraud_df['zip'])
-aug_fraud_df['mcc_enc'] = mcc_le.transform(aug_fraud_df['mcc'])
-non_fraud_df['zip_enc'] = zip_le.transform(non_fraud_df['zip'])
-non_fraud_df['mcc_enc'] = mcc_le.transform(non_fraud_df['mcc'])
-
-feat_cols = ['amount', 'zip_enc', 'mcc_enc']
-
-X_fraud = aug_fraud_df[feat_cols].values
-X_normal = non_fraud_df[feat_cols].values
-
-print(f"   > KNN - 정상({len(X_normal):,}), 사기({len(X_fraud):,}) 거래 fitting 시작")
-neighbors = NearestNeighbors(n_neighbors=1, metric='euclidean', n_jobs=-1)
-neighbors.fit(X_normal)
-print(f"   > KNN learning 완료")
-print("   > 사기 거래에 대해 최근접 정상거래 검색 시작")
-distances, indices = neighbors.kneighbors(X_fraud)
-print("   > KNN 검색 완료")
-
-# 중복 없는 유사 샘플 우선 추출 (필수 목표 개수(n_normal)만큼 보장)
-indices_set = set(indices.flatten())
-n_normal = len(aug_fraud_df)*9
-sel_normal_df = non_fraud_df.iloc[list(indices_set)].copy()
-if len(sel_normal_df) < n_normal:
-    print(f"   > KNN 유사 샘플만으로 부족: {len(sel_normal_df):,}개. {n_normal - len(sel_normal_df):,}개 추가 랜덤 추출")
-    rest = non_fraud_df.drop(sel_normal_df.index)
-    extra_needed = n_normal - len(sel_normal_df)
-    if extra_needed > len(rest):
-        print("   > 경고: 전체 정상 거래 수가 목표치보다 적어, 가능한 만큼만 추가")
-        extra_needed = len(rest)
-    sel_normal_df = pd.concat([sel_normal_df, rest.sample(extra_needed, random_state=42)])
-
-print(f"   > 최종 유사+랜덤 정상 거래 추출 건수: {len(sel_normal_df):,}\n")
-
-### 4. id 신규 부여(순번)
-aug_fraud_df = aug_fraud_df.copy()
-sel_normal_df = sel_normal_df.copy()
-aug_fraud_df['id'] = np.arange(1, len(aug_fraud_df)+1)
-sel_normal_df['id'] = np.arange(len(aug_fraud_df)+1, len(aug_fraud_df)+len(sel_normal_df)+1)
 
-### 5. 컬럼 순서 및 저장
-use_cols = [
-    'id','date','client_id','card_id','amount','use_chip','merchant_id','merchant_city',
-    'merchant_state','zip','mcc','errors','fraud'
-]
-final_df = pd.concat([aug_fraud_df, sel_normal_df], ignore_index=True)[use_cols]
-final_df = final_df.sample(frac=1, random_state=42).reset_index(drop=True)
-
-print(f'최종 저장 샘플 수: {len(final_df):,}')
-final_df.to_csv('../raw/augmented_for_train.csv', index=False)
-print('완료!')
+### 유효성 검사 기준 파일: 위치 조합(zip, merchant_state, merchant_city) / MCC 코드
+LOCATION_REF_PATH = '../raw/location_data_with_geo_final.csv'
+MCC_CODES_PATH = '../raw/mcc_codes.json'
+
+### KNN 언더샘플링: 한 번에 검색할 사기 거래 수(메모리 상한), 검색 스레드 수
+KNN_BATCH_SIZE = 1_000_000
+KNN_N_JOBS = os.cpu_count() or 1
+
+### 샤드 실행: 카드 해시 샤드 수(결과에 영향, 고정 유지) / 프로세스 수(결과에 영향 없음) / 입력 청크 행 수
+SHARDED = True
+SHARD_COUNT = N_SHARDS
+SHARD_WORKERS = os.cpu_count() or 1
+SHARD_CHUNK_SIZE = 1_000_000
+
+### 측정: 구간 트레이스 파일(chrome://tracing, Perfetto에서 flame chart) / 구간별 프로파일링 ({'KNN 검색': 'cprofile'} 등)
+TRACE_PATH = '../raw/augment_trace.json'
+PROFILE_SPANS = {}
+
+def normalize_columns(df):
+    """
+    zip / mcc 문자열 정규화, date 변환, 필요없는 컬럼 제거
+
+    Args:
+        df (pd.DataFrame): 결측치 처리된 거래 데이터
+
+    Returns:
+        pd.DataFrame: 정규화된 거래 데이터
+    """
+    # 고유값 단위로 한 번만 문자열 변환 (common.augmentation.normalize_transactions)
+    df = normalize_transactions(df)
+    print("   > 컬럼 정규화·필요없는 컬럼 제거 완료\n")
+    return df
+
+def augment_for_train(df, validity_index, window_size=WINDOW_SIZE, stride=STRIDE,
+                      amount_noise_rate=AMOUNT_NOISE_RATE, date_noise_min=DATE_NOISE_MIN,
+                      date_noise_max=DATE_NOISE_MAX, random_state=RANDOM_STATE):
+    """
+    사기 거래 슬라이딩 윈도우 증강 + 정상 거래 KNN 언더샘플링으로 학습용 데이터 생성
+
+    Args:
+        df (pd.DataFrame): normalize_columns를 거친 거래 데이터
+        validity_index (ValidityIndex): 위치/MCC 유효성 인덱스
+        window_size (int): 슬라이딩 윈도우 크기
+        stride (int): 윈도우 이동 간격
+        amount_noise_rate (float): amount 노이즈 비율
+        date_noise_min (int): date 노이즈 최솟값(분)
+        date_noise_max (int): date 노이즈 최댓값(분)
+        random_state (int): 노이즈/샘플링 시드
+
+    Returns:
+        pd.DataFrame: 증강 사기 거래 + 선택된 정상 거래 (섞인 순서, id 신규 부여)
+    """
+    is_valid = validity_index.is_valid(df)
+    print(f"   > 위치/MCC 유효성 검사 완료 (유효 {is_valid.sum():,}건 / 전체 {len(df):,}건)\n")
+
+    ### 2. 사기 거래 증강 (슬라이딩 윈도우 + 변형)
+    print("2. 사기 거래 슬라이딩 윈도우 증강/변형 시작")
+    # 그룹별 윈도우에서 사기 거래가 있고 모든 행이 유효한 윈도우를 찾아, 포함된 사기 거래를 윈도우 수만큼 복제 후 노이즈 적용
+    # use_chip 변형 없이 그대로 유지 (온라인 거래는 반드시 Online Transaction, 아닌 경우 chip/swipe만)
+    aug_fraud_df, orig_fraud_count, window_rows = augment_fraud(
+        df, is_valid, window_size=window_size, stride=stride,
+        amount_noise_rate=amount_noise_rate, date_noise_min=date_noise_min, date_noise_max=date_noise_max,
+        random_state=random_state
+    )
+    print(f"   > 윈도우 슬라이싱 증강 거래 수: {window_rows:,}")
+    print(f"   > 변형포함 증강-최종 사기 거래 수: {len(aug_fraud_df):,}")
+
+    # 4~8배 미만 시 추가 복제
+    aug_fraud_df = pad_fraud(aug_fraud_df, orig_fraud_count, random_state=random_state)
+    print(f"   > 증강-최종 사기 거래 수(최종): {len(aug_fraud_df):,}\n")
+
+    ### 3. 정상 거래 KNN 유사 기반 언더샘플링
+    print("3. 정상 거래 KNN 유사 기반 언더샘플링")
+    non_fraud_df = df[df['fraud'] == 0]
+    n_normal = len(aug_fraud_df)*9
+
+    # (mcc, zip) 블록 → mcc 블록 순으로 amount 최근접 정상 거래를 찾고, 부족분은 랜덤 추출
+    print(f"   > KNN - 정상({len(non_fraud_df):,}), 사기({len(aug_fraud_df):,}) 거래 블록별 검색 시작")
+    sel_normal_df, knn_stats = knn_undersample(
+        non_fraud_df, aug_fraud_df, n_normal,
+        random_state=random_state, batch_size=KNN_BATCH_SIZE, n_jobs=KNN_N_JOBS
+    )
+    print("   > KNN 검색 완료")
+    print(f"   > (mcc, zip) 블록 매칭: {knn_stats['matched_mcc_zip']:,}건, mcc 블록 매칭: {knn_stats['matched_mcc']:,}건, "
+          f"매칭 실패: {knn_stats['unmatched']:,}건")
+    print(f"   > 중복 없는 유사 샘플: {knn_stats['unique_neighbors']:,}개, 랜덤 추가 추출: {knn_stats['backfilled']:,}개")
+    if knn_stats['shortage'] > 0:
+        print("   > 경고: 전체 정상 거래 수가 목표치보다 적어, 가능한 만큼만 추가")
 
+    print(f"   > 최종 유사+랜덤 정상 거래 추출 건수: {len(sel_normal_df):,}\n")
+
+    ### 4. id 신규 부여(순번) 후 섞기, 5. 컬럼 순서
+    return finalize_training_set(aug_fraud_df, sel_normal_df, random_state)
+
+
+def augment_for_train_sharded(input_file, validity_index, n_shards=SHARD_COUNT, n_workers=SHARD_WORKERS,
+                              chunksize=SHARD_CHUNK_SIZE, window_size=WINDOW_SIZE, stride=STRIDE,
+                              amount_noise_rate=AMOUNT_NOISE_RATE, date_noise_min=DATE_NOISE_MIN,
+                              date_noise_max=DATE_NOISE_MAX, random_state=RANDOM_STATE):
+    """
+    augment_for_train의 샤드 실행 버전 (common.sharding.augment_sharded)
+    거래 파일을 청크로 읽어 카드 해시 샤드 파일로 나눈 뒤, 샤드별 로딩/정규화/증강을 프로세스 풀에서 실행
+    샤드별 노이즈 난수는 마스터 시드에서 파생하므로 n_workers와 무관하게 결과가 같음 (n_shards가 같을 때)
+
+    Args:
+        input_file (str): 결측치 처리된 거래 데이터 파일 경로
+        validity_index (ValidityIndex): 위치/MCC 유효성 인덱스
+        n_shards (int): 카드 해시 샤드 수
+        n_workers (int): 프로세스 수
+        chunksize (int): 입력 청크 행 수
+        window_size (int): 슬라이딩 윈도우 크기
+        stride (int): 윈도우 이동 간격
+        amount_noise_rate (float): amount 노이즈 비율
+        date_noise_min (int): date 노이즈 최솟값(분)
+        date_noise_max (int): date 노이즈 최댓값(분)
+        random_state (int): 마스터 시드
+
+    Returns:
+        pd.DataFrame: 증강 사기 거래 + 선택된 정상 거래 (섞인 순서, id 신규 부여)
+    """
+    print(f"   > 카드 해시 샤드 {n_shards}개 / 프로세스 {n_workers}개로 로딩·정규화·증강 실행")
+    final_df, stats = augment_sharded(
+        iter_frames(input_file, chunksize), validity_index, work_dir=os.path.dirname(os.path.abspath(input_file)),
+        n_shards=n_shards, n_workers=n_workers, window_size=window_size, stride=stride,
+        amount_noise_rate=amount_noise_rate, date_noise_min=date_noise_min, date_noise_max=date_noise_max,
+        random_state=random_state, knn_batch_size=KNN_BATCH_SIZE, knn_n_jobs=KNN_N_JOBS
+    )
+    print(f"   > 위치/MCC 유효성 검사 완료 (유효 {stats['valid']:,}건 / 전체 {stats['rows']:,}건)")
+    print(f"   > 윈도우 슬라이싱 증강 거래 수: {stats['window_rows']:,}")
+    print(f"   > 변형포함 증강-최종 사기 거래 수: {stats['fraud_dedup']:,}")
+    print(f"   > 증강-최종 사기 거래 수(최종): {stats['fraud_final']:,}")
+    print(f"   > (mcc, zip) 블록 매칭: {stats['matched_mcc_zip']:,}건, mcc 블록 매칭: {stats['matched_mcc']:,}건, "
+          f"매칭 실패: {stats['unmatched']:,}건")
+    print(f"   > 중복 없는 유사 샘플: {stats['unique_neighbors']:,}개, 랜덤 추가 추출: {stats['backfilled']:,}개")
+    if stats['shortage'] > 0:
+        print("   > 경고: 전체 정상 거래 수가 목표치보다 적어, 가능한 만큼만 추가")
+    return final_df
+
+
+if __name__ == "__main__":
+    input_file = '../raw/transactions_fraud_label_preprocess.parquet'
+    validity_index = ValidityIndex.from_reference(LOCATION_REF_PATH, MCC_CODES_PATH)
+
+    # 구간이 끝날 때마다 시간/CPU/행 수/RSS 변화량 출력, 끝나면 TRACE_PATH에 트레이스 저장
+    with tracing(TRACE_PATH, profile=PROFILE_SPANS, echo=True) as tracer:
+        print("1. 데이터 로딩 및 정합성 처리")
+        if SHARDED:
+            # 전체 거래를 한 프로세스에 올리지 않고 카드 샤드별로 로딩·정규화·증강
+            with span("샤드 실행") as sp:
+                final_df = augment_for_train_sharded(input_file, validity_index)
+                sp.set_rows(rows_out=final_df)
+            print("   > 샤드 실행 완료\n")
+        else:
+            with span("데이터 로딩") as sp:
+                df = load_frame(input_file)
+                sp.set_rows(rows_out=df)
+
+            print(f"   > 데이터 전체 로딩 완료 ({len(df):,}건)\n")
+            df = normalize_columns(df)
+            final_df = augment_for_train(df, validity_index)
+
+        print(f'최종 저장 샘플 수: {len(final_df):,}')
+        with span("저장", rows_in=final_df):
+            save_frame(final_df, '../raw/augmented_for_train.parquet')
+    print_summary(tracer)
+    print('완료!')
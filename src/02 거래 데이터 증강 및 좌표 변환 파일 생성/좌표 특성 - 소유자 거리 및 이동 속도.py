@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import iter_frames, FrameWriter
+from common.parsing import load_users
+from common.geo import GeoFeatureBuilder, GEO_FEATURE_COLS
+from common.geocode_cache import GeocodeCache
+
+### 좌표 기준 파일: 위치 조합(zip, merchant_state, merchant_city) → 위도/경도
+LOCATION_REF_PATH = '../raw/location_data_with_geo_final.csv'
+USERS_PATH = '../raw/users_data.csv'
+
+### 좌표 테이블에 없는 위치 조합의 대체 좌표 캐시 (여러 실행이 함께 사용)
+GEOCODE_CACHE_DIR = '../raw/.geocode_cache'
+
+### 청크 행 수 (거래 파일 전체를 메모리에 올리지 않음)
+CHUNK_SIZE = 1_000_000
+
+# 위치 특성 계산에 필요한 거래 컬럼
+GEO_INPUT_COLS = ['id', 'client_id', 'card_id', 'date', 'zip', 'merchant_state', 'merchant_city']
+
+def build_geo_features(chunks, geocode, users_df):
+    """
+    거래 청크를 순서대로 받아 위치 특성 계산 (거래 id + 특성 컬럼)
+
+    Args:
+        chunks (iterable): 거래 청크 (GEO_INPUT_COLS 컬럼, 시각 순)
+        geocode (GeocodeCache): 좌표 조회 캐시
+        users_df (pd.DataFrame): 고객 데이터 (load_users 결과)
+
+    Yields:
+        pd.DataFrame: 청크별 id + 위치 특성
+    """
+    builder = GeoFeatureBuilder(geocode, users_df)
+    for chunk in chunks:
+        features = builder.transform(chunk)
+        yield pd.concat([chunk[['id']], features], axis=1).reset_index(drop=True)
+
+def geo_features_frame(df, geocode, users_df, chunksize=CHUNK_SIZE):
+    """
+    메모리에 있는 거래 데이터의 위치 특성을 청크 단위로 계산 (파이프라인 실행용)
+
+    Args:
+        df (pd.DataFrame): 결측치 처리된 거래 데이터
+        geocode (GeocodeCache): 좌표 조회 캐시
+        users_df (pd.DataFrame): 고객 데이터
+        chunksize (int): 청크 행 수
+
+    Returns:
+        pd.DataFrame: 거래 id + 위치 특성
+    """
+    chunks = (df.iloc[start:start + chunksize][GEO_INPUT_COLS] for start in range(0, len(df), chunksize))
+    return pd.concat(build_geo_features(chunks, geocode, users_df), ignore_index=True)
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    geocode = GeocodeCache.from_file(LOCATION_REF_PATH, GEOCODE_CACHE_DIR)
+    users_df = load_users(USERS_PATH)
+    print(f"좌표 테이블 로드 완료 ({len(geocode.reference):,}개 위치 조합, 대체 좌표 {len(geocode):,}개, "
+          f"{time.time() - start_time:.2f}초)")
+
+    chunks = iter_frames('../raw/transactions_fraud_label_preprocess.parquet', CHUNK_SIZE, columns=GEO_INPUT_COLS)
+    with FrameWriter('../raw/transactions_geo_features.parquet', columns=['id', *GEO_FEATURE_COLS]) as writer:
+        for features in build_geo_features(chunks, geocode, users_df):
+            writer.write(features)
+            print(f"   > {writer.rows_written:,}건 처리 ({time.time() - start_time:.2f}초)")
+    print("파일 저장 완료")
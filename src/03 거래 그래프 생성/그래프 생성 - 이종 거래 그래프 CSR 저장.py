@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.storage import load_frame
+from common.graph import build_transaction_graph
+from common.encoding import EncodingRegistry
+from common.schema import CARDS_SCHEMA, compact_frame
+
+### 범주형 어휘 파일 (client / card / merchant / mcc 노드 id를 다른 단계의 범주형 코드와 같게 유지)
+ENCODING_REGISTRY_PATH = '../raw/categorical_vocab.parquet'
+
+def build_and_save_graph(trans_file, cards_file, out_dir, registry_file=None):
+    """
+    증강된 학습용 거래 데이터로 이종 거래 그래프를 만들어 .npy 배열 + manifest로 저장
+
+    Args:
+        trans_file (str): 거래 데이터 경로 (augmented_for_train.parquet 등)
+        cards_file (str): cards_data.csv 경로 (None이면 거래에 등장한 고객-카드 쌍만 사용)
+        out_dir (str): 그래프 저장 디렉터리
+        registry_file (str, optional): 범주형 어휘 파일 (None이면 노드 id를 그래프 안에서만 부여)
+
+    Returns:
+        HeteroGraph: 생성된 그래프
+    """
+    start_time = time.time()
+    trans_df = load_frame(trans_file, columns=[
+        'id', 'date', 'client_id', 'card_id', 'amount', 'merchant_id',
+        'merchant_city', 'merchant_state', 'zip', 'mcc', 'fraud'
+    ])
+    cards_df = compact_frame(pd.read_csv(cards_file, usecols=['id', 'client_id']), CARDS_SCHEMA) if cards_file else None
+    print(f"데이터 로드 완료 ({time.time() - start_time:.2f}초, 거래 {len(trans_df):,}건)")
+
+    start_time = time.time()
+    registry = EncodingRegistry.load(registry_file) if registry_file else None
+    graph = build_transaction_graph(trans_df, cards_df, registry)
+    if registry is not None and registry.changed:
+        registry.save(registry_file)
+    print(f"그래프 생성 완료 ({time.time() - start_time:.2f}초)")
+    for node_type, count in graph.num_nodes.items():
+        print(f"   > {node_type} 노드: {count:,}개")
+    for name, relation in graph.relations.items():
+        print(f"   > {name} 간선: {len(relation['indices']):,}개")
+
+    start_time = time.time()
+    graph.save(out_dir)
+    print(f"그래프 저장 완료 ({time.time() - start_time:.2f}초): {out_dir}")
+    return graph
+
+
+if __name__ == "__main__":
+    build_and_save_graph(
+        '../raw/augmented_for_train.parquet',
+        '../raw/cards_data.csv',
+        '../raw/transaction_graph',
+        ENCODING_REGISTRY_PATH
+    )
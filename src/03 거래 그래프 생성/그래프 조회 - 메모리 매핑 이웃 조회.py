@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.graph_store import GraphStore
+
+def inspect_graph(graph_dir, n_samples=1000, k=2, random_state=42):
+    """
+    저장된 그래프를 memmap으로 열고 이웃 조회 / 시각 기준 필터 / k-hop 추출 시간을 출력
+
+    Args:
+        graph_dir (str): 그래프 저장 디렉터리
+        n_samples (int): 조회할 카드 노드 수
+        k (int): k-hop 단계 수
+        random_state (int): 카드 노드 샘플링 시드
+    """
+    start_time = time.perf_counter()
+    store = GraphStore(graph_dir)
+    print(f"그래프 열기 완료 ({(time.perf_counter() - start_time) * 1000:.2f}ms)")
+    for node_type, count in store.num_nodes.items():
+        print(f"   > {node_type} 노드: {count:,}개")
+
+    pays = store['card__pays__merchant']
+    rng = np.random.default_rng(random_state)
+    cards = rng.choice(store.num_nodes['card'], size=min(n_samples, store.num_nodes['card']), replace=False)
+
+    # 기준 시각: 거래 시각의 중앙값
+    timestamps = pays['timestamp']
+    before = int(np.median(timestamps[rng.integers(0, len(timestamps), size=10_000)]))
+
+    start_time = time.perf_counter()
+    n_edges = sum(len(pays.neighbors(card)) for card in cards)
+    elapsed = time.perf_counter() - start_time
+    print(f"카드별 이웃 조회: {len(cards):,}건, 간선 {n_edges:,}개 ({elapsed / len(cards) * 1e6:.1f}us/건)")
+
+    start_time = time.perf_counter()
+    degrees = pays.degree(cards, before=before)
+    elapsed = time.perf_counter() - start_time
+    print(f"시각 기준 차수 (일괄): 간선 {degrees.sum():,}개 ({elapsed * 1000:.2f}ms)")
+
+    start_time = time.perf_counter()
+    nodes, edges = store.k_hop({'card': cards[:1]}, k, before=before)
+    elapsed = time.perf_counter() - start_time
+    print(f"{k}-hop 서브그래프 ({elapsed * 1000:.2f}ms)")
+    for node_type, ids in nodes.items():
+        print(f"   > {node_type} 노드: {len(ids):,}개")
+    for name, (src, _, _) in edges.items():
+        print(f"   > {name} 간선: {len(src):,}개")
+
+
+if __name__ == "__main__":
+    inspect_graph('../raw/transaction_graph')
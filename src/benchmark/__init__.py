@@ -0,0 +1 @@
+"""파이프라인 단계 / 온라인 특성 조립 성능 측정용 합성 데이터 생성기와 측정 도구"""
@@ -0,0 +1,260 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from common.pipeline import PeakRSSMonitor, load_script, find_script
+from common.parsing import load_users, load_cards
+from common.validity import ValidityIndex
+from common.augmentation import normalize_transactions, augment_fraud, pad_fraud
+from common.undersampling import knn_undersample
+from .synthetic import generate_dataset
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PREPROCESS_DIR = os.path.join(SRC_DIR, '01 초기 데이터 전처리')
+
+RESULT_VERSION = 1
+
+
+class StageTimer:
+    """
+    단계별 수행 시간/최대 RSS 기록
+    단계 출력(print)은 verbose가 아니면 버퍼에 모아 두고, 단계가 None을 반환하면 버퍼 끝부분과 함께 예외 발생
+    """
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.records = {}
+
+    def run(self, name, func, *args, rows_in=None, **kwargs):
+        buffer = io.StringIO()
+        redirect = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(buffer)
+        with redirect, PeakRSSMonitor() as monitor:
+            rss_before = monitor.peak
+            start_time = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds = time.perf_counter() - start_time
+        if result is None:
+            raise RuntimeError(f"[{name}] 단계가 결과를 반환하지 않았습니다:\n{buffer.getvalue()[-2000:]}")
+
+        out = result[0] if isinstance(result, tuple) else result
+        self.records[name] = {
+            'seconds': round(seconds, 4),
+            'peak_rss_mb': round(monitor.peak / 2 ** 20, 1),
+            'rss_before_mb': round(rss_before / 2 ** 20, 1),
+            'rows_in': rows_in,
+            'rows_out': len(out) if hasattr(out, '__len__') else None,
+        }
+        record = self.records[name]
+        print(f"  [{name}] {record['seconds']:.2f}초, 최대 RSS {record['peak_rss_mb']:,.1f}MB, "
+              f"행 {rows_in if rows_in is not None else '-'} → {record['rows_out']}")
+        return result
+
+
+def _augment(df, location_file, mcc_codes_file, window_size=5, stride=1, amount_noise_rate=0.1,
+             date_noise_min=-30, date_noise_max=30, random_state=42):
+    """증강 단계 중 KNN 언더샘플링 전까지 (정규화 → 유효성 검사 → 윈도우 증강 → 부족분 복제)"""
+    df = normalize_transactions(df)
+    is_valid = ValidityIndex.from_reference(location_file, mcc_codes_file).is_valid(df)
+    aug_fraud_df, orig_fraud_count, _ = augment_fraud(
+        df, is_valid, window_size=window_size, stride=stride, amount_noise_rate=amount_noise_rate,
+        date_noise_min=date_noise_min, date_noise_max=date_noise_max, random_state=random_state
+    )
+    return pad_fraud(aug_fraud_df, orig_fraud_count, random_state=random_state), df
+
+
+def run_stages(files, verbose=False, random_state=42):
+    """
+    합성 원본 파일로 파이프라인 단계 함수를 순서대로 실행하며 단계별 시간/최대 RSS 측정
+    - label: prepare_transaction_data / clean: preprocess_and_clean_data
+    - join: join_and_balance (join_csv_and_balance가 파일을 읽은 뒤 호출하는 함수)
+    - features: build_extra_features (make_extra_features가 호출하는 함수)
+    - augment: 정규화 → 유효성 검사 → 사기 거래 윈도우 증강 (augment_for_train의 KNN 전 단계)
+    - knn_undersample: 증강 사기 거래 x9 목표의 정상 거래 KNN 언더샘플링
+    다음 단계에 필요 없는 데이터는 바로 해제 (최대 RSS에는 아직 들고 있는 이전 단계 결과가 포함됨)
+
+    Args:
+        files (dict): generate_dataset 결과의 files (파일 이름 → 경로)
+        verbose (bool): True면 단계 스크립트 출력 표시
+        random_state (int): 증강/샘플링 시드
+
+    Returns:
+        dict: 단계 이름 → seconds, peak_rss_mb, rss_before_mb, rows_in, rows_out
+    """
+    label_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리01'))
+    clean_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리02'))
+    join_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리03'))
+    features_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리04'))
+    timer = StageTimer(verbose)
+
+    labeled_df = timer.run('label', label_module.prepare_transaction_data, files['transactions_data.csv'],
+                           files['sorted_fraud.csv'], files['mcc_codes.json'], None)
+    clean_df = timer.run('clean', clean_module.preprocess_and_clean_data, labeled_df, rows_in=len(labeled_df))
+    del labeled_df
+
+    joined_df = timer.run('join', join_module.join_and_balance, clean_df, load_users(files['users_data.csv']),
+                          load_cards(files['cards_data.csv']), rows_in=len(clean_df))
+    features_df = timer.run('features', features_module.build_extra_features, joined_df, rows_in=len(joined_df))
+    del joined_df, features_df
+
+    aug_fraud_df, normal_source = timer.run('augment', _augment, clean_df, files['location_data_with_geo_final.csv'],
+                                            files['mcc_codes.json'], random_state=random_state,
+                                            rows_in=len(clean_df))
+    del clean_df
+    normal_df = normal_source[normal_source['fraud'] == 0]
+    del normal_source
+    timer.run('knn_undersample', knn_undersample, normal_df, aug_fraud_df, len(aug_fraud_df) * 9,
+              random_state=random_state, rows_in=len(normal_df))
+    return timer.records
+
+
+def git_commit(path=SRC_DIR):
+    """현재 git 커밋 해시 (git 저장소가 아니면 None)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=path, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info():
+    """결과 비교 시 참고할 실행 환경 (커밋, 버전, CPU 수)"""
+    return {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmark(sizes, work_dir, seed=42, fraud_rate=0.0015, chunksize=1_000_000, verbose=False):
+    """
+    규모별 합성 데이터를 만들고(이미 있으면 재사용) 단계별 시간/최대 RSS 측정
+
+    Args:
+        sizes (tuple): 거래 수 목록 (예: 1e5 ~ 1e8)
+        work_dir (str): 합성 데이터 디렉터리 (규모별 하위 디렉터리 synthetic_<행 수>)
+        seed (int): 합성 데이터/증강 시드
+        fraud_rate (float): 사기 거래 비율
+        chunksize (int): 합성 데이터 생성 청크 행 수
+        verbose (bool): True면 단계 스크립트 출력 표시
+
+    Returns:
+        dict: version, environment, runs(거래 수 문자열 → dataset, stages)
+    """
+    result = {'version': RESULT_VERSION, 'environment': environment_info(), 'runs': {}}
+    for n_rows in sizes:
+        n_rows = int(n_rows)
+        print(f"합성 데이터 {n_rows:,}건")
+        manifest = generate_dataset(os.path.join(work_dir, f"synthetic_{n_rows}"), n_rows, fraud_rate=fraud_rate,
+                                    chunksize=chunksize, seed=seed)
+        print(f"  생성: {manifest['elapsed_sec']:.1f}초 (사기 {manifest['fraud']:,}건 / 라벨 {manifest['labeled']:,}건)")
+        stages = run_stages(manifest['files'], verbose=verbose, random_state=seed)
+        result['runs'][str(n_rows)] = {
+            'dataset': {key: value for key, value in manifest.items() if key != 'files'},
+            'stages': stages,
+        }
+    return result
+
+
+def save_result(result, path):
+    """
+    측정 결과를 JSON으로 저장
+
+    Args:
+        result (dict): run_benchmark 결과
+        path (str): 저장 경로
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def load_result(path):
+    """
+    저장된 측정 결과 로드
+
+    Args:
+        path (str): JSON 경로
+
+    Returns:
+        dict: run_benchmark 결과
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, time_tolerance=0.2, memory_tolerance=0.2, min_seconds=0.5, min_mb=50.0):
+    """
+    두 측정 결과의 같은 규모/단계를 비교해 성능 저하 판정
+    시간은 비율이 1 + time_tolerance를 넘고 차이가 min_seconds 이상일 때, 메모리는 비율과 min_mb 기준으로 저하
+
+    Args:
+        baseline (dict): 기준 결과 (이전 커밋)
+        current (dict): 현재 결과
+        time_tolerance (float): 허용 시간 증가 비율
+        memory_tolerance (float): 허용 최대 RSS 증가 비율
+        min_seconds (float): 저하로 볼 최소 시간 차이 (짧은 단계의 측정 오차 제외)
+        min_mb (float): 저하로 볼 최소 메모리 차이
+
+    Returns:
+        pd.DataFrame: rows, stage, metric, baseline, current, ratio, regression (양쪽에 모두 있는 항목만)
+    """
+    checks = (('seconds', time_tolerance, min_seconds), ('peak_rss_mb', memory_tolerance, min_mb))
+    rows = []
+    for n_rows, run in current['runs'].items():
+        base_run = baseline['runs'].get(n_rows)
+        if base_run is None:
+            continue
+        if base_run['dataset'].get('params') != run['dataset'].get('params'):
+            print(f"경고: {n_rows}건 합성 데이터 파라미터가 달라 비교 결과가 정확하지 않을 수 있습니다.")
+        for stage, record in run['stages'].items():
+            base_record = base_run['stages'].get(stage)
+            if base_record is None:
+                continue
+            for metric, tolerance, min_delta in checks:
+                base_value, value = base_record[metric], record[metric]
+                ratio = value / base_value if base_value else float('inf')
+                rows.append({
+                    'rows': int(n_rows), 'stage': stage, 'metric': metric,
+                    'baseline': base_value, 'current': value, 'ratio': round(ratio, 3),
+                    'regression': ratio > 1 + tolerance and value - base_value >= min_delta,
+                })
+    return pd.DataFrame(rows, columns=['rows', 'stage', 'metric', 'baseline', 'current', 'ratio', 'regression'])
+
+
+def print_comparison(comparison, baseline, current):
+    """
+    compare_results 결과 출력
+
+    Args:
+        comparison (pd.DataFrame): compare_results 결과
+        baseline (dict): 기준 결과
+        current (dict): 현재 결과
+
+    Returns:
+        bool: 성능 저하 항목이 있으면 True
+    """
+    print(f"\n비교: {baseline['environment'].get('commit')} → {current['environment'].get('commit')}")
+    if comparison.empty:
+        print("비교할 공통 항목이 없습니다.")
+        return False
+    print(comparison.to_string(index=False))
+    regressions = comparison[comparison['regression']]
+    if len(regressions):
+        print(f"\n성능 저하 {len(regressions)}건:")
+        for row in regressions.itertuples():
+            print(f"  {row.rows:,}건 {row.stage} {row.metric}: {row.baseline} → {row.current} ({row.ratio:.2f}배)")
+        return True
+    print("\n성능 저하 없음")
+    return False
@@ -0,0 +1,172 @@
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.pipeline import load_script, find_script
+from common.parsing import load_users, load_cards
+from common.encoding import EncodingRegistry
+from common.importance import encode_features
+from common.geo import GeocodeIndex, GeoFeatureBuilder, GEO_FEATURE_COLS
+from common.scoring import OnlineFeatureAssembler
+from .harness import PREPROCESS_DIR
+
+# 원본 거래 CSV를 온라인 입력(dict)으로 읽을 때 문자열 그대로 유지 (빈 값도 '' 그대로)
+RAW_READ_OPTIONS = {'dtype': str, 'keep_default_na': False}
+
+
+def batch_features(files, verbose=False):
+    """
+    배치 경로(전처리01 → 02 → 03 join_and_balance → 04 build_extra_features → encode_features)로 모델 입력 생성
+
+    Args:
+        files (dict): generate_dataset 결과의 files (파일 이름 → 경로)
+        verbose (bool): True면 단계 스크립트 출력 표시
+
+    Returns:
+        dict: ids(학습 행 거래 id), X(특성 행렬), feature_names, registry(학습 어휘),
+              clean_df(결측치 처리된 전체 거래)
+    """
+    label_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리01'))
+    clean_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리02'))
+    join_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리03'))
+    features_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리04'))
+
+    redirect = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with redirect:
+        labeled_df = label_module.prepare_transaction_data(files['transactions_data.csv'], files['sorted_fraud.csv'],
+                                                           files['mcc_codes.json'], None)
+        clean_df = clean_module.preprocess_and_clean_data(labeled_df)
+        del labeled_df
+        joined_df = join_module.join_and_balance(clean_df, load_users(files['users_data.csv']),
+                                                 load_cards(files['cards_data.csv']))
+        ids = joined_df['id'].to_numpy()
+        features_df = features_module.build_extra_features(joined_df)
+    registry = EncodingRegistry()
+    X, _, feature_names = encode_features(features_df, registry)
+    return {'ids': ids, 'X': X, 'feature_names': feature_names, 'registry': registry, 'clean_df': clean_df}
+
+
+def raw_transactions(transactions_file, ids=None):
+    """
+    원본 거래 CSV를 온라인 입력 형식(행별 dict, 값은 원본 문자열)으로 읽음
+
+    Args:
+        transactions_file (str): transactions_data.csv 경로
+        ids (array-like, optional): 남길 거래 id (파일 순서 유지)
+
+    Returns:
+        list: 거래 dict 목록
+    """
+    raw_df = pd.read_csv(transactions_file, **RAW_READ_OPTIONS)
+    if ids is not None:
+        raw_df = raw_df[raw_df['id'].astype(np.int64).isin(ids)]
+    return raw_df.to_dict('records')
+
+
+def _compare(expected, actual, names, rtol, atol):
+    """컬럼별 불일치 행 수 (NaN끼리는 같은 값으로 취급)"""
+    close = np.isclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+    mismatches = {name: int((~close[:, i]).sum()) for i, name in enumerate(names) if not close[:, i].all()}
+    with np.errstate(invalid='ignore'):
+        diff = np.abs(actual.astype(np.float64) - expected.astype(np.float64))
+    max_diff = float(np.nanmax(np.where(close, 0.0, diff))) if diff.size else 0.0
+    return mismatches, max_diff
+
+
+def check_parity(files, max_cards=None, rtol=1e-5, atol=1e-4, verbose=False):
+    """
+    온라인 조립기와 배치 경로의 모델 입력/위치 특성 비교
+    - 결측치 처리 후 남는 거래(사기 라벨이 있는 거래)를 원본 CSV 형식 그대로 파일 순서대로 조립기에 넣음
+    - 배치 경로가 학습 행으로 고른 거래의 벡터를 encode_features 결과와 비교
+    - 위치 특성은 전체 거래를 GeoFeatureBuilder(GeocodeIndex) 결과와 비교
+    - 실수 특성은 누적합/직접 합 등 계산 순서 차이만 허용 (rtol, atol)
+
+    Args:
+        files (dict): generate_dataset 결과의 files
+        max_cards (int, optional): 카드 상태 캐시 상한 (기본: 카드 수, 삭제 없이 비교)
+        rtol (float): 상대 허용 오차
+        atol (float): 절대 허용 오차
+        verbose (bool): True면 단계 스크립트 출력 표시
+
+    Returns:
+        dict: rows(비교 학습 행 수), transactions(조립 거래 수), feature_columns_match, mismatches(컬럼 → 행 수),
+              max_abs_diff, geo_mismatches, geo_max_abs_diff, cache(카드 상태 캐시 통계), passed,
+              registry(배치 경로 학습 어휘, 지연 시간 측정용 조립기 생성에 사용)
+    """
+    batch = batch_features(files, verbose)
+    clean_df = batch.pop('clean_df')
+    users_df, cards_df = load_users(files['users_data.csv']), load_cards(files['cards_data.csv'])
+    geocode = GeocodeIndex.from_file(files['location_data_with_geo_final.csv'])
+    assembler = OnlineFeatureAssembler(users_df, cards_df, batch['registry'], geocode=geocode,
+                                       feature_names=batch['feature_names'],
+                                       max_cards=max_cards or max(len(cards_df), 1))
+
+    transactions = raw_transactions(files['transactions_data.csv'], clean_df['id'].to_numpy())
+    row_of = dict(zip(batch['ids'].tolist(), range(len(batch['ids']))))
+    online_X = np.full(batch['X'].shape, np.nan, dtype=np.float32)
+    online_geo = np.empty((len(transactions), len(GEO_FEATURE_COLS)), dtype=np.float32)
+    for i, transaction in enumerate(transactions):
+        record = assembler.features(transaction)
+        online_geo[i] = [record[col] for col in GEO_FEATURE_COLS]
+        row = row_of.get(int(transaction['id']))
+        if row is not None:
+            online_X[row] = assembler.encode(record)
+
+    mismatches, max_diff = _compare(batch['X'], online_X, batch['feature_names'], rtol, atol)
+    batch_geo = GeoFeatureBuilder(geocode, users_df).transform(clean_df).to_numpy(np.float32)
+    geo_mismatches, geo_max_diff = _compare(batch_geo, online_geo, GEO_FEATURE_COLS, rtol, atol)
+    columns_match = batch['feature_names'] == assembler.feature_names
+    return {
+        'rows': len(batch['ids']),
+        'transactions': len(transactions),
+        'feature_columns_match': columns_match,
+        'mismatches': mismatches,
+        'max_abs_diff': max_diff,
+        'geo_mismatches': geo_mismatches,
+        'geo_max_abs_diff': geo_max_diff,
+        'cache': assembler.cards.stats(),
+        'passed': columns_match and not mismatches and not geo_mismatches,
+        'registry': batch['registry'],
+    }
+
+
+def measure_latency(assembler, transactions, warmup=1_000):
+    """
+    거래 하나씩 assemble 호출 지연 시간 측정 (앞의 warmup건은 범주형 코드 캐시/카드 상태 준비용으로 제외)
+
+    Args:
+        assembler (OnlineFeatureAssembler): 조립기
+        transactions (list): 원본 거래 dict 목록 (시각 순)
+        warmup (int): 측정에서 제외할 앞쪽 거래 수
+
+    Returns:
+        dict: count, mean_us, p50_us, p90_us, p99_us, p999_us, max_us, per_sec, cache
+    """
+    assemble = assembler.assemble
+    for transaction in transactions[:warmup]:
+        assemble(transaction)
+
+    measured = transactions[warmup:]
+    elapsed = np.empty(len(measured), dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i, transaction in enumerate(measured):
+        start = clock()
+        assemble(transaction)
+        elapsed[i] = clock() - start
+
+    micros = elapsed / 1e3
+    p50, p90, p99, p999 = np.percentile(micros, [50, 90, 99, 99.9]) if len(micros) else (np.nan,) * 4
+    return {
+        'count': len(micros),
+        'mean_us': round(float(micros.mean()), 1) if len(micros) else None,
+        'p50_us': round(float(p50), 1),
+        'p90_us': round(float(p90), 1),
+        'p99_us': round(float(p99), 1),
+        'p999_us': round(float(p999), 1),
+        'max_us': round(float(micros.max()), 1) if len(micros) else None,
+        'per_sec': round(len(micros) / (micros.sum() / 1e6)) if len(micros) else None,
+        'cache': assembler.cards.stats(),
+    }
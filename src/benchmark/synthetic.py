@@ -0,0 +1,414 @@
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+
+from common.zip_codes import US_STATES, COUNTRY_ZIP_MAP
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data')
+MCC_CODES_PATH = os.path.join(DATA_DIR, 'mcc_codes.json')
+LOCATION_REF_PATH = os.path.join(DATA_DIR, '좌표 변환 기록 파일', 'location_data_with_geo_final.csv')
+
+MANIFEST_NAME = 'synthetic_manifest.json'
+
+# 실제 데이터 기준 비율 (거래 약 1,330만 건 / 고객 2,000명 / 카드 약 6,100장, 라벨은 약 67% 거래에만 존재)
+ROWS_PER_USER = 6_650
+ROWS_PER_MERCHANT = 130
+FIRST_TRANSACTION_ID = 7_475_327
+DATE_START, DATE_END = np.datetime64('2010-01-01T00:00', 's'), np.datetime64('2019-10-31T23:59', 's')
+
+# 행 종류별 사기 가중치 (실제 사기 거래는 온라인 약 65%, 해외 약 25%)
+KIND_US, KIND_ONLINE, KIND_FOREIGN = 0, 1, 2
+FRAUD_KIND_WEIGHTS = np.array([1.0, 30.0, 150.0])
+
+ERROR_VALUES = ['Insufficient Balance', 'Bad CVV', 'Bad PIN', 'Bad Card Number', 'Bad Expiration',
+                'Technical Glitch', 'Bad Zipcode', 'Bad CVV,Insufficient Balance', 'Bad PIN,Technical Glitch']
+ERROR_WEIGHTS = np.array([169, 139, 112, 59, 54, 31, 10, 2, 1], dtype=np.float64)
+# errors 필드 (0번은 빈 값, 쉼표가 든 값은 따옴표로 감쌈) / use_chip 필드 (0: Swipe, 1: Chip, 2: Online)
+ERROR_TEXT = np.array([b''] + [f'"{value}"' if ',' in value else value for value in ERROR_VALUES], dtype='S')
+USE_CHIP_TEXT = np.array([b'Swipe Transaction', b'Chip Transaction', b'Online Transaction'])
+
+TRANSACTION_COLUMNS = ['id', 'date', 'client_id', 'card_id', 'amount', 'use_chip', 'merchant_id', 'merchant_city',
+                       'merchant_state', 'zip', 'mcc', 'errors']
+
+
+def load_location_pool(location_file=LOCATION_REF_PATH, seed=0):
+    """
+    가맹점/고객 위치로 쓸 (zip, merchant_state, merchant_city, latitude, longitude) 목록
+    위치 기준 파일이 있으면 그대로 사용하고, 없으면 미국 주/해외 국가 이름으로 만든 가상 위치 사용
+
+    Args:
+        location_file (str): 위치 기준 파일 경로 (data/좌표 변환 기록 파일)
+        seed (int): 가상 위치 생성 시드
+
+    Returns:
+        pd.DataFrame: 위치 목록 (ONLINE 행 포함, 합성 데이터의 위치 기준 파일로도 저장)
+    """
+    if location_file is not None and os.path.exists(location_file):
+        return pd.read_csv(location_file, dtype={'zip': str})
+
+    rng = np.random.default_rng(seed)
+    n_us = 2_000
+    states = np.array(US_STATES)[rng.integers(0, len(US_STATES), size=n_us)]
+    us = pd.DataFrame({
+        'zip': np.char.zfill(rng.choice(np.arange(501, 99950), size=n_us, replace=False).astype(str), 5),
+        'merchant_state': states,
+        'merchant_city': [f"City {i}" for i in range(n_us)],
+        'latitude': rng.uniform(25.0, 48.0, size=n_us).round(6),
+        'longitude': rng.uniform(-124.0, -67.0, size=n_us).round(6),
+    })
+    countries = list(COUNTRY_ZIP_MAP)[:20]
+    foreign = pd.DataFrame({
+        'zip': [COUNTRY_ZIP_MAP[c] for c in countries],
+        'merchant_state': [c.title() for c in countries],
+        'merchant_city': [f"{c.title()} City" for c in countries],
+        'latitude': rng.uniform(-40.0, 60.0, size=len(countries)).round(6),
+        'longitude': rng.uniform(-120.0, 140.0, size=len(countries)).round(6),
+    })
+    online = pd.DataFrame({'zip': ['00000'], 'merchant_state': ['ONLINE'], 'merchant_city': ['ONLINE'],
+                           'latitude': [-1.0], 'longitude': [-1.0]})
+    return pd.concat([us, online, foreign], ignore_index=True)
+
+
+def _money(values, decimals=0):
+    """금액을 원본 CSV 형식 문자열로 ('$29,237 ', 소수 자리 지정 가능)"""
+    return [f"${value:,.{decimals}f} " for value in values]
+
+
+def make_users(n_users, us_locations, rng):
+    """
+    users_data.csv와 같은 컬럼/형식의 고객 데이터 (id는 섞인 순서, 금액은 '$29,237 ' 형식)
+
+    Args:
+        n_users (int): 고객 수
+        us_locations (pd.DataFrame): 미국 위치 목록 (거주지 좌표)
+        rng (np.random.Generator): 난수 생성기
+
+    Returns:
+        tuple: (고객 데이터, 고객별 거주 주 np.ndarray)
+    """
+    age = rng.integers(18, 102, size=n_users)
+    home = us_locations.iloc[rng.integers(0, len(us_locations), size=n_users)]
+    yearly_income = np.round(rng.lognormal(10.7, 0.45, size=n_users))
+    streets = np.array(['Plum Avenue', 'Burns Lane', 'Forest Avenue', 'Oak Street', 'Elm Drive', 'Lake Boulevard',
+                        'Hill Road', 'Maple Lane', 'Cedar Street', 'Wessex Avenue'])
+    users = pd.DataFrame({
+        'id': rng.permutation(n_users),
+        'current_age': age,
+        'retirement_age': rng.integers(50, 80, size=n_users),
+        'birth_year': 2019 - age,
+        'birth_month': rng.integers(1, 13, size=n_users),
+        'gender': rng.choice(['Male', 'Female'], size=n_users),
+        'address': [f"{num} {street}" for num, street in
+                    zip(rng.integers(1, 10_000, size=n_users), streets[rng.integers(0, len(streets), size=n_users)])],
+        'latitude': home['latitude'].to_numpy().round(2),
+        'longitude': home['longitude'].to_numpy().round(2),
+        'per_capita_income': _money(np.round(yearly_income * rng.uniform(0.4, 0.6, size=n_users))),
+        'yearly_income': _money(yearly_income),
+        'total_debt': _money(np.round(yearly_income * rng.uniform(0.0, 2.5, size=n_users))),
+        'credit_score': rng.integers(480, 851, size=n_users),
+        'num_credit_cards': 0,
+    })
+    return users, home['merchant_state'].to_numpy().astype(str)
+
+
+def make_cards(users, rng):
+    """
+    cards_data.csv와 같은 컬럼/형식의 카드 데이터 (고객당 1~9장, 고객의 num_credit_cards도 함께 채움)
+
+    Args:
+        users (pd.DataFrame): make_users 결과 (num_credit_cards를 수정)
+        rng (np.random.Generator): 난수 생성기
+
+    Returns:
+        pd.DataFrame: 카드 데이터 (id는 섞인 순서)
+    """
+    n_cards_per_user = np.minimum(rng.poisson(2.1, size=len(users)) + 1, 9)
+    users['num_credit_cards'] = n_cards_per_user
+    client_id = np.repeat(users['id'].to_numpy(), n_cards_per_user)
+    n_cards = len(client_id)
+    expires = rng.integers(2020, 2025, size=n_cards)
+    opened = rng.integers(1991, 2020, size=n_cards)
+    return pd.DataFrame({
+        'id': rng.permutation(n_cards),
+        'client_id': client_id,
+        'card_brand': rng.choice(['Mastercard', 'Visa', 'Amex', 'Discover'], size=n_cards, p=[0.52, 0.38, 0.07, 0.03]),
+        'card_type': rng.choice(['Debit', 'Credit', 'Debit (Prepaid)'], size=n_cards, p=[0.58, 0.33, 0.09]),
+        'card_number': rng.integers(4_000_000_000_000_000, 6_000_000_000_000_000, size=n_cards, dtype=np.int64),
+        'expires': [f"{month:02d}/{year}" for month, year in zip(rng.integers(1, 13, size=n_cards), expires)],
+        'cvv': rng.integers(0, 1000, size=n_cards),
+        'has_chip': rng.choice(['YES', 'NO'], size=n_cards, p=[0.89, 0.11]),
+        'num_cards_issued': rng.integers(1, 4, size=n_cards),
+        'credit_limit': _money(np.round(rng.lognormal(9.4, 0.8, size=n_cards))),
+        'acct_open_date': [f"{month:02d}/{year}" for month, year in zip(rng.integers(1, 13, size=n_cards), opened)],
+        'year_pin_last_changed': np.maximum(opened, rng.integers(2002, 2021, size=n_cards)),
+        'card_on_dark_web': 'No',
+    })
+
+
+def make_merchants(n_merchants, locations, mcc_pool, online_rate, foreign_rate, rng):
+    """
+    가맹점 목록: 가맹점마다 위치/MCC 고정, 종류(미국/온라인/해외)별로 정렬해 종류별 구간으로 선택
+
+    Args:
+        n_merchants (int): 가맹점 수
+        locations (pd.DataFrame): 위치 목록
+        mcc_pool (np.ndarray): MCC 코드 목록
+        online_rate (float): 온라인 거래 비율 (온라인 가맹점 수도 같은 비율)
+        foreign_rate (float): 해외 거래 비율
+        rng (np.random.Generator): 난수 생성기
+
+    Returns:
+        pd.DataFrame: kind, merchant_id, merchant_city, merchant_state, zip(float, 온라인/해외는 결측), mcc
+    """
+    is_us = locations['merchant_state'].isin(US_STATES).to_numpy()
+    is_online = (locations['merchant_city'] == 'ONLINE').to_numpy()
+    us_locations = locations[is_us]
+    foreign_locations = locations[~is_us & ~is_online]
+
+    n_online = max(int(n_merchants * online_rate), 1)
+    n_foreign = max(int(n_merchants * foreign_rate), 1) if len(foreign_locations) else 0
+    n_us = n_merchants - n_online - n_foreign
+    kind = np.repeat([KIND_US, KIND_ONLINE, KIND_FOREIGN], [n_us, n_online, n_foreign])
+
+    us_rows = us_locations.iloc[rng.integers(0, len(us_locations), size=n_us)]
+    foreign_rows = foreign_locations.iloc[rng.integers(0, max(len(foreign_locations), 1), size=n_foreign)]
+    city = np.concatenate([us_rows['merchant_city'].to_numpy(), np.full(n_online, 'ONLINE', dtype=object),
+                           foreign_rows['merchant_city'].to_numpy()])
+    state = np.concatenate([us_rows['merchant_state'].to_numpy(), np.full(n_online, np.nan, dtype=object),
+                            foreign_rows['merchant_state'].to_numpy()])
+    # 원본 거래 파일의 zip은 '58523.0' 형식 (온라인/해외는 빈 값)
+    zip_code = np.concatenate([us_rows['zip'].astype(float).to_numpy(), np.full(n_online + n_foreign, np.nan)])
+
+    return pd.DataFrame({
+        'kind': kind,
+        'merchant_id': rng.choice(np.arange(100_000), size=n_merchants, replace=n_merchants > 100_000),
+        'merchant_city': city,
+        'merchant_state': state,
+        'zip': zip_code,
+        'mcc': mcc_pool[(rng.zipf(1.2, size=n_merchants) - 1) % len(mcc_pool)],
+    })
+
+
+def csv_fields(df):
+    """
+    데이터프레임 행을 CSV 한 줄 문자열(줄 끝 제외)로 변환 (따옴표/결측 표기는 to_csv와 같음)
+    가맹점/카드처럼 여러 거래가 공유하는 필드 묶음을 미리 만들어 두고 행 번호로 가져다 쓰기 위한 용도
+
+    Args:
+        df (pd.DataFrame): 변환할 컬럼만 가진 데이터프레임
+
+    Returns:
+        np.ndarray: 행별 CSV 바이트 문자열
+    """
+    return np.array(df.to_csv(index=False, header=False, lineterminator='\n').encode('utf-8').split(b'\n')[:-1])
+
+
+def _join_lines(fields):
+    """필드 배열들을 쉼표로 이어 붙여 줄 끝까지 포함한 CSV 바이트로"""
+    line = fields[0]
+    for field in fields[1:]:
+        line = np.strings.add(np.strings.add(line, b','), field)
+    return b'\n'.join(line.tolist()) + b'\n' if len(line) else b''
+
+
+def make_transaction_chunk(rng, first_id, n_rows, date_range, card_text, card_weights, card_risk, card_state,
+                           merchant_text, merchant_cum, kind_bounds, state_merchants, fraud_rate, label_rate,
+                           online_rate, foreign_rate, error_rate, refund_rate, local_rate=0.8):
+    """
+    거래 청크 하나를 CSV 바이트로 생성 (date 오름차순, id 연속)
+    - 미국 결제는 local_rate 비율로 고객 거주 주의 가맹점에서 발생
+    - 사기 거래 확률 = fraud_rate x 행 종류 가중치 x 카드 위험도 (평균이 fraud_rate가 되도록 정규화)
+    - to_csv 대신 필드별 바이트 배열을 이어 붙여 기록 (가맹점/카드 필드는 미리 만든 문자열 사용)
+
+    Args:
+        rng (np.random.Generator): 청크 난수 생성기
+        first_id (int): 첫 거래 id
+        n_rows (int): 거래 수
+        date_range (tuple): 청크가 차지하는 시각 구간 (epoch 초 시작, 끝)
+        card_text (np.ndarray): 카드별 'client_id,card_id' 필드
+        card_weights (np.ndarray): 카드별 거래 빈도 (합 1)
+        card_risk (np.ndarray): 카드별 사기 위험도
+        card_state (np.ndarray): 카드 소유 고객의 거주 주 번호
+        merchant_text (np.ndarray): 가맹점별 'merchant_id,merchant_city,merchant_state,zip,mcc' 필드
+        merchant_cum (np.ndarray): 가맹점 인기도 누적 합
+        kind_bounds (np.ndarray): 종류별 가맹점 구간 경계
+        state_merchants (tuple): (주별 미국 가맹점 구간 경계, 주 순서로 정렬한 가맹점 위치)
+        fraud_rate, label_rate, online_rate, foreign_rate, error_rate, refund_rate (float): generate_dataset 참고
+        local_rate (float): 미국 결제 중 거주 주 가맹점 비율
+
+    Returns:
+        tuple: (거래 CSV 바이트, 사기 라벨 CSV 바이트(id,Status), 라벨 거래 수, 사기 거래 수)
+    """
+    start, end = date_range
+    seconds = np.sort(rng.integers(start, end, size=n_rows)) // 60 * 60
+    card_index = rng.choice(len(card_text), size=n_rows, p=card_weights)
+    kind = rng.choice([KIND_US, KIND_ONLINE, KIND_FOREIGN], size=n_rows,
+                      p=[1 - online_rate - foreign_rate, online_rate, foreign_rate])
+
+    # 종류별 가맹점 구간에서 인기도(누적 가중치)에 비례해 선택
+    lo, hi = kind_bounds[kind], kind_bounds[kind + 1]
+    cum_lo = np.where(lo > 0, merchant_cum[np.maximum(lo - 1, 0)], 0.0)
+    target = cum_lo + rng.random(n_rows) * (merchant_cum[hi - 1] - cum_lo)
+    merchant_index = np.minimum(np.searchsorted(merchant_cum, target, side='right'), hi - 1)
+    # 미국 결제 일부는 고객 거주 주의 가맹점으로
+    state_offsets, state_order = state_merchants
+    home_state = card_state[card_index]
+    n_local = state_offsets[home_state + 1] - state_offsets[home_state]
+    local = (kind == KIND_US) & (n_local > 0) & (rng.random(n_rows) < local_rate)
+    pick = state_offsets[home_state[local]] + (rng.random(local.sum()) * n_local[local]).astype(np.int64)
+    merchant_index[local] = state_order[pick]
+
+    # 금액: '$12.34', 환불은 '$-12.34'
+    cents = np.round(rng.lognormal(3.8, 1.1, size=n_rows) * 100).astype(np.int64)
+    refund = rng.random(n_rows) < refund_rate
+    amount_text = np.strings.add(np.where(refund, b'$-', b'$'), (cents // 100).astype('S'))
+    amount_text = np.strings.add(np.strings.add(amount_text, b'.'), np.strings.zfill((cents % 100).astype('S'), 2))
+
+    use_chip = np.where(kind == KIND_ONLINE, 2, (rng.random(n_rows) < 0.55).astype(np.int64))
+    error_index = np.zeros(n_rows, dtype=np.int64)
+    has_error = rng.random(n_rows) < error_rate
+    error_index[has_error] = 1 + rng.choice(len(ERROR_VALUES), size=has_error.sum(),
+                                            p=ERROR_WEIGHTS / ERROR_WEIGHTS.sum())
+
+    weight = FRAUD_KIND_WEIGHTS[kind] * card_risk[card_index]
+    fraud = rng.random(n_rows) < np.minimum(fraud_rate * weight / weight.mean(), 1.0)
+    labeled = rng.random(n_rows) < label_rate
+
+    ids = np.arange(first_id, first_id + n_rows, dtype=np.int64).astype('S')
+    dates = np.strings.replace(seconds.astype('datetime64[s]').astype('S'), b'T', b' ')
+    transactions = _join_lines([ids, dates, card_text[card_index], amount_text, USE_CHIP_TEXT[use_chip],
+                                merchant_text[merchant_index], ERROR_TEXT[error_index]])
+    labels = _join_lines([ids[labeled], np.where(fraud[labeled], b'Yes', b'No')])
+    return transactions, labels, int(labeled.sum()), int(fraud[labeled].sum())
+
+
+def _manifest_matches(output_dir, params):
+    """output_dir에 같은 파라미터로 만든 합성 데이터가 이미 있는지 확인"""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('params') != params:
+        return None
+    if not all(os.path.exists(file) for file in manifest.get('files', {}).values()):
+        return None
+    return manifest
+
+
+def generate_dataset(output_dir, n_rows, fraud_rate=0.0015, label_rate=0.67, online_rate=0.11, foreign_rate=0.01,
+                     error_rate=0.016, refund_rate=0.05, n_users=None, chunksize=1_000_000, seed=42,
+                     mcc_codes_file=MCC_CODES_PATH, location_file=LOCATION_REF_PATH, reuse=True):
+    """
+    원본과 같은 스키마의 합성 원본 파일 생성 (1e5 ~ 1e8행, 청크 단위로 써서 메모리는 청크 크기에 비례)
+    - transactions_data.csv: date 오름차순, amount '$12.34'/'$-12.34', zip '58523.0', 온라인/해외 결제는 zip 빈 값
+    - sorted_fraud.csv: 라벨이 있는 거래의 id, Status(Yes/No)
+    - users_data.csv / cards_data.csv: 원본과 같은 컬럼 및 금액/날짜 형식
+    - location_data_with_geo_final.csv / mcc_codes.json: 위치/MCC 기준 파일 (증강 단계 유효성 검사용)
+    같은 파라미터로 이미 생성된 파일이 있으면 다시 만들지 않음 (청크 크기가 다르면 결과도 다름)
+
+    Args:
+        output_dir (str): 생성 디렉터리
+        n_rows (int): 거래 수
+        fraud_rate (float): 라벨이 있는 거래 중 사기 거래 비율 (실제 데이터 약 0.15%)
+        label_rate (float): 사기 라벨이 있는 거래 비율
+        online_rate (float): 온라인(merchant_city 'ONLINE') 거래 비율
+        foreign_rate (float): 해외 결제 비율
+        error_rate (float): errors 값이 있는 거래 비율
+        refund_rate (float): 음수 금액(환불) 거래 비율
+        n_users (int, optional): 고객 수 (기본: 거래 6,650건당 1명, 최소 100명)
+        chunksize (int): 한 번에 생성할 거래 수
+        seed (int): 난수 시드
+        mcc_codes_file (str): MCC 코드 JSON 경로 (그대로 복사)
+        location_file (str): 위치 기준 파일 경로 (없으면 가상 위치 사용)
+        reuse (bool): 같은 파라미터의 기존 파일이 있으면 재사용
+
+    Returns:
+        dict: params, files(이름 → 경로), rows, users, cards, merchants, labeled, fraud, elapsed_sec
+    """
+    if n_users is None:
+        n_users = max(n_rows // ROWS_PER_USER, 100)
+    params = {'n_rows': n_rows, 'fraud_rate': fraud_rate, 'label_rate': label_rate, 'online_rate': online_rate,
+              'foreign_rate': foreign_rate, 'error_rate': error_rate, 'refund_rate': refund_rate,
+              'n_users': n_users, 'chunksize': chunksize, 'seed': seed}
+    if reuse:
+        manifest = _manifest_matches(output_dir, params)
+        if manifest is not None:
+            return manifest
+
+    start_time = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    files = {name: os.path.join(output_dir, name) for name in (
+        'transactions_data.csv', 'sorted_fraud.csv', 'users_data.csv', 'cards_data.csv',
+        'location_data_with_geo_final.csv', 'mcc_codes.json')}
+    n_chunks = max(-(-n_rows // chunksize), 1)
+    static_seed, *chunk_seeds = np.random.SeedSequence(seed).spawn(n_chunks + 1)
+    rng = np.random.default_rng(static_seed)
+
+    # 기준 파일: MCC 코드는 그대로 복사, 위치 목록은 가맹점/고객 위치로 쓰고 같은 내용을 저장
+    shutil.copyfile(mcc_codes_file, files['mcc_codes.json'])
+    with open(mcc_codes_file, 'r', encoding='utf-8') as f:
+        mcc_pool = rng.permutation(np.array(sorted(int(code) for code in json.load(f))))
+    locations = load_location_pool(location_file, seed)
+    locations.to_csv(files['location_data_with_geo_final.csv'], index=False)
+    us_locations = locations[locations['merchant_state'].isin(US_STATES)]
+
+    users, home_states = make_users(n_users, us_locations, rng)
+    cards = make_cards(users, rng)
+    users.to_csv(files['users_data.csv'], index=False)
+    cards.to_csv(files['cards_data.csv'], index=False)
+
+    # 카드별 거래 빈도(치우친 분포)와 사기 위험도, 소유 고객 거주 주
+    card_weights = rng.gamma(0.8, 1.0, size=len(cards))
+    card_weights /= card_weights.sum()
+    card_risk = rng.lognormal(0.0, 1.0, size=len(cards))
+    state_names = np.array(sorted(US_STATES))
+    user_state = pd.Series(np.searchsorted(state_names, home_states), index=users['id'])
+    card_state = user_state.loc[cards['client_id']].to_numpy()
+    card_text = csv_fields(cards[['client_id', 'id']])
+
+    n_merchants = min(max(n_rows // ROWS_PER_MERCHANT, 1_000), 100_000)
+    merchants = make_merchants(n_merchants, locations, mcc_pool, online_rate, foreign_rate, rng)
+    merchant_text = csv_fields(merchants[['merchant_id', 'merchant_city', 'merchant_state', 'zip', 'mcc']])
+    merchant_cum = np.cumsum(rng.lognormal(0.0, 1.5, size=n_merchants))
+    kind_bounds = np.searchsorted(merchants['kind'].to_numpy(), [KIND_US, KIND_ONLINE, KIND_FOREIGN, KIND_FOREIGN + 1])
+    us_merchants = np.flatnonzero(merchants['kind'].to_numpy() == KIND_US)
+    merchant_state = np.searchsorted(state_names, merchants['merchant_state'].to_numpy()[us_merchants].astype(str))
+    state_order = us_merchants[np.argsort(merchant_state, kind='stable')]
+    state_offsets = np.searchsorted(np.sort(merchant_state), np.arange(len(state_names) + 1))
+
+    start, end = DATE_START.astype(np.int64), DATE_END.astype(np.int64)
+    bounds = np.linspace(start, end, n_chunks + 1).astype(np.int64)
+    labeled = fraud = 0
+    with open(files['transactions_data.csv'], 'wb') as tx_file, open(files['sorted_fraud.csv'], 'wb') as label_file:
+        tx_file.write(','.join(TRANSACTION_COLUMNS).encode() + b'\n')
+        label_file.write(b'id,Status\n')
+        for chunk, chunk_seed in enumerate(chunk_seeds):
+            first = chunk * chunksize
+            transactions, labels, n_labeled, n_fraud = make_transaction_chunk(
+                np.random.default_rng(chunk_seed), FIRST_TRANSACTION_ID + first, min(chunksize, n_rows - first),
+                (bounds[chunk], bounds[chunk + 1]), card_text, card_weights, card_risk, card_state, merchant_text,
+                merchant_cum, kind_bounds, (state_offsets, state_order), fraud_rate, label_rate, online_rate,
+                foreign_rate, error_rate, refund_rate)
+            tx_file.write(transactions)
+            label_file.write(labels)
+            labeled += n_labeled
+            fraud += n_fraud
+
+    manifest = {
+        'params': params,
+        'files': files,
+        'rows': n_rows,
+        'users': len(users),
+        'cards': len(cards),
+        'merchants': n_merchants,
+        'labeled': labeled,
+        'fraud': fraud,
+        'elapsed_sec': round(time.perf_counter() - start_time, 3),
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
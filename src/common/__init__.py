@@ -0,0 +1 @@
+"""파이프라인 단계 스크립트들이 함께 사용하는 공통 모듈"""
@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+
+from .schema import TRANSACTIONS_SCHEMA, compact_frame
+from .tracing import span
+
+
+def sort_by_group(df, group_cols):
+    """
+    그룹 키 기준 안정 정렬 순서와 그룹 경계 계산 (그룹 내부의 원래 행 순서는 유지)
+
+    Args:
+        df (pd.DataFrame): 원본 데이터프레임
+        group_cols (list): 그룹 컬럼 목록 (예: ['client_id', 'card_id'])
+
+    Returns:
+        tuple:
+            order (np.ndarray): 정렬된 위치 → 원본 행 위치
+            group_start (np.ndarray): 정렬된 각 행이 속한 그룹의 시작 위치
+            group_end (np.ndarray): 정렬된 각 행이 속한 그룹의 끝 위치 (미포함)
+    """
+    group_codes = df.groupby(group_cols, sort=True).ngroup().to_numpy()
+    order = np.argsort(group_codes, kind='stable')
+    sorted_codes = group_codes[order]
+
+    n_rows = len(sorted_codes)
+    is_start = np.ones(n_rows, dtype=bool)
+    is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    starts = np.flatnonzero(is_start)
+    sizes = np.diff(np.append(starts, n_rows))
+
+    group_start = np.repeat(starts, sizes)
+    group_end = group_start + np.repeat(sizes, sizes)
+    return order, group_start, group_end
+
+
+def window_fraud_multiplicity(is_fraud, is_valid, group_start, group_end, window_size, stride):
+    """
+    슬라이딩 윈도우 증강 시 각 행이 복제되는 횟수 계산
+    - 윈도우: 그룹 시작부터 stride 간격으로 시작하는 window_size 길이 구간 (그룹 경계를 넘지 않음)
+    - 조건 충족 윈도우: 사기 거래가 1건 이상이고, 모든 행이 유효한 윈도우
+    - 사기 거래 행은 자신을 포함하는 조건 충족 윈도우 수만큼 복제됨
+
+    모든 입력은 그룹 정렬 순서 기준 배열이며, 누적합으로 윈도우별 합계를 한 번에 계산
+
+    Args:
+        is_fraud (np.ndarray): 사기 거래 여부 (bool)
+        is_valid (np.ndarray): 위치/MCC 유효 여부 (bool)
+        group_start (np.ndarray): 각 행이 속한 그룹의 시작 위치
+        group_end (np.ndarray): 각 행이 속한 그룹의 끝 위치 (미포함)
+        window_size (int): 윈도우 크기
+        stride (int): 윈도우 이동 간격
+
+    Returns:
+        np.ndarray: 행별 복제 횟수 (int64, 사기 거래가 아니면 0)
+    """
+    n_rows = len(is_fraud)
+    pos_in_group = np.arange(n_rows) - group_start
+
+    # 윈도우 시작 가능 위치: stride 간격이면서 윈도우가 그룹 안에 들어가는 위치
+    can_start = (pos_in_group % stride == 0) & (np.arange(n_rows) + window_size <= group_end)
+
+    fraud_cum = np.concatenate(([0], np.cumsum(is_fraud, dtype=np.int64)))
+    invalid_cum = np.concatenate(([0], np.cumsum(~is_valid, dtype=np.int64)))
+    win_end = np.minimum(np.arange(n_rows) + window_size, n_rows)
+    fraud_in_win = fraud_cum[win_end] - fraud_cum[:n_rows]
+    invalid_in_win = invalid_cum[win_end] - invalid_cum[:n_rows]
+
+    qualifies = can_start & (fraud_in_win > 0) & (invalid_in_win == 0)
+
+    # 행 i를 포함하는 윈도우 시작 위치: [i - window_size + 1, i]
+    qual_cum = np.concatenate(([0], np.cumsum(qualifies, dtype=np.int64)))
+    win_first = np.maximum(np.arange(n_rows) - window_size + 1, 0)
+    covering = qual_cum[1:] - qual_cum[win_first]
+
+    return np.where(is_fraud, covering, 0)
+
+
+def add_noise(df, rng, amount_noise_rate=0.1, date_noise_min=-30, date_noise_max=30):
+    """
+    amount / date 노이즈를 한 번의 난수 생성으로 일괄 적용
+    - amount: ±amount_noise_rate 비율, 0 미만은 0, 소수 둘째 자리 반올림
+    - date: date_noise_min ~ date_noise_max 분 시프트
+
+    Args:
+        df (pd.DataFrame): 노이즈를 적용할 데이터프레임 (복사본에 적용)
+        rng (np.random.Generator): 난수 생성기
+        amount_noise_rate (float): amount 노이즈 비율
+        date_noise_min (int): date 노이즈 최솟값(분)
+        date_noise_max (int): date 노이즈 최댓값(분)
+
+    Returns:
+        pd.DataFrame: 노이즈가 적용된 데이터프레임
+    """
+    df = df.copy()
+    amount_noise = rng.uniform(-amount_noise_rate, amount_noise_rate, size=len(df))
+    minute_noise = rng.integers(date_noise_min, date_noise_max + 1, size=len(df))
+
+    amount = df['amount'].to_numpy(dtype=float)
+    # 원래 dtype 유지 (float32 금액이면 원본 사기 거래와 중복 제거 비교가 같은 정밀도로 이뤄지도록)
+    df['amount'] = np.round(np.maximum(0, amount + amount * amount_noise), 2).astype(df['amount'].dtype)
+    df['date'] = df['date'] + pd.to_timedelta(minute_noise, unit='m')
+    return df
+
+
+def augment_fraud_windows(df, is_valid, window_size=5, stride=1, amount_noise_rate=0.1,
+                          date_noise_min=-30, date_noise_max=30, random_state=None,
+                          group_cols=('client_id', 'card_id')):
+    """
+    (client_id, card_id) 그룹별 슬라이딩 윈도우 사기 거래 증강 (배열 기반)
+    기존 iloc/iterrows 루프와 같은 규칙으로 복제 대상과 횟수를 구한 뒤,
+    복제된 행 전체에 amount/date 노이즈를 한 번에 적용
+
+    Args:
+        df (pd.DataFrame): 전체 거래 데이터 (fraud, amount, date 컬럼 포함)
+        is_valid (array-like): 행별 위치/MCC 유효 여부 (df와 같은 순서)
+        window_size (int): 윈도우 크기
+        stride (int): 윈도우 이동 간격
+        amount_noise_rate (float): amount 노이즈 비율
+        date_noise_min (int): date 노이즈 최솟값(분)
+        date_noise_max (int): date 노이즈 최댓값(분)
+        random_state (int or np.random.Generator, optional): 노이즈 난수 시드
+        group_cols (tuple): 그룹 컬럼
+
+    Returns:
+        pd.DataFrame: 노이즈가 적용된 증강 사기 거래 (원본 사기 거래는 포함하지 않음)
+    """
+    with span("윈도우 슬라이싱", rows_in=df) as sp:
+        order, group_start, group_end = sort_by_group(df, list(group_cols))
+
+        is_fraud = (df['fraud'].to_numpy() == 1)[order]
+        valid_sorted = np.asarray(is_valid, dtype=bool)[order]
+        multiplicity = window_fraud_multiplicity(is_fraud, valid_sorted, group_start, group_end,
+                                                 window_size, stride)
+
+        rows = order[np.repeat(np.arange(len(order)), multiplicity)]
+        augmented = df.iloc[rows].reset_index(drop=True)
+        sp.set_rows(rows_out=augmented)
+
+    with span("노이즈 변형", rows_in=augmented):
+        rng = np.random.default_rng(random_state)
+        return add_noise(augmented, rng, amount_noise_rate, date_noise_min, date_noise_max)
+
+
+def _pad_digits(col, width):
+    """숫자로만 된 값은 width 자리로 0 채움, 그 외 값은 앞뒤 공백 제거 (고유값 단위로 한 번만 변환, 결측은 그대로)"""
+    codes, uniques = pd.factorize(col)
+    strs = pd.Series(np.asarray(uniques), dtype=object).astype(str)
+    formatted = np.where(strs.str.isdigit(), strs.str.zfill(width), strs.str.strip()).astype(object)
+    formatted = np.append(formatted, np.nan)
+    return pd.Series(formatted[codes], index=col.index, name=col.name)
+
+
+def normalize_transactions(df):
+    """
+    증강 입력 형식으로 정규화: zip 5자리 / mcc 4자리 문자열, date datetime, mcc_type 제거
+
+    Args:
+        df (pd.DataFrame): 결측치 처리된 거래 데이터 (zip, mcc, date 컬럼은 직접 수정)
+
+    Returns:
+        pd.DataFrame: 정규화된 거래 데이터
+    """
+    with span("컬럼 정규화", rows_in=df):
+        df['zip'] = _pad_digits(df['zip'], 5)
+        df['mcc'] = _pad_digits(df['mcc'], 4)
+        df['date'] = pd.to_datetime(df['date'])
+        if 'mcc_type' in df.columns:
+            df = df.drop(columns=['mcc_type'])
+    return df
+
+
+def augment_fraud(df, is_valid, window_size=5, stride=1, amount_noise_rate=0.1,
+                  date_noise_min=-30, date_noise_max=30, random_state=None):
+    """
+    원본 사기 거래 + 슬라이딩 윈도우 증강 사기 거래 (중복 제거)
+    중복은 같은 카드 안에서만 생기므로 카드 단위로 나눈 샤드별로 계산해도 전체와 같은 행이 남음
+
+    Args:
+        df (pd.DataFrame): 거래 데이터 (normalize_transactions 결과)
+        is_valid (array-like): 행별 위치/MCC 유효 여부
+        window_size (int): 윈도우 크기
+        stride (int): 윈도우 이동 간격
+        amount_noise_rate (float): amount 노이즈 비율
+        date_noise_min (int): date 노이즈 최솟값(분)
+        date_noise_max (int): date 노이즈 최댓값(분)
+        random_state (int, np.random.SeedSequence or np.random.Generator, optional): 노이즈 난수 시드
+
+    Returns:
+        tuple: (원본 + 증강 사기 거래, 원본 사기 거래 수, 윈도우 증강 거래 수)
+    """
+    fraud_df = df[df['fraud'] == 1].copy()
+    augmented = augment_fraud_windows(
+        df, is_valid, window_size=window_size, stride=stride,
+        amount_noise_rate=amount_noise_rate, date_noise_min=date_noise_min, date_noise_max=date_noise_max,
+        random_state=random_state
+    )
+    with span("사기 거래 중복 제거", rows_in=len(fraud_df) + len(augmented)) as sp:
+        combined = pd.concat([fraud_df, augmented], ignore_index=True).drop_duplicates()
+        sp.set_rows(rows_out=combined)
+    return combined, len(fraud_df), len(augmented)
+
+
+def pad_fraud(aug_fraud_df, orig_fraud_count, min_ratio=4, random_state=None):
+    """
+    증강 사기 거래가 원본의 min_ratio배보다 적으면 복원 추출로 추가 복제
+
+    Args:
+        aug_fraud_df (pd.DataFrame): 원본 + 증강 사기 거래
+        orig_fraud_count (int): 원본 사기 거래 수
+        min_ratio (int): 원본 대비 최소 배수
+        random_state (int, optional): 추가 추출 시드
+
+    Returns:
+        pd.DataFrame: 추가 복제된 사기 거래
+    """
+    target_fraud = max(orig_fraud_count * min_ratio, len(aug_fraud_df))
+    if len(aug_fraud_df) < target_fraud:
+        with span("사기 거래 복제", rows_in=aug_fraud_df) as sp:
+            extra = aug_fraud_df.sample(target_fraud - len(aug_fraud_df), replace=True, random_state=random_state)
+            aug_fraud_df = pd.concat([aug_fraud_df, extra]).reset_index(drop=True)
+            sp.set_rows(rows_out=aug_fraud_df)
+    return aug_fraud_df
+
+
+# 학습용 데이터 컬럼 순서
+TRAIN_COLUMNS = [
+    'id', 'date', 'client_id', 'card_id', 'amount', 'use_chip', 'merchant_id', 'merchant_city',
+    'merchant_state', 'zip', 'mcc', 'errors', 'fraud'
+]
+
+
+def finalize_training_set(aug_fraud_df, normal_df, random_state=None):
+    """
+    사기 → 정상 순으로 id를 새로 부여하고 합쳐 섞은 학습용 데이터
+
+    Args:
+        aug_fraud_df (pd.DataFrame): 증강 사기 거래
+        normal_df (pd.DataFrame): 선택된 정상 거래
+        random_state (int, optional): 섞기 시드
+
+    Returns:
+        pd.DataFrame: TRAIN_COLUMNS 순서의 학습용 데이터 (거래 스키마 dtype)
+    """
+    aug_fraud_df = aug_fraud_df.copy()
+    normal_df = normal_df.copy()
+    aug_fraud_df['id'] = np.arange(1, len(aug_fraud_df) + 1)
+    normal_df['id'] = np.arange(len(aug_fraud_df) + 1, len(aug_fraud_df) + len(normal_df) + 1)
+
+    final_df = pd.concat([aug_fraud_df, normal_df], ignore_index=True)[TRAIN_COLUMNS]
+    final_df = final_df.sample(frac=1, random_state=random_state).reset_index(drop=True)
+    # 노이즈로 float64가 된 amount 등을 거래 스키마 dtype으로 (mcc는 정규화된 문자열 그대로)
+    return compact_frame(final_df, TRANSACTIONS_SCHEMA)
@@ -0,0 +1,138 @@
+import json
+import os
+import time
+
+from .storage import save_frame, load_frame
+
+
+class StageCache:
+    """
+    단계 출력 데이터프레임을 내용 주소(key = 노드 지문)로 보관하는 로컬 캐시
+    - 출력은 cache_dir/<key 앞 2자리>/<key>.parquet 에 저장
+    - index.json에 항목별 크기와 마지막 사용 시각을 기록하고,
+      총 크기/항목 수가 상한을 넘으면 가장 오래 쓰지 않은 항목부터 삭제 (LRU)
+    """
+
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, cache_dir, max_bytes=None, max_entries=None):
+        """
+        Args:
+            cache_dir (str): 캐시 디렉터리
+            max_bytes (int, optional): 캐시 총 크기 상한 (바이트)
+            max_entries (int, optional): 캐시 항목 수 상한
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.index_path = os.path.join(cache_dir, self.INDEX_NAME)
+        self.entries = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        # 파일이 지워진 항목은 인덱스에서도 제거
+        self.entries = {key: entry for key, entry in self.entries.items() if os.path.exists(self.path_for(key))}
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def total_bytes(self):
+        return sum(entry['size'] for entry in self.entries.values())
+
+    def path_for(self, key):
+        """
+        캐시 항목 파일 경로
+
+        Args:
+            key (str): 캐시 키 (16진수 해시)
+
+        Returns:
+            str: 파일 경로
+        """
+        return os.path.join(self.cache_dir, key[:2], key + '.parquet')
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def get(self, key):
+        """
+        캐시된 출력 로드 (사용 시각 갱신)
+
+        Args:
+            key (str): 캐시 키
+
+        Returns:
+            pd.DataFrame: 캐시된 출력 (없으면 None)
+        """
+        if key not in self.entries:
+            return None
+        df = load_frame(self.path_for(key))
+        self.entries[key]['last_access'] = time.time()
+        self._save_index()
+        return df
+
+    def put(self, key, df, stage=None):
+        """
+        출력 저장 후 상한을 넘으면 오래된 항목 삭제
+
+        Args:
+            key (str): 캐시 키
+            df (pd.DataFrame): 저장할 출력
+            stage (str, optional): 노드 이름 (기록용)
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 중간에 중단돼도 깨진 파일이 캐시 항목으로 남지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = path + '.tmp.parquet'
+        save_frame(df, tmp_path)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        self.entries[key] = {'stage': stage, 'size': os.path.getsize(path), 'created': now, 'last_access': now}
+        self.evict(keep=key)
+        self._save_index()
+
+    def evict(self, keep=None):
+        """
+        총 크기/항목 수가 상한 이하가 될 때까지 마지막 사용 시각이 오래된 항목부터 삭제
+
+        Args:
+            keep (str, optional): 삭제하지 않을 키 (방금 저장한 항목)
+
+        Returns:
+            list: 삭제된 키 목록
+        """
+        removed = []
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_access']):
+            over_bytes = self.max_bytes is not None and self.total_bytes > self.max_bytes
+            over_entries = self.max_entries is not None and len(self.entries) > self.max_entries
+            if not (over_bytes or over_entries):
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+            del self.entries[key]
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        """캐시 항목 전체 삭제"""
+        for key in list(self.entries):
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+        self.entries = {}
+        self._save_index()
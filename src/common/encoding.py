@@ -0,0 +1,176 @@
+import os
+import numpy as np
+import pandas as pd
+
+from .storage import save_frame, load_frame
+
+# 어휘에 없는 값 / 결측에 쓰는 예약 코드 (어휘 값은 1부터)
+UNKNOWN_CODE = 0
+CODE_DTYPE = np.int32
+
+
+def canonical_strings(values):
+    """
+    값 → 어휘 문자열 (정수인 float는 정수 문자열로 맞춰 5411과 5411.0, '5411'이 같은 값이 되도록 함, 결측은 None)
+
+    Args:
+        values (array-like): 고유값 배열 (행 전체가 아니라 factorize 결과에만 적용)
+
+    Returns:
+        np.ndarray: 문자열 배열 (object)
+    """
+    values = pd.Series(values, dtype=None if len(values) else object)
+    missing = values.isna().to_numpy()
+    if pd.api.types.is_float_dtype(values):
+        finite = values.to_numpy()[~missing]
+        if np.all(np.isfinite(finite) & (finite == np.trunc(finite))):
+            values = values.astype('Int64')
+    elif values.dtype == object:
+        values = values.map(lambda v: int(v) if isinstance(v, float) and v.is_integer() else v)
+    strings = values.astype(str).to_numpy(dtype=object)
+    strings[missing] = None
+    return strings
+
+
+class EncodingRegistry:
+    """
+    범주형 컬럼별 어휘(값 → 정수 코드)를 파일로 보관해 모든 단계가 같은 코드를 쓰도록 하는 레지스트리
+    - 처음 보는 컬럼은 고유값을 문자열 정렬 순서로 1부터 번호를 매김 (LabelEncoder 코드 + 1과 같은 순서)
+    - 이미 있는 컬럼에 새 값이 나오면 뒤에 이어 붙이므로 기존 값의 코드는 바뀌지 않음
+    - 변환은 factorize한 고유값만 문자열로 바꿔 조회하므로 행 전체에 astype(str)을 적용하지 않음
+    - 어휘에 없는 값과 결측은 UNKNOWN_CODE(0)
+    """
+
+    def __init__(self, vocabularies=None):
+        """
+        Args:
+            vocabularies (dict, optional): 컬럼 → 코드 순서의 어휘 문자열 목록 (코드 1부터)
+        """
+        self.vocabularies = {col: pd.Index(values, dtype=object) for col, values in (vocabularies or {}).items()}
+        self.changed = False
+
+    def __contains__(self, col):
+        return col in self.vocabularies
+
+    @property
+    def columns(self):
+        return list(self.vocabularies)
+
+    def size(self, col):
+        """컬럼의 코드 수 (예약 코드 포함)"""
+        return len(self.vocabularies[col]) + 1
+
+    def update(self, df, columns=None):
+        """
+        어휘에 없는 값을 추가 (없는 컬럼은 새로 생성)
+
+        Args:
+            df (pd.DataFrame): 범주형 컬럼을 가진 데이터
+            columns (list, optional): 대상 컬럼 (기본: df의 모든 컬럼, df에 없는 컬럼은 건너뜀)
+
+        Returns:
+            int: 새로 추가된 값 수
+        """
+        added = 0
+        for col in (df.columns if columns is None else columns):
+            if col not in df.columns:
+                continue
+            uniques = canonical_strings(pd.unique(df[col].dropna()))
+            vocab = self.vocabularies.get(col, pd.Index([], dtype=object))
+            new_values = np.unique(uniques[vocab.get_indexer(uniques) < 0].astype(str))
+            if col in self.vocabularies and len(new_values) == 0:
+                continue
+            self.vocabularies[col] = vocab.append(pd.Index(new_values, dtype=object))
+            self.changed = True
+            added += len(new_values)
+        return added
+
+    def encode(self, col, values):
+        """
+        값 → 정수 코드
+
+        Args:
+            col (str): 컬럼 이름
+            values (array-like): 변환할 값
+
+        Returns:
+            np.ndarray: 코드 (CODE_DTYPE, 어휘에 없는 값/결측은 UNKNOWN_CODE)
+        """
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        lookup = self.vocabularies[col].get_indexer(canonical_strings(uniques)) + 1
+        # 결측(-1)은 마지막 칸의 UNKNOWN_CODE로 조회
+        lookup = np.append(np.maximum(lookup, UNKNOWN_CODE), UNKNOWN_CODE).astype(CODE_DTYPE)
+        return lookup[codes]
+
+    def decode(self, col, codes):
+        """
+        정수 코드 → 어휘 문자열
+
+        Args:
+            col (str): 컬럼 이름
+            codes (array-like): 코드
+
+        Returns:
+            np.ndarray: 어휘 문자열 (UNKNOWN_CODE는 None)
+        """
+        values = np.concatenate([[None], self.vocabularies[col].to_numpy(dtype=object)])
+        return values[np.asarray(codes)]
+
+    def to_frame(self):
+        """
+        어휘 테이블 (column, code, value)
+
+        Returns:
+            pd.DataFrame: 컬럼별 코드 순서의 어휘
+        """
+        return pd.DataFrame({
+            'column': np.repeat(self.columns, [len(vocab) for vocab in self.vocabularies.values()]),
+            'code': np.concatenate([np.arange(1, len(vocab) + 1) for vocab in self.vocabularies.values()]
+                                   or [np.empty(0, dtype=np.int64)]).astype(CODE_DTYPE),
+            'value': np.concatenate([vocab.to_numpy(dtype=object) for vocab in self.vocabularies.values()]
+                                    or [np.empty(0, dtype=object)]),
+        })
+
+    @classmethod
+    def from_frame(cls, table):
+        """
+        어휘 테이블로 레지스트리 생성
+
+        Args:
+            table (pd.DataFrame): to_frame 결과 형식의 어휘 테이블
+
+        Returns:
+            EncodingRegistry: 생성된 레지스트리
+        """
+        table = table.sort_values(['column', 'code'], kind='stable')
+        return cls({col: group['value'].astype(str).to_numpy(dtype=object)
+                    for col, group in table.groupby('column', sort=False)})
+
+    def save(self, path):
+        """
+        어휘를 파일로 저장 (임시 파일에 쓴 뒤 os.replace로 교체)
+
+        Args:
+            path (str): 저장 경로 (.parquet 등)
+        """
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+        save_frame(self.to_frame(), tmp_path)
+        os.replace(tmp_path, path)
+        self.changed = False
+
+    @classmethod
+    def load(cls, path, missing_ok=True):
+        """
+        저장된 어휘 로드
+
+        Args:
+            path (str): 어휘 파일 경로
+            missing_ok (bool): True면 파일이 없을 때 빈 레지스트리 반환
+
+        Returns:
+            EncodingRegistry: 로드된 레지스트리
+        """
+        if missing_ok and not os.path.exists(path):
+            return cls()
+        return cls.from_frame(load_frame(path))
@@ -0,0 +1,229 @@
+import os
+import numpy as np
+import pandas as pd
+
+from .validity import LOCATION_COLS
+from .schema import LOCATIONS_SCHEMA, read_dtypes
+from .graph import stable_argsort_int
+
+EARTH_RADIUS_KM = 6371.0088
+
+# 좌표 테이블에서 좌표가 없는 조합(ONLINE)에 쓰인 값
+NO_COORDINATE = -1
+
+# 이동 속도 계산 시 최소 시간 간격 (같은 분에 찍힌 거래의 속도가 무한대가 되지 않도록 1분으로 제한)
+MIN_GAP_HOURS = 1 / 60
+
+GEO_FEATURE_COLS = ['merchant_latitude', 'merchant_longitude', 'home_distance_km',
+                    'prev_distance_km', 'prev_gap_hours', 'travel_speed_kmh']
+
+# 좌표 테이블 캐시: (절대 경로, 수정 시각, 크기) → GeocodeIndex
+_GEOCODE_CACHE = {}
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    두 좌표 배열 사이의 대원 거리 (km, 결측 좌표는 NaN)
+
+    Args:
+        lat1, lon1 (np.ndarray): 시작 좌표 (도)
+        lat2, lon2 (np.ndarray): 도착 좌표 (도)
+
+    Returns:
+        np.ndarray: 거리 (km)
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def location_keys(df):
+    """
+    (zip, merchant_state, merchant_city) 조합의 64비트 해시 키 (컬럼 값은 문자열로 맞춘 뒤 해시)
+
+    Args:
+        df (pd.DataFrame): zip, merchant_state, merchant_city 컬럼을 가진 데이터
+
+    Returns:
+        np.ndarray: 행별 해시 키 (uint64)
+    """
+    columns = {col: df[col].astype(str) for col in LOCATION_COLS}
+    return pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).to_numpy()
+
+
+class GeocodeIndex:
+    """
+    위치 조합 → 위도/경도 조회 인덱스
+    - 좌표가 없는 조합(ONLINE)도 키는 보관하되 위도/경도는 NaN
+    - 조합을 64비트 해시 키로 바꿔 해시 테이블(pd.Index)에 보관하고, 청크의 키도 같은 방식으로 만들어 한 번에 조회
+    """
+
+    def __init__(self, locations):
+        """
+        Args:
+            locations (pd.DataFrame): zip, merchant_state, merchant_city, latitude, longitude 컬럼
+        """
+        locations = locations.dropna(subset=LOCATION_COLS)
+        locations = locations.drop_duplicates(subset=LOCATION_COLS).reset_index(drop=True)
+        # ONLINE 조합은 좌표 테이블에 (-1, -1)로 기록되어 있으므로 좌표 없음(NaN)으로 처리
+        sentinel = (locations['latitude'] == NO_COORDINATE) & (locations['longitude'] == NO_COORDINATE)
+        locations.loc[sentinel, ['latitude', 'longitude']] = np.nan
+        self.locations = locations
+        self.index = pd.Index(location_keys(locations))
+        if not self.index.is_unique:
+            raise ValueError("위치 조합 해시 키가 충돌합니다.")
+        self.latitude = locations['latitude'].to_numpy(np.float64)
+        self.longitude = locations['longitude'].to_numpy(np.float64)
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def from_file(cls, location_file):
+        """
+        좌표 테이블 파일로 인덱스 생성 (같은 실행 안에서 파일이 바뀌지 않았으면 한 번만 로드)
+
+        Args:
+            location_file (str): location_data_with_geo_final.csv 경로
+
+        Returns:
+            GeocodeIndex: 생성된 인덱스
+        """
+        stat = os.stat(location_file)
+        key = (os.path.abspath(location_file), stat.st_mtime_ns, stat.st_size)
+        if key not in _GEOCODE_CACHE:
+            _GEOCODE_CACHE[key] = cls(pd.read_csv(location_file, dtype=read_dtypes(LOCATIONS_SCHEMA)))
+        return _GEOCODE_CACHE[key]
+
+    def positions(self, df):
+        """
+        각 행의 위치 조합이 self.locations 몇 번째 행인지 조회
+
+        Args:
+            df (pd.DataFrame): zip, merchant_state, merchant_city 컬럼을 가진 데이터
+
+        Returns:
+            np.ndarray: 행 위치 (없는 조합은 -1)
+        """
+        return self.index.get_indexer(location_keys(df))
+
+    def lookup(self, df):
+        """
+        각 행의 위도/경도 (없는 조합은 NaN)
+
+        Args:
+            df (pd.DataFrame): zip, merchant_state, merchant_city 컬럼을 가진 데이터
+
+        Returns:
+            tuple: (위도 배열, 경도 배열)
+        """
+        pos = self.positions(df)
+        found = pos >= 0
+        latitude = np.full(len(pos), np.nan)
+        longitude = np.full(len(pos), np.nan)
+        latitude[found] = self.latitude[pos[found]]
+        longitude[found] = self.longitude[pos[found]]
+        return latitude, longitude
+
+
+class GeoFeatureBuilder:
+    """
+    거래 청크별 위치 특성 계산
+    - 가맹점 좌표: GeocodeIndex/GeocodeCache 조회 (좌표를 정하지 못한 조합은 NaN)
+    - 카드 소유자 주소 ~ 가맹점 거리
+    - 같은 카드의 직전 (좌표가 있는) 거래 ~ 현재 거래 거리, 시간 간격, 이동 속도
+    - 청크 사이에는 카드별 마지막 좌표/시각만 넘겨받으므로 거래가 시각 순으로 들어오면 전체를 한 번에 계산한 것과 같음
+    """
+
+    def __init__(self, geocode, users_df):
+        """
+        Args:
+            geocode (GeocodeIndex or GeocodeCache): 좌표 조회 객체 (lookup(df) → (위도, 경도))
+            users_df (pd.DataFrame): 고객 데이터 (id, latitude, longitude 컬럼)
+        """
+        self.geocode = geocode
+        self.home_index = pd.Index(users_df['id'])
+        self.home_latitude = users_df['latitude'].to_numpy(np.float64)
+        self.home_longitude = users_df['longitude'].to_numpy(np.float64)
+        # 카드별 마지막 좌표가 있는 거래 (card_id → latitude, longitude, seconds)
+        self.last_seen = pd.DataFrame(columns=['latitude', 'longitude', 'seconds'], dtype=np.float64)
+
+    def _home(self, client_ids):
+        pos = self.home_index.get_indexer(client_ids)
+        found = pos >= 0
+        latitude = np.where(found, self.home_latitude[pos], np.nan)
+        longitude = np.where(found, self.home_longitude[pos], np.nan)
+        return latitude, longitude
+
+    def transform(self, df):
+        """
+        청크 하나의 위치 특성 계산
+
+        Args:
+            df (pd.DataFrame): 거래 청크 (client_id, card_id, date, zip, merchant_state, merchant_city 컬럼)
+
+        Returns:
+            pd.DataFrame: GEO_FEATURE_COLS 컬럼 (df와 같은 index)
+        """
+        n_rows = len(df)
+        latitude, longitude = self.geocode.lookup(df)
+        home_latitude, home_longitude = self._home(df['client_id'])
+        home_distance = haversine_km(home_latitude, home_longitude, latitude, longitude)
+
+        # 카드, 시각 순 정렬 후 같은 카드의 직전 좌표가 있는 거래 위치 계산
+        card = df['card_id'].to_numpy(np.int64)
+        seconds = pd.to_datetime(df['date']).to_numpy('datetime64[s]').astype(np.int64)
+        order = stable_argsort_int(card, order=stable_argsort_int(seconds))
+        card_s, seconds_s = card[order], seconds[order].astype(np.float64)
+        lat_s, lon_s = latitude[order], longitude[order]
+        known = ~np.isnan(lat_s)
+
+        positions = np.arange(n_rows)
+        last_known = np.maximum.accumulate(np.where(known, positions, -1))
+        prev = np.concatenate([[-1], last_known[:-1]])
+        group_start = np.searchsorted(card_s, card_s, side='left')
+        in_chunk = prev >= group_start
+
+        prev_lat = np.full(n_rows, np.nan)
+        prev_lon = np.full(n_rows, np.nan)
+        prev_seconds = np.full(n_rows, np.nan)
+        prev_lat[in_chunk] = lat_s[prev[in_chunk]]
+        prev_lon[in_chunk] = lon_s[prev[in_chunk]]
+        prev_seconds[in_chunk] = seconds_s[prev[in_chunk]]
+
+        # 청크 안에 직전 거래가 없으면 이전 청크에서 넘겨받은 카드별 마지막 거래 사용
+        carried = ~in_chunk
+        if carried.any() and len(self.last_seen):
+            pos = self.last_seen.index.get_indexer(card_s[carried])
+            found = pos >= 0
+            rows = np.flatnonzero(carried)[found]
+            prev_lat[rows] = self.last_seen['latitude'].to_numpy()[pos[found]]
+            prev_lon[rows] = self.last_seen['longitude'].to_numpy()[pos[found]]
+            prev_seconds[rows] = self.last_seen['seconds'].to_numpy()[pos[found]]
+
+        prev_distance = haversine_km(prev_lat, prev_lon, lat_s, lon_s)
+        gap_hours = (seconds_s - prev_seconds) / 3600
+        gap_hours[gap_hours < 0] = np.nan
+        speed = prev_distance / np.maximum(gap_hours, MIN_GAP_HOURS)
+
+        # 카드별 마지막 좌표가 있는 거래를 다음 청크로 넘김
+        is_last = np.append(card_s[1:] != card_s[:-1], True) if n_rows else np.zeros(0, dtype=bool)
+        last_pos = last_known[is_last]
+        has_known = last_pos >= group_start[is_last]
+        update = pd.DataFrame({
+            'latitude': lat_s[last_pos[has_known]],
+            'longitude': lon_s[last_pos[has_known]],
+            'seconds': seconds_s[last_pos[has_known]],
+        }, index=card_s[is_last][has_known])
+        self.last_seen = update.combine_first(self.last_seen) if len(self.last_seen) else update
+
+        inverse = np.empty(n_rows, dtype=np.int64)
+        inverse[order] = positions
+        return pd.DataFrame({
+            'merchant_latitude': latitude.astype(np.float32),
+            'merchant_longitude': longitude.astype(np.float32),
+            'home_distance_km': home_distance.astype(np.float32),
+            'prev_distance_km': prev_distance[inverse].astype(np.float32),
+            'prev_gap_hours': gap_hours[inverse].astype(np.float32),
+            'travel_speed_kmh': speed[inverse].astype(np.float32),
+        }, index=df.index)
@@ -0,0 +1,264 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+
+from .geo import GeocodeIndex, location_keys
+from .pipeline import file_digest
+from .storage import save_frame, load_frame
+from .validity import LOCATION_COLS
+
+# 좌표 결정 단계 (앞 단계에서 찾지 못하면 다음 단계 사용)
+# exact: 좌표 테이블의 같은 조합 / zip: 같은 ZIP의 중심 / zip_prefix: ZIP 앞 3자리 중심 / state: 주(해외는 국가) 중심
+RESOLUTION_SOURCES = ('exact', 'zip', 'zip_prefix', 'state')
+ONLINE_CITY = 'ONLINE'
+
+ENTRY_COLS = LOCATION_COLS + ['latitude', 'longitude', 'source']
+
+
+def spherical_centroids(groups, latitude, longitude):
+    """
+    그룹별 좌표 중심 (단위 벡터 평균을 다시 위도/경도로 변환, 날짜 변경선 부근에서도 올바른 중심)
+
+    Args:
+        groups (pd.Series): 그룹 키
+        latitude (np.ndarray): 위도 (도)
+        longitude (np.ndarray): 경도 (도)
+
+    Returns:
+        pd.DataFrame: 그룹 키 index, latitude, longitude 컬럼
+    """
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    vectors = pd.DataFrame({
+        'x': np.cos(lat) * np.cos(lon),
+        'y': np.cos(lat) * np.sin(lon),
+        'z': np.sin(lat),
+    }).groupby(groups.to_numpy()).mean()
+    return pd.DataFrame({
+        'latitude': np.degrees(np.arctan2(vectors['z'], np.hypot(vectors['x'], vectors['y']))),
+        'longitude': np.degrees(np.arctan2(vectors['y'], vectors['x'])),
+    }, index=vectors.index)
+
+
+def _fallback_keys(locations):
+    """대체 단계별 조회 키 (ZIP이 5자리 숫자가 아닌 가상 코드면 ZIP 단계는 건너뜀)"""
+    zip_str = locations['zip'].astype(str)
+    numeric = zip_str.str.fullmatch(r'\d{5}').to_numpy()
+    return {
+        'zip': zip_str.where(numeric),
+        'zip_prefix': zip_str.str[:3].where(numeric),
+        'state': locations['merchant_state'].astype(str),
+    }
+
+
+class GeocodeCache:
+    """
+    좌표 테이블에 없는 위치 조합까지 좌표를 정해 디스크에 보관하는 캐시
+    - 조회 순서: 좌표 테이블(exact) → 캐시 → ZIP 중심 → ZIP 앞 3자리 중심 → 주 중심
+    - 새로 정한 조합은 한 번에 한 묶음씩 세그먼트 파일로 추가 (임시 파일에 쓴 뒤 os.replace, 파일 이름은 내용 해시)
+      여러 실행이 동시에 추가해도 파일이 깨지지 않고, 같은 조합은 같은 결과라 중복 파일도 문제없음
+    - 추가 전에 다른 실행이 만든 세그먼트를 다시 읽어, 이미 정해진 조합은 다시 계산하지 않음
+    """
+
+    def __init__(self, reference, cache_dir):
+        """
+        Args:
+            reference (GeocodeIndex): 좌표 테이블 인덱스
+            cache_dir (str): 세그먼트 파일 디렉터리 (좌표 테이블마다 따로 써야 함)
+        """
+        self.reference = reference
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # 대체 단계별 중심 좌표 (좌표가 있는 조합만 사용)
+        located = reference.locations.dropna(subset=['latitude', 'longitude'])
+        self.centroids = {}
+        for source, keys in _fallback_keys(located).items():
+            valid = keys.notna().to_numpy()
+            self.centroids[source] = spherical_centroids(
+                keys[valid], located['latitude'].to_numpy()[valid], located['longitude'].to_numpy()[valid])
+
+        self.entries = pd.DataFrame({col: pd.Series(dtype=np.float64 if col in ('latitude', 'longitude') else object)
+                                     for col in ENTRY_COLS})
+        self.index = pd.Index(np.empty(0, dtype=np.uint64))
+        self._segments = set()
+        self.refresh()
+
+    @classmethod
+    def from_file(cls, location_file, cache_dir):
+        """
+        좌표 테이블 파일로 캐시 생성 (세그먼트는 cache_dir/<좌표 테이블 해시 앞 16자리>/ 에 보관)
+
+        Args:
+            location_file (str): location_data_with_geo_final.csv 경로
+            cache_dir (str): 캐시 최상위 디렉터리
+
+        Returns:
+            GeocodeCache: 생성된 캐시
+        """
+        reference = GeocodeIndex.from_file(location_file)
+        return cls(reference, os.path.join(cache_dir, file_digest(location_file)[:16]))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def refresh(self):
+        """
+        아직 읽지 않은 세그먼트 파일 로드
+
+        Returns:
+            int: 새로 읽은 세그먼트 수
+        """
+        names = sorted(name for name in os.listdir(self.cache_dir)
+                       if name.endswith('.parquet') and not name.startswith('.') and name not in self._segments)
+        frames = []
+        for name in names:
+            try:
+                frames.append(load_frame(os.path.join(self.cache_dir, name)))
+            except FileNotFoundError:  # 다른 실행이 compact로 합친 세그먼트
+                continue
+            self._segments.add(name)
+        if frames:
+            self._set_entries(pd.concat([self.entries, *frames], ignore_index=True))
+        return len(frames)
+
+    def _set_entries(self, entries):
+        entries = entries.drop_duplicates(subset=LOCATION_COLS).reset_index(drop=True)
+        self.entries = entries
+        self.index = pd.Index(location_keys(entries))
+
+    def _fallback(self, locations):
+        """좌표 테이블/캐시에 없는 조합의 좌표를 대체 단계 순서로 결정"""
+        n_rows = len(locations)
+        latitude = np.full(n_rows, np.nan)
+        longitude = np.full(n_rows, np.nan)
+        source = np.full(n_rows, 'unresolved', dtype=object)
+        source[(locations['merchant_city'] == ONLINE_CITY).to_numpy()] = 'online'
+
+        for level, keys in _fallback_keys(locations).items():
+            pending = source == 'unresolved'
+            pos = self.centroids[level].index.get_indexer(keys[pending])
+            found = pos >= 0
+            rows = np.flatnonzero(pending)[found]
+            latitude[rows] = self.centroids[level]['latitude'].to_numpy()[pos[found]]
+            longitude[rows] = self.centroids[level]['longitude'].to_numpy()[pos[found]]
+            source[rows] = level
+
+        entries = locations[LOCATION_COLS].astype(str).reset_index(drop=True)
+        entries['latitude'] = latitude
+        entries['longitude'] = longitude
+        entries['source'] = source
+        return entries
+
+    def _append(self, entries):
+        """세그먼트 파일 하나로 원자적으로 추가 (파일 이름은 조합 키 해시)"""
+        keys = np.sort(location_keys(entries))
+        name = hashlib.sha256(keys.tobytes()).hexdigest()[:32] + '.parquet'
+        path = os.path.join(self.cache_dir, name)
+        if not os.path.exists(path):
+            tmp_path = os.path.join(self.cache_dir, f'.{name}.{os.getpid()}.tmp.parquet')
+            save_frame(entries, tmp_path)
+            os.replace(tmp_path, path)
+        self._segments.add(name)
+        self._set_entries(pd.concat([self.entries, entries], ignore_index=True))
+
+    def _unknown(self, keys):
+        return (self.reference.index.get_indexer(keys) < 0) & (self.index.get_indexer(keys) < 0)
+
+    def _add_missing(self, locations, keys):
+        """키가 좌표 테이블/캐시에 없는 조합만 남겨 좌표를 정하고 추가"""
+        unique = ~pd.Index(keys).duplicated()
+        locations, keys = locations[unique], keys[unique]
+        missing = self._unknown(keys)
+        # 다른 실행이 그 사이에 추가한 조합은 다시 계산하지 않음
+        if missing.any() and self.refresh():
+            missing = self._unknown(keys)
+        if not missing.any():
+            return self.entries.iloc[:0]
+
+        entries = self._fallback(locations[missing])
+        self._append(entries)
+        return entries
+
+    def resolve_missing(self, df):
+        """
+        좌표 테이블/캐시에 없는 조합을 모아 한 번에 좌표를 정하고 캐시에 추가
+
+        Args:
+            df (pd.DataFrame): zip, merchant_state, merchant_city 컬럼을 가진 데이터
+
+        Returns:
+            pd.DataFrame: 새로 추가된 항목 (ENTRY_COLS 컬럼)
+        """
+        locations = df[LOCATION_COLS].dropna()
+        return self._add_missing(locations, location_keys(locations))
+
+    def resolve(self, df):
+        """
+        행별 좌표와 좌표를 정한 단계 (없는 조합은 먼저 한 번에 캐시에 추가)
+
+        Args:
+            df (pd.DataFrame): zip, merchant_state, merchant_city 컬럼을 가진 데이터
+
+        Returns:
+            pd.DataFrame: latitude, longitude, source 컬럼 (df와 같은 index, 위치 결측 행은 NaN / 'unresolved')
+        """
+        keys = location_keys(df)
+        n_rows = len(df)
+        latitude = np.full(n_rows, np.nan)
+        longitude = np.full(n_rows, np.nan)
+        source = np.full(n_rows, 'unresolved', dtype=object)
+
+        ref_pos = self.reference.index.get_indexer(keys)
+        found = ref_pos >= 0
+        latitude[found] = self.reference.latitude[ref_pos[found]]
+        longitude[found] = self.reference.longitude[ref_pos[found]]
+        source[found] = 'exact'
+
+        rest = np.flatnonzero(~found & df[LOCATION_COLS].notna().all(axis=1).to_numpy())
+        if len(rest):
+            pos = self.index.get_indexer(keys[rest])
+            if (pos < 0).any():
+                new_rows = rest[pos < 0]
+                self._add_missing(df[LOCATION_COLS].iloc[new_rows], keys[new_rows])
+                pos = self.index.get_indexer(keys[rest])
+            latitude[rest] = self.entries['latitude'].to_numpy(np.float64)[pos]
+            longitude[rest] = self.entries['longitude'].to_numpy(np.float64)[pos]
+            source[rest] = self.entries['source'].to_numpy()[pos]
+
+        return pd.DataFrame({'latitude': latitude, 'longitude': longitude, 'source': source}, index=df.index)
+
+    def lookup(self, df):
+        """
+        각 행의 위도/경도 (GeocodeIndex.lookup과 같은 형식, 테이블에 없는 조합은 대체 단계 좌표)
+
+        Args:
+            df (pd.DataFrame): zip, merchant_state, merchant_city 컬럼을 가진 데이터
+
+        Returns:
+            tuple: (위도 배열, 경도 배열)
+        """
+        resolved = self.resolve(df)
+        return resolved['latitude'].to_numpy(), resolved['longitude'].to_numpy()
+
+    def compact(self):
+        """
+        세그먼트 파일을 하나로 합침 (동시에 읽던 실행은 합쳐진 항목을 다음 resolve에서 다시 계산할 수 있음)
+
+        Returns:
+            int: 삭제된 세그먼트 수
+        """
+        self.refresh()
+        old_segments = set(self._segments)
+        if len(old_segments) <= 1:
+            return 0
+        self._segments = set()
+        self._append(self.entries)
+        removed = 0
+        for name in old_segments - self._segments:
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
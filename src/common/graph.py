@@ -0,0 +1,349 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from .storage import save_frame
+
+# 노드 유형별 원본 키 컬럼
+NODE_KEYS = {
+    'client': ['client_id'],
+    'card': ['card_id'],
+    'merchant': ['merchant_id'],
+    'location': ['zip', 'merchant_state', 'merchant_city'],
+    'mcc': ['mcc'],
+}
+
+# 거래 간선(card - merchant)에 붙는 속성: 거래 id, 금액, 시각(초), 사기 여부
+TRANSACTION_EDGE_DTYPES = {
+    'edge_id': np.int64,
+    'amount': np.float32,
+    'timestamp': np.int64,
+    'fraud': np.int8,
+}
+
+# 도착 노드 id 배열 dtype (노드 유형별 노드 수는 2^31 미만, 간선 위치인 indptr은 int64)
+INDEX_DTYPE = np.int32
+
+MANIFEST_NAME = 'manifest.json'
+GRAPH_FORMAT_VERSION = 1
+
+
+def relation_name(src_type, rel, dst_type):
+    """관계 이름 (파일 이름에도 사용): '<출발 유형>__<관계>__<도착 유형>'"""
+    return f"{src_type}__{rel}__{dst_type}"
+
+
+def stable_argsort_int(values, order=None):
+    """
+    정수 배열의 안정 정렬 순서 (16비트 단위 LSD 기수 정렬)
+    NumPy는 16비트 이하 정수의 안정 정렬에 기수 정렬을 쓰므로, 값을 16비트 자릿수로 나눠
+    하위 자릿수부터 정렬하면 int64 argsort(병합 정렬)보다 훨씬 빠름
+
+    Args:
+        values (np.ndarray): 정수 배열
+        order (np.ndarray, optional): 초기 순서 (지정 시 이 순서를 유지한 채 values로 안정 정렬)
+
+    Returns:
+        np.ndarray: 안정 정렬 순서 (int64)
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+    values = values - values.min()
+    max_value = int(values.max())
+    shift = 0
+    while True:
+        digit = ((values >> shift) & 0xFFFF).astype(np.uint16)
+        if order is None:
+            order = np.argsort(digit, kind='stable')
+        else:
+            order = order[np.argsort(digit[order], kind='stable')]
+        shift += 16
+        if max_value >> shift == 0:
+            return order
+
+
+def unique_sorted(keys):
+    """
+    정수 키의 정렬된 고유값과 역인덱스 (np.unique(return_inverse=True)와 같은 결과)
+    해시 기반 factorize로 고유값을 먼저 구하고 고유값만 정렬
+
+    Args:
+        keys (np.ndarray): 정수 키 배열
+
+    Returns:
+        tuple: (정렬된 고유값, 키별 고유값 위치)
+    """
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(uniques)
+    rank = np.empty(len(uniques), dtype=np.int64)
+    rank[order] = np.arange(len(uniques))
+    return uniques[order], rank[codes]
+
+
+def encode_nodes(frames, key_cols):
+    """
+    여러 데이터프레임에 등장한 키 조합을 0부터 연속된 정수 노드 id로 변환
+    키 컬럼별로 factorize한 코드를 하나의 int64 키로 합친 뒤 정렬된 노드 목록을 만듦
+
+    Args:
+        frames (list): 키 컬럼을 가진 데이터프레임 목록
+        key_cols (list): 키 컬럼 목록
+
+    Returns:
+        tuple:
+            list: 데이터프레임별 노드 id 배열 (키에 결측이 있으면 -1)
+            pd.DataFrame: 노드 id 순서의 원본 키 테이블
+    """
+    lengths = [len(frame) for frame in frames]
+    combined = np.zeros(sum(lengths), dtype=np.int64)
+    has_na = np.zeros(sum(lengths), dtype=bool)
+    col_uniques = []
+    for col in key_cols:
+        values = pd.concat([frame[col] for frame in frames], ignore_index=True)
+        codes, uniques = pd.factorize(values, sort=True)
+        combined = combined * (len(uniques) + 1) + codes
+        has_na |= codes < 0
+        col_uniques.append((uniques, len(uniques) + 1))
+
+    if len(key_cols) == 1:
+        # 키 컬럼이 하나면 정렬된 factorize 코드가 곧 노드 id
+        keys, inverse = np.arange(col_uniques[0][1] - 1), combined[~has_na]
+    else:
+        keys, inverse = unique_sorted(combined[~has_na])
+    node_ids = np.full(len(combined), -1, dtype=np.int64)
+    node_ids[~has_na] = inverse
+
+    # 결합 키 → 컬럼별 코드 복원 후 원본 값으로 노드 테이블 구성
+    table = {}
+    rest = keys
+    for col, (uniques, base) in reversed(list(zip(key_cols, col_uniques))):
+        table[col] = np.asarray(uniques)[rest % base]
+        rest = rest // base
+    node_table = pd.DataFrame({col: table[col] for col in key_cols})
+
+    bounds = np.cumsum([0] + lengths)
+    return [node_ids[bounds[i]:bounds[i + 1]] for i in range(len(frames))], node_table
+
+
+def encode_registry_nodes(frames, key_col, registry):
+    """
+    EncodingRegistry 코드를 그대로 노드 id로 사용 (다른 단계의 범주형 코드와 같은 id)
+    어휘에 없는 값은 먼저 어휘에 추가하고, 예약 코드(UNKNOWN_CODE) 노드는 간선 없는 노드로 남김
+
+    Args:
+        frames (list): 키 컬럼을 가진 데이터프레임 목록
+        key_col (str): 키 컬럼
+        registry (EncodingRegistry): 범주형 어휘
+
+    Returns:
+        tuple:
+            list: 데이터프레임별 노드 id 배열 (키가 결측이면 -1)
+            pd.DataFrame: 노드 id 순서의 어휘 문자열 테이블 (0번은 None)
+    """
+    values = pd.concat([frame[key_col] for frame in frames], ignore_index=True)
+    registry.update(values.to_frame(key_col))
+    node_ids = registry.encode(key_col, values).astype(np.int64)
+    node_ids[values.isna().to_numpy()] = -1
+    node_table = pd.DataFrame({key_col: registry.decode(key_col, np.arange(registry.size(key_col)))})
+
+    bounds = np.cumsum([0] + [len(frame) for frame in frames])
+    return [node_ids[bounds[i]:bounds[i + 1]] for i in range(len(frames))], node_table
+
+
+def unique_pairs(src, dst, n_dst):
+    """
+    (출발, 도착) 노드 id 쌍의 고유 목록 (결측 -1이 있는 쌍 제외, 출발 → 도착 순 정렬)
+
+    Args:
+        src (np.ndarray): 출발 노드 id
+        dst (np.ndarray): 도착 노드 id
+        n_dst (int): 도착 노드 수
+
+    Returns:
+        tuple: (출발 노드 id, 도착 노드 id)
+    """
+    keep = (src >= 0) & (dst >= 0)
+    pairs = np.sort(pd.unique(src[keep] * n_dst + dst[keep]))
+    return pairs // n_dst, pairs % n_dst
+
+
+def build_csr(src, dst, n_src, edge_data=None, key_order=None):
+    """
+    간선 목록을 출발 노드 기준 CSR 인접 배열로 변환 (NumPy만 사용)
+    출발 노드 안의 간선 순서는 key_order 순서 (없으면 입력 순서)
+
+    Args:
+        src (np.ndarray): 출발 노드 id
+        dst (np.ndarray): 도착 노드 id
+        n_src (int): 출발 노드 수
+        edge_data (dict, optional): 간선 속성 이름 → 배열 (간선 순서)
+        key_order (np.ndarray, optional): 출발 노드 안의 간선 순서를 정하는 간선 정렬 순서
+            (예: stable_argsort_int(timestamp), 정방향/역방향 관계에서 함께 사용)
+
+    Returns:
+        dict: indptr (int64, 길이 n_src+1), indices (int32), 간선 속성 배열
+    """
+    src = np.asarray(src, dtype=np.int64)
+    order = stable_argsort_int(src, key_order)
+
+    counts = np.bincount(src, minlength=n_src)
+    indptr = np.zeros(n_src + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    csr = {'indptr': indptr, 'indices': np.asarray(dst, dtype=INDEX_DTYPE)[order]}
+    for name, values in (edge_data or {}).items():
+        csr[name] = np.asarray(values)[order]
+    return csr
+
+
+class HeteroGraph:
+    """
+    이종 거래 그래프 (노드 유형별 연속 id + 관계별 CSR 인접 배열)
+    - node_tables[유형]: 노드 id 순서의 원본 키 테이블
+    - relations[관계 이름]: {'src', 'rel', 'dst', 'indptr', 'indices', 간선 속성...}
+    """
+
+    def __init__(self):
+        self.node_tables = {}
+        self.relations = {}
+        # EncodingRegistry 코드를 노드 id로 쓰는 노드 유형 (노드 키 테이블이 어휘 문자열)
+        self.registry_nodes = set()
+
+    @property
+    def num_nodes(self):
+        return {node_type: len(table) for node_type, table in self.node_tables.items()}
+
+    def add_relation(self, src_type, rel, dst_type, src, dst, edge_data=None, sort_key=None, reverse=None):
+        """
+        관계 추가 (reverse 이름을 주면 역방향 관계도 같은 간선 속성으로 추가)
+
+        Args:
+            src_type (str): 출발 노드 유형
+            rel (str): 관계 이름
+            dst_type (str): 도착 노드 유형
+            src (np.ndarray): 출발 노드 id
+            dst (np.ndarray): 도착 노드 id
+            edge_data (dict, optional): 간선 속성
+            sort_key (np.ndarray, optional): 노드 안 간선 정렬 기준
+            reverse (str, optional): 역방향 관계 이름
+        """
+        n_nodes = self.num_nodes
+        key_order = None if sort_key is None else stable_argsort_int(sort_key)
+        csr = build_csr(src, dst, n_nodes[src_type], edge_data, key_order)
+        self.relations[relation_name(src_type, rel, dst_type)] = {
+            'src': src_type, 'rel': rel, 'dst': dst_type, **csr
+        }
+        if reverse is not None:
+            csr = build_csr(dst, src, n_nodes[dst_type], edge_data, key_order)
+            self.relations[relation_name(dst_type, reverse, src_type)] = {
+                'src': dst_type, 'rel': reverse, 'dst': src_type, **csr
+            }
+
+    def save(self, out_dir):
+        """
+        그래프를 디렉터리에 저장
+        - 배열: <관계 이름>.<배열 이름>.npy (np.load(mmap_mode='r')로 메모리 매핑 가능)
+        - 노드 키 테이블: nodes_<유형>.parquet
+        - manifest.json: 노드 수, 관계별 간선 수와 배열 파일/dtype/shape
+
+        Args:
+            out_dir (str): 저장 디렉터리
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = {'format_version': GRAPH_FORMAT_VERSION, 'nodes': {}, 'relations': {}}
+
+        for node_type, table in self.node_tables.items():
+            file_name = f"nodes_{node_type}.parquet"
+            save_frame(table, os.path.join(out_dir, file_name))
+            manifest['nodes'][node_type] = {'count': len(table), 'keys': list(table.columns), 'file': file_name,
+                                            'registry': node_type in self.registry_nodes}
+
+        for name, relation in self.relations.items():
+            arrays = {}
+            for array_name, values in relation.items():
+                if array_name in ('src', 'rel', 'dst'):
+                    continue
+                file_name = f"{name}.{array_name}.npy"
+                np.save(os.path.join(out_dir, file_name), np.ascontiguousarray(values))
+                arrays[array_name] = {'file': file_name, 'dtype': str(values.dtype), 'shape': list(values.shape)}
+            manifest['relations'][name] = {
+                'src': relation['src'], 'rel': relation['rel'], 'dst': relation['dst'],
+                'num_edges': int(len(relation['indices'])), 'arrays': arrays,
+            }
+
+        # manifest는 마지막에 기록 (manifest가 있으면 배열 파일이 모두 저장된 상태)
+        tmp_path = os.path.join(out_dir, MANIFEST_NAME + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+
+
+def build_transaction_graph(trans_df, cards_df=None, registry=None):
+    """
+    거래 데이터로 client / card / merchant / location / mcc 이종 그래프 생성
+    - client -owns-> card: cards_data의 (client_id, id) 쌍, 없으면 거래에 등장한 (client_id, card_id) 쌍
+    - card -pays-> merchant: 거래 1건 = 간선 1개 (edge_id, amount, timestamp, fraud 속성, 노드 안에서 시각 순)
+    - merchant -located_in-> location, merchant -has_mcc-> mcc: 거래에 등장한 고유 쌍
+    - 모든 관계는 역방향 관계(owned_by, paid_by, hosts, mcc_of)도 함께 생성
+
+    Args:
+        trans_df (pd.DataFrame): 거래 데이터 (id, date, client_id, card_id, amount, merchant_id,
+            zip, merchant_state, merchant_city, mcc, fraud 컬럼)
+        cards_df (pd.DataFrame, optional): 카드 데이터 (id, client_id 컬럼)
+        registry (EncodingRegistry, optional): 범주형 어휘 (지정 시 키 컬럼이 하나인 노드 유형은
+            어휘 코드를 노드 id로 사용하고, 어휘에 없는 값은 어휘에 추가)
+
+    Returns:
+        HeteroGraph: 생성된 그래프
+    """
+    graph = HeteroGraph()
+
+    # 노드 id 부여 (카드 데이터에만 있는 고객/카드도 노드로 포함)
+    if cards_df is not None:
+        owner_df = cards_df[['client_id', 'id']].rename(columns={'id': 'card_id'})
+    else:
+        owner_df = trans_df[['client_id', 'card_id']].iloc[:0]
+
+    def node_ids(node_type, frames):
+        key_cols = NODE_KEYS[node_type]
+        if registry is not None and len(key_cols) == 1:
+            graph.registry_nodes.add(node_type)
+            ids, graph.node_tables[node_type] = encode_registry_nodes(frames, key_cols[0], registry)
+        else:
+            ids, graph.node_tables[node_type] = encode_nodes(frames, key_cols)
+        return ids
+
+    trans_client, owner_client = node_ids('client', [trans_df, owner_df])
+    trans_card, owner_card = node_ids('card', [trans_df, owner_df])
+    (trans_merchant,) = node_ids('merchant', [trans_df])
+    (trans_location,) = node_ids('location', [trans_df])
+    (trans_mcc,) = node_ids('mcc', [trans_df])
+
+    # client - card (카드 데이터가 없으면 거래에 등장한 고유 쌍)
+    if cards_df is None:
+        owner_client, owner_card = trans_client, trans_card
+    owner_client, owner_card = unique_pairs(owner_client, owner_card, len(graph.node_tables['card']))
+    graph.add_relation('client', 'owns', 'card', owner_client, owner_card, reverse='owned_by')
+
+    # card - merchant (거래 간선)
+    keep = (trans_card >= 0) & (trans_merchant >= 0)
+    timestamp = pd.to_datetime(trans_df['date']).to_numpy('datetime64[s]').astype(np.int64)
+    edge_data = {
+        'edge_id': trans_df['id'].to_numpy(),
+        'amount': trans_df['amount'].to_numpy(),
+        'timestamp': timestamp,
+        'fraud': trans_df['fraud'].fillna(0).to_numpy(),
+    }
+    edge_data = {name: values[keep].astype(TRANSACTION_EDGE_DTYPES[name]) for name, values in edge_data.items()}
+    graph.add_relation('card', 'pays', 'merchant', trans_card[keep], trans_merchant[keep],
+                       edge_data=edge_data, sort_key=edge_data['timestamp'], reverse='paid_by')
+
+    # merchant - location / merchant - mcc (고유 쌍)
+    for dst_type, dst_ids, rel, reverse in [('location', trans_location, 'located_in', 'hosts'),
+                                            ('mcc', trans_mcc, 'has_mcc', 'mcc_of')]:
+        merchant_ids, dst_ids = unique_pairs(trans_merchant, dst_ids, len(graph.node_tables[dst_type]))
+        graph.add_relation('merchant', rel, dst_type, merchant_ids, dst_ids, reverse=reverse)
+
+    return graph
@@ -0,0 +1,295 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from .graph import MANIFEST_NAME, GRAPH_FORMAT_VERSION
+from .storage import load_frame
+from .encoding import canonical_strings
+
+
+def segment_searchsorted(values, starts, ends, threshold):
+    """
+    각 구간 values[starts[i]:ends[i]] (구간 안은 오름차순) 에서 threshold 미만인 값의 끝 위치를
+    구간 수만큼의 이진 탐색을 한꺼번에 수행해 계산 (배열 복사 없이 log(최대 구간 길이)번 반복)
+
+    Args:
+        values (np.ndarray): 구간별로 정렬된 값 배열 (memmap 가능)
+        starts (np.ndarray): 구간 시작 위치
+        ends (np.ndarray): 구간 끝 위치 (미포함)
+        threshold (int or np.ndarray): 기준 값 (구간별로 다르게 줄 수 있음)
+
+    Returns:
+        np.ndarray: 구간별 threshold 미만 값의 끝 위치 (starts ~ ends 사이)
+    """
+    lo = np.asarray(starts, dtype=np.int64).copy()
+    hi = np.asarray(ends, dtype=np.int64).copy()
+    threshold = np.broadcast_to(threshold, lo.shape)
+    active = lo < hi
+    while active.any():
+        idx = np.flatnonzero(active)
+        mid = (lo[idx] + hi[idx]) // 2
+        below = values[mid] < threshold[idx]
+        lo[idx[below]] = mid[below] + 1
+        hi[idx[~below]] = mid[~below]
+        active[idx] = lo[idx] < hi[idx]
+    return lo
+
+
+class RelationView:
+    """
+    관계 하나의 CSR 배열 묶음 (배열은 처음 접근할 때 np.load(mmap_mode='r')로 열림)
+    """
+
+    def __init__(self, root, name, meta):
+        self.root = root
+        self.name = name
+        self.src = meta['src']
+        self.rel = meta['rel']
+        self.dst = meta['dst']
+        self.num_edges = meta['num_edges']
+        self._meta = meta['arrays']
+        self._arrays = {}
+
+    @property
+    def array_names(self):
+        return list(self._meta)
+
+    def __getitem__(self, array_name):
+        if array_name not in self._arrays:
+            if array_name not in self._meta:
+                raise KeyError(f"'{self.name}' 관계에 '{array_name}' 배열이 없습니다.")
+            path = os.path.join(self.root, self._meta[array_name]['file'])
+            self._arrays[array_name] = np.load(path, mmap_mode='r')
+        return self._arrays[array_name]
+
+    @property
+    def indptr(self):
+        return self['indptr']
+
+    @property
+    def indices(self):
+        return self['indices']
+
+    def has_time(self):
+        return 'timestamp' in self._meta
+
+    def edge_range(self, node, before=None):
+        """
+        노드의 간선 위치 범위 (before 지정 시 timestamp < before 인 간선까지)
+
+        Args:
+            node (int): 출발 노드 id
+            before (int, optional): 기준 시각 (초)
+
+        Returns:
+            tuple: (시작 위치, 끝 위치)
+        """
+        start, end = int(self.indptr[node]), int(self.indptr[node + 1])
+        if before is not None:
+            end = start + int(np.searchsorted(self['timestamp'][start:end], before, side='left'))
+        return start, end
+
+    def neighbors(self, node, before=None):
+        """
+        노드 하나의 이웃 노드 id (memmap 뷰, 복사 없음)
+
+        Args:
+            node (int): 출발 노드 id
+            before (int, optional): 기준 시각 (초), 지정 시 이전 간선만
+
+        Returns:
+            np.ndarray: 이웃 노드 id
+        """
+        start, end = self.edge_range(node, before)
+        return self.indices[start:end]
+
+    def edge_data(self, node, array_name, before=None):
+        """
+        노드 하나의 간선 속성 (memmap 뷰, 복사 없음)
+
+        Args:
+            node (int): 출발 노드 id
+            array_name (str): 간선 속성 이름 (예: 'amount', 'timestamp')
+            before (int, optional): 기준 시각 (초)
+
+        Returns:
+            np.ndarray: 간선 속성 값
+        """
+        start, end = self.edge_range(node, before)
+        return self[array_name][start:end]
+
+    def bounds(self, nodes, before=None):
+        """
+        여러 노드의 간선 위치 범위를 한꺼번에 계산
+
+        Args:
+            nodes (np.ndarray): 출발 노드 id
+            before (int or np.ndarray, optional): 기준 시각 (노드별로 다르게 줄 수 있음)
+
+        Returns:
+            tuple: (시작 위치 배열, 끝 위치 배열)
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts = np.asarray(self.indptr[nodes], dtype=np.int64)
+        ends = np.asarray(self.indptr[nodes + 1], dtype=np.int64)
+        if before is not None:
+            ends = segment_searchsorted(self['timestamp'], starts, ends, before)
+        return starts, ends
+
+    def degree(self, nodes, before=None):
+        """
+        여러 노드의 차수 (before 지정 시 이전 간선 수)
+
+        Args:
+            nodes (np.ndarray): 출발 노드 id
+            before (int or np.ndarray, optional): 기준 시각
+
+        Returns:
+            np.ndarray: 노드별 간선 수
+        """
+        starts, ends = self.bounds(nodes, before)
+        return ends - starts
+
+    def gather_edges(self, nodes, before=None):
+        """
+        여러 노드의 간선 위치를 이어 붙여 반환 (간선 위치로 indices/간선 속성을 필요한 만큼만 읽음)
+
+        Args:
+            nodes (np.ndarray): 출발 노드 id
+            before (int or np.ndarray, optional): 기준 시각
+
+        Returns:
+            tuple:
+                np.ndarray: 간선별 출발 노드 위치 (nodes 배열 기준)
+                np.ndarray: 간선 위치
+        """
+        starts, ends = self.bounds(nodes, before)
+        counts = ends - starts
+        owner = np.repeat(np.arange(len(counts)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return owner, starts[owner] + offsets
+
+
+class GraphStore:
+    """
+    HeteroGraph.save로 저장한 그래프를 manifest만 읽고 여는 읽기 전용 저장소
+    - 배열은 처음 접근할 때 memmap으로 열리므로 그래프 크기와 무관하게 바로 열림
+    - 여러 작업 프로세스가 같은 파일을 열면 OS 페이지 캐시를 공유
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root (str): 그래프 저장 디렉터리 (manifest.json 포함)
+        """
+        self.root = root
+        with open(os.path.join(root, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format_version') != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 그래프 형식 버전입니다: {self.manifest.get('format_version')}")
+
+        self.relations = {name: RelationView(root, name, meta)
+                          for name, meta in self.manifest['relations'].items()}
+        self._node_tables = {}
+
+    @property
+    def num_nodes(self):
+        return {node_type: meta['count'] for node_type, meta in self.manifest['nodes'].items()}
+
+    def __getitem__(self, relation):
+        return self.relations[relation]
+
+    def relations_from(self, node_type):
+        """
+        node_type에서 출발하는 관계 이름 목록
+
+        Args:
+            node_type (str): 노드 유형
+
+        Returns:
+            list: 관계 이름 목록
+        """
+        return [name for name, view in self.relations.items() if view.src == node_type]
+
+    def node_table(self, node_type):
+        """
+        노드 id 순서의 원본 키 테이블 (처음 요청할 때 로드)
+
+        Args:
+            node_type (str): 노드 유형
+
+        Returns:
+            pd.DataFrame: 원본 키 테이블
+        """
+        if node_type not in self._node_tables:
+            meta = self.manifest['nodes'][node_type]
+            self._node_tables[node_type] = load_frame(os.path.join(self.root, meta['file']))
+        return self._node_tables[node_type]
+
+    def node_ids(self, node_type, keys):
+        """
+        원본 키 → 노드 id (키 컬럼이 하나인 노드 유형)
+
+        Args:
+            node_type (str): 노드 유형
+            keys (array-like): 원본 키 (예: card_id)
+
+        Returns:
+            np.ndarray: 노드 id (없는 키는 -1)
+        """
+        table = self.node_table(node_type)
+        if table.shape[1] != 1:
+            raise ValueError(f"'{node_type}' 노드는 키 컬럼이 여러 개입니다: {list(table.columns)}")
+        if self.manifest['nodes'][node_type].get('registry'):
+            # 어휘 코드를 노드 id로 쓰는 유형: 키를 어휘 문자열로 맞춰 조회 (0번 예약 노드는 조회 대상 아님)
+            codes, uniques = pd.factorize(np.asarray(keys))
+            pos = pd.Index(table.iloc[:, 0]).get_indexer(canonical_strings(uniques))
+            return np.append(np.where(pos > 0, pos, -1), -1)[codes]
+        return pd.Index(table.iloc[:, 0]).get_indexer(keys)
+
+    def k_hop(self, seeds, k, relations=None, before=None):
+        """
+        시작 노드에서 k단계 안에 닿는 서브그래프 추출
+
+        Args:
+            seeds (dict): 노드 유형 → 시작 노드 id 배열
+            k (int): 최대 단계 수
+            relations (list, optional): 따라갈 관계 이름 (기본: 전체)
+            before (int, optional): 기준 시각 (timestamp가 있는 관계는 이전 간선만 따라감)
+
+        Returns:
+            tuple:
+                dict: 노드 유형 → 서브그래프에 포함된 노드 id (정렬)
+                dict: 관계 이름 → (출발 노드 id, 도착 노드 id, 간선 위치) 배열 튜플
+        """
+        relations = list(self.relations) if relations is None else relations
+        visited = {node_type: np.unique(np.asarray(ids, dtype=np.int64)) for node_type, ids in seeds.items()}
+        frontier = dict(visited)
+        edges = {}
+
+        for _ in range(k):
+            reached = {}
+            for name in relations:
+                view = self.relations[name]
+                src_nodes = frontier.get(view.src)
+                if src_nodes is None or len(src_nodes) == 0:
+                    continue
+                owner, positions = view.gather_edges(src_nodes, before if view.has_time() else None)
+                dst_nodes = np.asarray(view.indices[positions], dtype=np.int64)
+                edges.setdefault(name, []).append((src_nodes[owner], dst_nodes, positions))
+                reached.setdefault(view.dst, []).append(dst_nodes)
+
+            frontier = {}
+            for node_type, parts in reached.items():
+                found = np.unique(np.concatenate(parts))
+                seen = visited.get(node_type, np.empty(0, dtype=np.int64))
+                new_nodes = found[~np.isin(found, seen, assume_unique=True)]
+                if len(new_nodes):
+                    visited[node_type] = np.union1d(seen, new_nodes)
+                    frontier[node_type] = new_nodes
+            if not frontier:
+                break
+
+        edges = {name: tuple(np.concatenate(cols) for cols in zip(*parts)) for name, parts in edges.items()}
+        return visited, edges
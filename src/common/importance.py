@@ -0,0 +1,191 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from .encoding import EncodingRegistry
+
+# 범주형 변수 (XGBoost / 랜덤포레스트 스크립트의 인코딩 대상 합집합, 데이터에 있는 컬럼만 인코딩)
+# 코드는 EncodingRegistry 어휘 코드 (처음 만든 어휘는 문자열 정렬 순서라 4자리 숫자 mcc는 숫자 순서와 같음)
+CATEGORICAL_COLS = [
+    'client_id', 'merchant_id',
+    'use_chip', 'errors', 'mcc', 'mcc_type', 'gender', 'address', 'card_brand',
+    'card_type', 'has_chip', 'zip_prefix', 'merchant_state', 'merchant_city', 'expires_last_day'
+]
+LABEL_COL = 'fraud'
+
+XGB_PARAMS = {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1, 'eval_metric': 'logloss',
+              'tree_method': 'hist'}
+RF_PARAMS = {'n_estimators': 100}
+
+
+def encode_features(df, registry=None, categorical_cols=CATEGORICAL_COLS, label_col=LABEL_COL):
+    """
+    범주형 컬럼을 한 번만 인코딩해 두 모델이 함께 쓰는 float32 특성 행렬 생성
+
+    Args:
+        df (pd.DataFrame): 파생 속성 생성까지 끝난 데이터
+        registry (EncodingRegistry, optional): 범주형 어휘 (어휘에 없는 값은 추가, None이면 df로 새로 생성)
+        categorical_cols (list): 범주형 컬럼
+        label_col (str): 라벨 컬럼
+
+    Returns:
+        tuple: (특성 행렬 np.ndarray float32, 라벨 np.ndarray, 특성 이름 list)
+    """
+    feature_names = [col for col in df.columns if col != label_col]
+    if registry is None:
+        registry = EncodingRegistry()
+    registry.update(df, [col for col in feature_names if col in categorical_cols])
+    X = np.empty((len(df), len(feature_names)), dtype=np.float32)
+    for i, col in enumerate(feature_names):
+        if col in categorical_cols:
+            X[:, i] = registry.encode(col, df[col])
+        else:
+            X[:, i] = pd.to_numeric(df[col], errors='coerce').to_numpy(np.float32, na_value=np.nan)
+    y = df[label_col].to_numpy().astype(np.int64)
+    return X, y, feature_names
+
+
+def stratified_subsample(y, n_samples, random_state):
+    """
+    라벨 비율을 유지한 행 위치 샘플 (n_samples 이상이면 전체)
+
+    Args:
+        y (np.ndarray): 라벨
+        n_samples (int): 샘플 수
+        random_state (int): 시드
+
+    Returns:
+        np.ndarray: 행 위치
+    """
+    positions = np.arange(len(y))
+    if n_samples is None or n_samples >= len(y):
+        return positions
+    sampled, _ = train_test_split(positions, train_size=n_samples, stratify=y, random_state=random_state)
+    return np.sort(sampled)
+
+
+def train_xgb(X, y, feature_names, random_state, n_jobs):
+    """XGBoost 모델 학습 (hist 트리)"""
+    import xgboost as xgb
+
+    model = xgb.XGBClassifier(**XGB_PARAMS, random_state=random_state, n_jobs=n_jobs)
+    model.fit(pd.DataFrame(X, columns=feature_names, copy=False), y)
+    return model
+
+
+def train_rf(X, y, random_state, n_jobs):
+    """랜덤포레스트 모델 학습"""
+    model = RandomForestClassifier(**RF_PARAMS, random_state=random_state, n_jobs=n_jobs)
+    model.fit(X, y)
+    return model
+
+
+def tree_shap_importance(model, X, feature_names, batch_size=8192, n_jobs=None):
+    """
+    XGBoost 내장 TreeSHAP(pred_contribs)으로 특성별 평균 |SHAP| 계산 (배치 단위로 메모리 제한)
+    shap.TreeExplainer와 같은 값이며 shap 패키지 없이 계산
+
+    Args:
+        model (xgb.XGBClassifier): 학습된 모델
+        X (np.ndarray): 설명 대상 특성 행렬
+        feature_names (list): 특성 이름
+        batch_size (int): 한 번에 계산할 행 수
+        n_jobs (int, optional): 계산 스레드 수
+
+    Returns:
+        np.ndarray: 특성별 평균 |SHAP|
+    """
+    import xgboost as xgb
+
+    booster = model.get_booster()
+    total = np.zeros(len(feature_names), dtype=np.float64)
+    for start in range(0, len(X), batch_size):
+        batch = xgb.DMatrix(X[start:start + batch_size], feature_names=feature_names, nthread=n_jobs or -1)
+        contribs = booster.predict(batch, pred_contribs=True)
+        # 마지막 컬럼은 bias
+        total += np.abs(contribs[:, :-1]).sum(axis=0)
+    return total / max(len(X), 1)
+
+
+def summarize_importance(values, feature_names, value_col):
+    """시드별 중요도 → 평균/표준편차 데이터프레임 (평균 내림차순)"""
+    values = np.asarray(values)
+    return pd.DataFrame({
+        'feature': feature_names,
+        value_col: values.mean(axis=0),
+        f'{value_col}_std': values.std(axis=0, ddof=1) if len(values) > 1 else np.zeros(values.shape[1]),
+    }).sort_values(by=value_col, ascending=False).reset_index(drop=True)
+
+
+def run_importance(df, seeds=(42,), test_size=0.2, shap_samples=20_000, shap_batch_size=8192, n_jobs=None,
+                   registry=None):
+    """
+    XGBoost(SHAP) / 랜덤포레스트 중요도를 한 번의 인코딩으로 병렬 계산
+    - 범주형 인코딩은 한 번만 수행하고 float32 행렬 하나를 두 모델이 함께 사용 (복사 없음)
+    - 시드마다 같은 층화 분할로 두 모델을 스레드 두 개에서 동시에 학습 (학습 중 GIL 해제)
+    - SHAP은 테스트 분할에서 라벨 비율을 유지한 shap_samples건만 배치 단위로 계산
+    - 시드가 여럿이면 시드 간 표준편차를 함께 보고
+
+    Args:
+        df (pd.DataFrame): 파생 속성 생성까지 끝난 데이터
+        seeds (tuple): 분할/학습 시드 목록
+        test_size (float): 테스트 분할 비율
+        shap_samples (int, optional): SHAP 계산 샘플 수 (None이면 테스트 분할 전체)
+        shap_batch_size (int): SHAP 배치 행 수
+        n_jobs (int, optional): 전체 스레드 수 (기본: CPU 수, 두 모델이 절반씩 사용)
+        registry (EncodingRegistry, optional): 범주형 어휘 (다른 단계와 같은 코드 사용)
+
+    Returns:
+        tuple:
+            pd.DataFrame: feature, mean_abs_shap, mean_abs_shap_std
+            pd.DataFrame: feature, importance, importance_std
+            dict: 단계 → 소요 시간 (초)
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    model_jobs = max(n_jobs // 2, 1)
+    timings = {}
+
+    start_time = time.perf_counter()
+    X, y, feature_names = encode_features(df, registry)
+    timings['encode'] = time.perf_counter() - start_time
+    print(f"범주형 인코딩 완료 ({timings['encode']:.2f}초, {X.shape[0]:,}행 x {X.shape[1]}열)")
+
+    shap_values, rf_values = [], []
+    timings.update({'split': 0.0, 'fit_xgb': 0.0, 'fit_rf': 0.0, 'shap': 0.0})
+
+    def timed(func, *args):
+        phase_start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - phase_start
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for seed in seeds:
+            start_time = time.perf_counter()
+            train_pos, test_pos = train_test_split(np.arange(len(y)), test_size=test_size, stratify=y,
+                                                   random_state=seed)
+            X_train, y_train = X[train_pos], y[train_pos]
+            timings['split'] += time.perf_counter() - start_time
+
+            xgb_future = executor.submit(timed, train_xgb, X_train, y_train, feature_names, seed, model_jobs)
+            rf_future = executor.submit(timed, train_rf, X_train, y_train, seed, model_jobs)
+            xgb_model, xgb_sec = xgb_future.result()
+            rf_model, rf_sec = rf_future.result()
+            timings['fit_xgb'] += xgb_sec
+            timings['fit_rf'] += rf_sec
+            rf_values.append(rf_model.feature_importances_)
+            del rf_model
+
+            start_time = time.perf_counter()
+            shap_pos = test_pos[stratified_subsample(y[test_pos], shap_samples, seed)]
+            shap_values.append(tree_shap_importance(xgb_model, X[shap_pos], feature_names, shap_batch_size, n_jobs))
+            timings['shap'] += time.perf_counter() - start_time
+            print(f"시드 {seed} 완료 (XGBoost {xgb_sec:.2f}초, 랜덤포레스트 {rf_sec:.2f}초, "
+                  f"SHAP {len(shap_pos):,}건)")
+
+    shap_importance = summarize_importance(shap_values, feature_names, 'mean_abs_shap')
+    rf_importance = summarize_importance(rf_values, feature_names, 'importance')
+    return shap_importance, rf_importance, timings
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+class LookupTable:
+    """
+    작은 기준 테이블(users_data, cards_data 등)을 id → 행 위치 인덱스로 보관하고,
+    키 배열에 맞춰 컬럼 값을 위치 기반으로 모아 오는 조회 테이블 (merge 없이 broadcast join)
+    """
+
+    def __init__(self, df, key_col='id'):
+        """
+        Args:
+            df (pd.DataFrame): 기준 테이블 (key_col 값은 고유해야 함)
+            key_col (str): 키 컬럼
+        """
+        if not df[key_col].is_unique:
+            raise ValueError(f"'{key_col}' 컬럼 값이 고유하지 않아 조회 테이블을 만들 수 없습니다.")
+        self.key_col = key_col
+        self.index = pd.Index(df[key_col])
+        self.columns = [col for col in df.columns if col != key_col]
+        self.series = {col: df[col].reset_index(drop=True) for col in self.columns}
+
+    def __len__(self):
+        return len(self.index)
+
+    def positions(self, keys):
+        """
+        키 배열의 각 값이 기준 테이블 몇 번째 행인지 조회
+
+        Args:
+            keys (array-like): 조회할 키
+
+        Returns:
+            np.ndarray: 행 위치 (없는 키는 -1)
+        """
+        return self.index.get_indexer(keys)
+
+    def contains(self, keys):
+        """
+        키 존재 여부
+
+        Args:
+            keys (array-like): 조회할 키
+
+        Returns:
+            np.ndarray: 행별 존재 여부 (bool)
+        """
+        return self.positions(keys) >= 0
+
+    def gather(self, keys, columns=None, index=None):
+        """
+        키 순서대로 기준 테이블 컬럼 값을 모아 데이터프레임으로 반환
+        키가 모두 존재해야 하며, 없는 키가 있으면 KeyError
+
+        Args:
+            keys (array-like): 조회할 키
+            columns (list, optional): 가져올 컬럼 (기본: 키 컬럼 제외 전체)
+            index (pd.Index, optional): 결과 데이터프레임 index
+
+        Returns:
+            pd.DataFrame: 키 순서에 맞춰 모은 컬럼 값
+        """
+        pos = self.positions(keys)
+        if (pos < 0).any():
+            missing = pd.unique(np.asarray(keys)[pos < 0])[:5]
+            raise KeyError(f"조회 테이블에 없는 키가 있습니다: {list(missing)}")
+
+        columns = self.columns if columns is None else columns
+        index = pd.RangeIndex(len(pos)) if index is None else index
+        return pd.DataFrame({col: self.series[col].take(pos).set_axis(index) for col in columns}, index=index)
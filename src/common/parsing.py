@@ -0,0 +1,108 @@
+import os
+import numpy as np
+import pandas as pd
+
+from .schema import USERS_SCHEMA, CARDS_SCHEMA, read_dtypes, compact_frame
+
+# 금액 문자열("$29,237 ")로 저장된 컬럼
+USERS_MONEY_COLS = ['per_capita_income', 'yearly_income', 'total_debt']
+CARDS_MONEY_COLS = ['credit_limit']
+# MM/YYYY 형식 날짜 컬럼
+CARDS_MONTH_COLS = ['expires', 'acct_open_date']
+
+# 정적 테이블(users_data, cards_data) 파싱 결과 캐시: (절대 경로, 수정 시각, 크기) → 데이터프레임
+_STATIC_CACHE = {}
+
+
+def parse_money(col, errors='coerce'):
+    """
+    금액 문자열 컬럼을 float으로 변환 ('$', ',' 및 앞뒤 공백 제거)
+    문자열 컬럼이 아니면(이미 숫자) 그대로 반환
+    고유값 단위로 한 번만 변환한 뒤 코드로 펼침
+
+    Args:
+        col (pd.Series): 금액 컬럼
+        errors (str): 'coerce'면 변환 불가 값을 NaN으로, 'raise'면 예외 발생
+
+    Returns:
+        pd.Series: 숫자 컬럼 (모두 정수면 int64, 소수/결측이 있으면 float64)
+    """
+    if not (pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col)):
+        return col
+
+    codes, uniques = pd.factorize(col, use_na_sentinel=True)
+    cleaned = pd.Series(uniques, dtype=object).astype(str).str.replace(r'[\$,]', '', regex=True).str.strip()
+    values = pd.to_numeric(cleaned, errors=errors).to_numpy()
+
+    # 결측값(-1)이 있으면 NaN을 붙여 float으로, 없으면 to_numeric 결과 dtype 유지
+    if (codes < 0).any():
+        values = np.append(values.astype(float), np.nan)
+    return pd.Series(values[codes], index=col.index, name=col.name)
+
+
+def parse_month_year(col, month_end=False):
+    """
+    MM/YYYY 문자열 컬럼을 datetime으로 한 번에 변환 (변환 불가 값은 NaT)
+    이미 datetime이면 다시 파싱하지 않음
+
+    Args:
+        col (pd.Series): 날짜 컬럼
+        month_end (bool): True면 해당 월의 말일, False면 해당 월 1일
+
+    Returns:
+        pd.Series: datetime64 컬럼
+    """
+    if pd.api.types.is_datetime64_any_dtype(col):
+        parsed = col
+    else:
+        parsed = pd.to_datetime(col, format='%m/%Y', errors='coerce')
+
+    if month_end:
+        parsed = parsed + pd.offsets.MonthEnd(0)
+    return parsed
+
+
+def _load_static(path, money_cols, month_cols, schema):
+    """정적 테이블 로드 + 금액/날짜 파싱 + 작은 dtype 변환 (파일이 바뀌지 않았으면 캐시 사용)"""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    if key not in _STATIC_CACHE:
+        df = pd.read_csv(path, dtype=read_dtypes(schema))
+        for col in money_cols:
+            if col in df.columns:
+                df[col] = parse_money(df[col])
+        for col in month_cols:
+            if col in df.columns:
+                df[col] = parse_month_year(df[col])
+        _STATIC_CACHE[key] = compact_frame(df, schema)
+
+    return _STATIC_CACHE[key].copy()
+
+
+def load_users(path):
+    """
+    users_data.csv 로드 (금액 컬럼 float 변환, common.schema.USERS_SCHEMA dtype)
+    같은 실행 안에서는 한 번만 파싱하고 이후에는 캐시 사본을 반환
+
+    Args:
+        path (str): users_data.csv 경로
+
+    Returns:
+        pd.DataFrame: 고객 데이터
+    """
+    return _load_static(path, USERS_MONEY_COLS, [], USERS_SCHEMA)
+
+
+def load_cards(path):
+    """
+    cards_data.csv 로드 (credit_limit float 변환, expires / acct_open_date는 해당 월 1일 datetime, common.schema.CARDS_SCHEMA dtype)
+    같은 실행 안에서는 한 번만 파싱하고 이후에는 캐시 사본을 반환
+
+    Args:
+        path (str): cards_data.csv 경로
+
+    Returns:
+        pd.DataFrame: 카드 데이터
+    """
+    return _load_static(path, CARDS_MONEY_COLS, CARDS_MONTH_COLS, CARDS_SCHEMA)
@@ -0,0 +1,508 @@
+import collections.abc
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # psutil이 없으면 resource 모듈의 프로세스 최대 RSS로 대체
+    psutil = None
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+from .storage import save_frame, load_frame
+from .tracing import span
+
+
+def load_script(path, name=None):
+    """
+    파일 이름에 공백/한글이 있어 import 문으로 불러올 수 없는 단계 스크립트를 모듈로 로드
+    (스크립트의 __main__ 블록은 실행되지 않음)
+
+    Args:
+        path (str): 스크립트 경로
+        name (str, optional): 모듈 이름 (기본: 파일 이름 해시)
+
+    Returns:
+        module: 로드된 모듈
+    """
+    path = os.path.abspath(path)
+    if name is None:
+        name = "stage_" + hashlib.sha1(path.encode("utf-8")).hexdigest()[:12]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def find_script(directory, prefix):
+    """
+    디렉터리에서 prefix로 시작하는 단계 스크립트 경로
+
+    Args:
+        directory (str): 단계 스크립트 디렉터리
+        prefix (str): 파일 이름 접두어
+
+    Returns:
+        str: 스크립트 경로 (이름순 첫 번째)
+    """
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.startswith(prefix) and file_name.endswith('.py'):
+            return os.path.join(directory, file_name)
+    raise FileNotFoundError(f"단계 스크립트를 찾을 수 없습니다: {prefix}")
+
+
+def file_digest(path, block_size=1 << 20):
+    """
+    파일 내용 SHA-256 해시
+
+    Args:
+        path (str): 파일 경로
+        block_size (int): 한 번에 읽을 바이트 수
+
+    Returns:
+        str: 16진수 해시
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def frame_digest(df):
+    """
+    데이터프레임 내용 해시 (컬럼 이름, dtype, 값, index 기준)
+
+    Args:
+        df (pd.DataFrame): 대상 데이터프레임
+
+    Returns:
+        str: 16진수 해시
+    """
+    h = hashlib.sha256()
+    h.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+class PeakRSSMonitor:
+    """
+    구간 실행 중 프로세스 RSS 최댓값 측정
+    - psutil이 있으면 백그라운드 스레드가 interval초 간격으로 RSS를 샘플링
+    - 없으면 resource.getrusage의 프로세스 최대 RSS(누적값)를 사용
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _current_rss(self):
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        if resource is not None:
+            # 리눅스는 KB 단위
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return 0
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._current_rss())
+
+    def __enter__(self):
+        self.peak = self._current_rss()
+        if psutil is not None:
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak = max(self.peak, self._current_rss())
+        return False
+
+
+class Stage:
+    """
+    파이프라인 노드 하나
+    func(*상위 노드 출력, **params)를 호출해 데이터프레임을 반환
+    """
+
+    def __init__(self, name, func, inputs=(), files=(), params=None, checkpoint=None, checkpoint_kwargs=None,
+                 code_files=()):
+        """
+        Args:
+            name (str): 노드 이름
+            func (callable): 실행 함수 (상위 노드 출력 데이터프레임을 inputs 순서대로 받음)
+            inputs (tuple): 상위 노드 이름 목록
+            files (tuple): 함수가 직접 읽는 외부 파일 경로 (내용 해시를 건너뛰기 판단에 사용)
+            params (dict, optional): 함수에 넘길 키워드 인자 (건너뛰기 판단에도 사용)
+            checkpoint (str, optional): 출력 저장 경로 (지정한 노드만 디스크에 저장)
+            checkpoint_kwargs (dict, optional): save_frame에 넘길 추가 인자
+            code_files (tuple): 단계 코드 파일 경로 (내용이 바뀌면 코드 버전이 바뀐 것으로 보고 다시 실행)
+        """
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.files = tuple(files)
+        self.params = dict(params or {})
+        self.checkpoint = checkpoint
+        self.checkpoint_kwargs = dict(checkpoint_kwargs or {})
+        self.code_files = tuple(code_files)
+
+
+class StageOutputs(collections.abc.Mapping):
+    """
+    노드 이름 → 출력 데이터프레임 (처음 조회할 때 로드)
+    건너뛴 노드의 checkpoint / 캐시 출력은 호출한 쪽이 실제로 꺼낼 때만 읽음
+    """
+
+    def __init__(self, names, loader):
+        """
+        Args:
+            names (list): 조회할 수 있는 노드 이름
+            loader (callable): 노드 이름 → 출력 데이터프레임
+        """
+        self.names = list(names)
+        self.loader = loader
+
+    def __getitem__(self, name):
+        if name not in self.names:
+            raise KeyError(name)
+        return self.loader(name)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
+class Pipeline:
+    """
+    단일 프로세스 DAG 파이프라인
+    - 노드 출력은 메모리로 다음 노드에 전달하고, checkpoint가 지정된 노드만 파일로 저장
+    - 입력 파일 내용 해시 + 상위 노드 출력 해시 + 파라미터 + 코드 버전이 이전 실행과 같고 checkpoint가 있으면 실행을 건너뜀
+    - cache(StageCache)를 지정하면 같은 지문의 출력이 캐시에 있을 때도 실행하지 않고 캐시 출력을 사용
+    - 노드별 실행 시간과 최대 RSS 기록
+    """
+
+    def __init__(self, state_file=None, cache=None):
+        """
+        Args:
+            state_file (str, optional): 노드 지문/파일 해시/실행 기록을 저장할 JSON 경로
+                (없으면 checkpoint 기준 건너뛰기 없이 실행)
+            cache (StageCache, optional): 지문 → 출력 캐시
+        """
+        self.stages = {}
+        self.state_file = state_file
+        self.cache = cache
+        self.state = {"fingerprints": {}, "files": {}, "outputs": {}, "runs": {}}
+        if state_file and os.path.exists(state_file):
+            with open(state_file, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+
+    def add(self, stage):
+        """
+        노드 추가
+
+        Args:
+            stage (Stage): 추가할 노드
+
+        Returns:
+            Stage: 추가된 노드
+        """
+        if stage.name in self.stages:
+            raise ValueError(f"이미 등록된 노드입니다: {stage.name}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def sinks(self):
+        """
+        다른 노드의 입력으로 쓰이지 않는 노드 (등록 순서)
+
+        Returns:
+            list: 노드 이름 목록
+        """
+        used = {dep for stage in self.stages.values() for dep in stage.inputs}
+        return [name for name in self.stages if name not in used]
+
+    def order(self, targets=None):
+        """
+        실행 순서 (위상 정렬, 같은 깊이의 노드는 등록 순서)
+
+        Args:
+            targets (list, optional): 실행할 노드 (지정 시 해당 노드와 상위 노드만)
+
+        Returns:
+            list: 노드 이름 목록
+        """
+        for stage in self.stages.values():
+            for dep in stage.inputs:
+                if dep not in self.stages:
+                    raise ValueError(f"'{stage.name}' 노드의 입력 노드가 없습니다: {dep}")
+
+        needed = set(self.stages)
+        if targets is not None:
+            needed, todo = set(), list(targets)
+            while todo:
+                name = todo.pop()
+                if name not in self.stages:
+                    raise ValueError(f"등록되지 않은 노드입니다: {name}")
+                if name not in needed:
+                    needed.add(name)
+                    todo.extend(self.stages[name].inputs)
+
+        ordered, done = [], set()
+        while len(ordered) < len(needed):
+            ready = [name for name in self.stages
+                     if name in needed and name not in done
+                     and all(dep in done for dep in self.stages[name].inputs)]
+            if not ready:
+                raise ValueError("노드 간 순환 의존성이 있습니다.")
+            ordered.extend(ready)
+            done.update(ready)
+        return ordered
+
+    def _file_digest(self, path):
+        """파일 내용 해시 (경로/수정 시각/크기가 같으면 이전에 계산한 값 재사용)"""
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        cached = self.state["files"].get(key)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            return cached["digest"]
+        digest = file_digest(path)
+        self.state["files"][key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "digest": digest}
+        return digest
+
+    def code_version(self, stage):
+        """
+        단계 코드 버전: 실행 함수 소스와 code_files 내용 해시를 합친 해시
+
+        Args:
+            stage (Stage): 대상 노드
+
+        Returns:
+            str: 16진수 해시
+        """
+        try:
+            source = inspect.getsource(stage.func)
+        except (OSError, TypeError):
+            source = getattr(stage.func, '__qualname__', repr(stage.func))
+        h = hashlib.sha256(source.encode("utf-8"))
+        for path in stage.code_files:
+            h.update(self._file_digest(path).encode("utf-8"))
+        return h.hexdigest()
+
+    def fingerprint(self, stage, upstream):
+        """
+        노드 지문: 입력 파일 내용 해시, 상위 노드 출력 키, 파라미터, 코드 버전을 합친 해시
+
+        Args:
+            stage (Stage): 대상 노드
+            upstream (dict): 상위 노드 이름 → 출력 키 (출력 내용 해시, 모르면 지문)
+
+        Returns:
+            str: 16진수 해시
+        """
+        payload = {
+            "files": [self._file_digest(path) for path in stage.files],
+            "inputs": [upstream[dep] for dep in stage.inputs],
+            "params": stage.params,
+            "code": self.code_version(stage),
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def output_key(self, fingerprint):
+        """
+        하위 노드 지문에 쓰는 출력 키
+        이전에 같은 지문으로 실행한 적이 있으면 출력 내용 해시를 사용하므로,
+        코드가 바뀌어도 출력이 같으면 하위 노드는 다시 실행되지 않음
+
+        Args:
+            fingerprint (str): 노드 지문
+
+        Returns:
+            str: 출력 내용 해시 (기록이 없으면 지문)
+        """
+        return self.state["outputs"].get(fingerprint, fingerprint)
+
+    def _reuse(self, stage, fingerprint, force):
+        """재사용 방법: checkpoint(지문이 같고 파일이 있음) / cache(캐시에 출력이 있음) / None(실행 필요)"""
+        if force:
+            return None
+        if (stage.checkpoint is not None and os.path.exists(stage.checkpoint)
+                and self.state["fingerprints"].get(stage.name) == fingerprint):
+            return "checkpoint"
+        if self.cache is not None and fingerprint in self.cache:
+            return "cache"
+        return None
+
+    def _save_state(self):
+        if self.state_file:
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_file)
+
+    def run(self, targets=None, force=False):
+        """
+        파이프라인 실행
+
+        Args:
+            targets (list, optional): 결과가 필요한 노드 (기본: sinks(), 상위 노드는 필요할 때만 실행)
+            force (bool): True면 지문이 같아도 모든 노드를 다시 실행
+
+        Returns:
+            tuple:
+                StageOutputs: 노드 이름 → 출력 데이터프레임 (targets 노드만,
+                    건너뛴 노드는 조회할 때 checkpoint 또는 캐시에서 로드)
+                list: 노드별 실행 기록 (name, status, seconds, peak_rss_mb, rows)
+                    status는 ran(실행), skipped(입력 변경 없음), cached(캐시 출력 사용),
+                    unused(하위 노드가 결과를 쓰지 않음)
+        """
+        if targets is None:
+            targets = self.sinks()
+        names = self.order(targets)
+        targets = set(targets)
+
+        # 1) 노드 지문 계산 및 재사용 방법 결정
+        #    checkpoint: 지문이 같고 checkpoint가 있는 노드 / cache: 같은 지문의 출력이 캐시에 있는 노드
+        fingerprints, keys, reuse = {}, {}, {}
+        for name in names:
+            stage = self.stages[name]
+            fingerprints[name] = self.fingerprint(stage, keys)
+            keys[name] = self.output_key(fingerprints[name])
+            reuse[name] = self._reuse(stage, fingerprints[name], force)
+
+        # 2) 실행할 노드: 하위에서부터, 결과가 필요한 노드 중 재사용할 수 없는 노드
+        #    (checkpoint가 없는 중간 노드는 하위 노드가 실행될 때만 실행)
+        needed = {name: name in targets for name in names}
+        run_set = set()
+        for name in reversed(names):
+            if needed[name] and reuse[name] is None:
+                run_set.add(name)
+                for dep in self.stages[name].inputs:
+                    needed[dep] = True
+
+        # 출력을 소비할 실행 노드 수 (모두 소비되면 메모리에서 해제)
+        consumers = {name: 0 for name in names}
+        for name in run_set:
+            for dep in self.stages[name].inputs:
+                consumers[dep] += 1
+
+        outputs, report = {}, []
+
+        def get_output(name):
+            if name not in outputs:
+                if reuse[name] == "cache":
+                    outputs[name] = self.cache.get(fingerprints[name])
+                else:
+                    outputs[name] = load_frame(self.stages[name].checkpoint)
+            return outputs[name]
+
+        def release_inputs(stage):
+            # 더 이상 쓰지 않는 상위 노드 출력 해제
+            for dep in stage.inputs:
+                consumers[dep] -= 1
+                if consumers[dep] == 0 and dep not in targets:
+                    outputs.pop(dep, None)
+
+        for name in names:
+            stage = self.stages[name]
+
+            if name in run_set:
+                # 상위 노드가 다시 실행됐지만 출력이 이전과 같으면 지문도 이전과 같아져 재사용 가능
+                fingerprint = self.fingerprint(stage, keys)
+                if fingerprint != fingerprints[name]:
+                    fingerprints[name] = fingerprint
+                    keys[name] = self.output_key(fingerprint)
+                    reuse[name] = self._reuse(stage, fingerprint, force)
+                if reuse[name] is not None:
+                    release_inputs(stage)
+
+            if reuse[name] is not None or name not in run_set:
+                if reuse[name] == "cache":
+                    print(f"[{name}] 캐시 출력 사용")
+                    status = "cached"
+                    # checkpoint가 지정된 노드는 캐시 출력으로 checkpoint 파일도 갱신
+                    if stage.checkpoint is not None and (
+                            self.state["fingerprints"].get(name) != fingerprints[name]
+                            or not os.path.exists(stage.checkpoint)):
+                        save_frame(get_output(name), stage.checkpoint, **stage.checkpoint_kwargs)
+                        self.state["fingerprints"][name] = fingerprints[name]
+                        if consumers[name] == 0 and name not in targets:
+                            outputs.pop(name, None)
+                elif reuse[name] == "checkpoint":
+                    print(f"[{name}] 입력 변경 없음 → 건너뜀")
+                    status = "skipped"
+                else:
+                    print(f"[{name}] 결과가 필요 없음 → 건너뜀")
+                    status = "unused"
+                report.append({"name": name, "status": status, "seconds": 0.0,
+                               "peak_rss_mb": None, "rows": None})
+                continue
+
+            print(f"[{name}] 실행 시작")
+            # 아직 실행되지 않은 다른 하위 노드도 쓰는 출력은 사본을 넘겨 노드 간 변경이 섞이지 않게 함
+            args = [get_output(dep).copy() if consumers[dep] > 1 else get_output(dep)
+                    for dep in stage.inputs]
+            start = time.perf_counter()
+            with PeakRSSMonitor() as monitor:
+                # 노드 전체 구간 (트레이싱이 켜져 있으면 하위 단계 구간이 이 아래에 기록됨)
+                with span(name, rows_in=sum(len(arg) for arg in args)) as sp:
+                    result = stage.func(*args, **stage.params)
+                    del args
+                    if result is None:
+                        raise RuntimeError(f"'{name}' 노드가 결과를 반환하지 않았습니다.")
+                    sp.set_rows(rows_out=result)
+                if stage.checkpoint is not None:
+                    with span(f"{name} checkpoint 저장", rows_in=result):
+                        save_frame(result, stage.checkpoint, **stage.checkpoint_kwargs)
+            elapsed = time.perf_counter() - start
+
+            outputs[name] = result
+            keys[name] = frame_digest(result)
+            self.state["outputs"][fingerprints[name]] = keys[name]
+            if self.cache is not None:
+                self.cache.put(fingerprints[name], result, stage=name)
+            record = {"name": name, "status": "ran", "seconds": round(elapsed, 3),
+                      "peak_rss_mb": round(monitor.peak / 2 ** 20, 1),
+                      "rows": len(result)}
+            report.append(record)
+            print(f"[{name}] 완료 ({record['seconds']:.2f}초, 최대 RSS {record['peak_rss_mb']:,.1f}MB)")
+
+            self.state["fingerprints"][name] = fingerprints[name]
+            self.state["runs"][name] = record
+            self._save_state()
+            release_inputs(stage)
+
+        self._save_state()
+        return StageOutputs([name for name in names if name in targets], get_output), report
+
+
+def print_report(report):
+    """
+    노드별 실행 기록 출력
+
+    Args:
+        report (list): Pipeline.run이 반환한 실행 기록
+    """
+    print(f"\n{'노드':<20}{'상태':<10}{'시간(초)':>10}{'최대 RSS(MB)':>15}{'행 수':>12}")
+    for record in report:
+        rss = "-" if record["peak_rss_mb"] is None else f"{record['peak_rss_mb']:,.1f}"
+        rows = "-" if record["rows"] is None else f"{record['rows']:,}"
+        print(f"{record['name']:<20}{record['status']:<10}{record['seconds']:>10.2f}{rss:>15}{rows:>12}")
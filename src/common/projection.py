@@ -0,0 +1,218 @@
+import csv
+import io
+import multiprocessing
+import os
+import time
+import numpy as np
+
+# 한 번에 읽어 처리할 바이트 수 (메모리 사용량은 파일 크기와 무관하게 블록 크기 몇 배 정도)
+BLOCK_SIZE = 32 << 20
+
+COMMA, QUOTE, CR, LF = (ord(c) for c in ',"\r\n')
+
+
+def read_header(path):
+    """
+    CSV 헤더 컬럼 목록과 줄 끝 문자
+
+    Args:
+        path (str): CSV 파일 경로
+
+    Returns:
+        tuple: (컬럼 목록, 헤더 바이트 수, 줄 끝 문자 '\\r\\n' 또는 '\\n')
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+    newline = '\r\n' if header.endswith(b'\r\n') else '\n'
+    columns = next(csv.reader([header.decode('utf-8-sig').rstrip('\r\n')]))
+    return columns, len(header), newline
+
+
+def resolve_keep_indices(columns, keep_columns=None, drop_columns=None):
+    """
+    남길 컬럼 위치 (원래 순서 유지)
+
+    Args:
+        columns (list): 헤더 컬럼 목록
+        keep_columns (list, optional): 남길 컬럼 (지정 시 drop_columns는 무시)
+        drop_columns (list, optional): 삭제할 컬럼
+
+    Returns:
+        list: 남길 컬럼 위치
+    """
+    if keep_columns is not None:
+        keep = set(keep_columns)
+        return [i for i, col in enumerate(columns) if col in keep]
+    drop = set(drop_columns or [])
+    return [i for i, col in enumerate(columns) if col not in drop]
+
+
+def project_block(block, n_columns, keep):
+    """
+    CSV 블록(완전한 줄들)에서 남길 필드만 바이트 단위로 복사
+    줄마다 구분자(따옴표 밖 쉼표, 줄 끝) 위치를 구해 남길 필드 구간만 표시한 뒤 한 번에 잘라냄
+
+    Args:
+        block (bytes): 줄 끝으로 끝나는 CSV 블록
+        n_columns (int): 컬럼 수
+        keep (np.ndarray): 남길 컬럼 위치 (오름차순)
+
+    Returns:
+        bytes: 남길 필드만 남긴 블록 (필드 수가 n_columns가 아닌 줄이나 따옴표 안 줄바꿈이 있으면 None)
+    """
+    data = np.frombuffer(block, dtype=np.uint8)
+    if len(data) == 0:
+        return b''
+    line_ends = np.flatnonzero(data == LF)
+    commas = np.flatnonzero(data == COMMA)
+    quotes = np.flatnonzero(data == QUOTE)
+    if len(quotes):
+        # 앞에 나온 따옴표 수가 홀수인 위치는 따옴표 안 ("" 이스케이프는 두 번 바뀌므로 그대로)
+        if (np.searchsorted(quotes, line_ends) & 1).any():
+            return None
+        commas = commas[(np.searchsorted(quotes, commas) & 1) == 0]
+
+    # 줄마다 쉼표가 정확히 n_columns - 1개인지 확인 (전체 개수가 맞고 각 줄의 첫/마지막 쉼표가 그 줄 안에 있으면 성립)
+    n_lines = len(line_ends)
+    if len(commas) != n_lines * (n_columns - 1):
+        return None
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    # 줄 끝 구분자: \r\n이면 \r 위치
+    field_ends = line_ends - ((line_ends > 0) & (data[np.maximum(line_ends - 1, 0)] == CR))
+    commas = commas.reshape(n_lines, n_columns - 1)
+    if n_columns > 1 and ((commas[:, 0] < line_starts).any() or (commas[:, -1] >= field_ends).any()):
+        return None
+
+    # 필드 j 내용: [앞 구분자 다음, 다음 구분자), 두 번째 남길 필드부터는 앞 쉼표도 포함
+    starts = np.concatenate([line_starts[:, None], commas + 1], axis=1)[:, keep]
+    ends = np.concatenate([commas, field_ends[:, None]], axis=1)[:, keep]
+    starts[:, 1:] -= 1
+    # 남길 구간 + 줄 끝 문자 구간 (정렬되어 있고 겹치지 않음)
+    range_starts = np.concatenate([starts, field_ends[:, None]], axis=1).ravel()
+    range_ends = np.concatenate([ends, line_ends[:, None] + 1], axis=1).ravel()
+
+    # 버릴 구간/남길 구간 길이를 번갈아 늘어놓고 np.repeat로 남길 바이트 표시
+    bounds = np.empty(2 * len(range_starts) + 2, dtype=np.int64)
+    bounds[0], bounds[-1] = 0, len(data)
+    bounds[1:-1:2], bounds[2:-1:2] = range_starts, range_ends
+    pattern = np.zeros(len(bounds) - 1, dtype=bool)
+    pattern[1::2] = True
+    return data[np.repeat(pattern, np.diff(bounds))].tobytes()
+
+
+def _copy_with_csv_module(src, dst, keep, newline):
+    """CSV를 csv 모듈로 한 행씩 읽어 남길 필드만 기록 (따옴표 안 줄바꿈도 처리, 빈 줄은 건너뜀)"""
+    text_src = io.TextIOWrapper(src, encoding='utf-8', newline='')
+    text_dst = io.TextIOWrapper(dst, encoding='utf-8', newline='')
+    writer = csv.writer(text_dst, lineterminator=newline)
+    rows = 0
+    for row in csv.reader(text_src):
+        if not row:
+            continue
+        writer.writerow([row[i] if i < len(row) else '' for i in keep])
+        rows += 1
+    # 래퍼가 원래 파일을 닫지 않도록 분리
+    text_dst.flush()
+    text_src.detach()
+    text_dst.detach()
+    return rows
+
+
+def project_csv(input_file, output_file, keep_columns=None, drop_columns=None, block_size=BLOCK_SIZE):
+    """
+    CSV에서 일부 컬럼만 남겨 새 파일로 복사 (전체를 데이터프레임으로 읽지 않고 남길 필드의 원래 문자열을 그대로 복사)
+    - 줄 경계에 맞춘 블록 단위로 NumPy 바이트 마스크로 잘라냄 (디스크 속도에 가까운 처리량)
+    - 따옴표 안 줄바꿈 등 블록으로 나눌 수 없는 줄이 처음 나온 블록부터는 csv 모듈로 처리
+    - 임시 파일에 쓴 뒤 os.replace로 교체하므로 중간에 실패해도 output_file은 온전함
+
+    Args:
+        input_file (str): 입력 CSV 경로
+        output_file (str): 출력 CSV 경로
+        keep_columns (list, optional): 남길 컬럼 (지정 시 drop_columns는 무시)
+        drop_columns (list, optional): 삭제할 컬럼
+        block_size (int): 블록 바이트 수
+
+    Returns:
+        dict: input, output, kept, dropped, rows, bytes_in, bytes_out, csv_module_rows, elapsed_sec
+    """
+    start_time = time.perf_counter()
+    columns, header_size, newline = read_header(input_file)
+    keep = resolve_keep_indices(columns, keep_columns, drop_columns)
+    if not keep:
+        raise ValueError(f"남길 컬럼이 없습니다: {input_file}")
+    keep_array = np.asarray(keep, dtype=np.int64)
+
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    rows = csv_module_rows = 0
+    with open(input_file, 'rb') as src, open(tmp_file, 'wb') as dst:
+        header_buffer = io.StringIO()
+        csv.writer(header_buffer, lineterminator=newline).writerow([columns[i] for i in keep])
+        dst.write(header_buffer.getvalue().encode('utf-8'))
+        src.seek(header_size)
+
+        carry = b''
+        while True:
+            offset = src.tell() - len(carry)
+            data = src.read(block_size)
+            if not data:
+                block = carry
+            else:
+                data = carry + data
+                cut = data.rfind(b'\n') + 1
+                if cut == 0:  # 한 줄이 block_size보다 긴 경우 다음 읽기와 합침
+                    carry = data
+                    continue
+                block, carry = data[:cut], data[cut:]
+            if block and not block.endswith(b'\n'):
+                block += newline.encode()  # 마지막 줄에 줄 끝이 없는 파일
+
+            projected = project_block(block, len(columns), keep_array)
+            if projected is None:
+                # 이 블록 시작(줄 경계)부터 파일 끝까지 csv 모듈로 처리
+                src.seek(offset)
+                csv_module_rows = _copy_with_csv_module(src, dst, keep, newline)
+                rows += csv_module_rows
+                break
+            dst.write(projected)
+            rows += block.count(b'\n')
+            if not data:
+                break
+
+    os.replace(tmp_file, output_file)
+    return {
+        'input': input_file,
+        'output': output_file,
+        'kept': [columns[i] for i in keep],
+        'dropped': [col for i, col in enumerate(columns) if i not in set(keep)],
+        'rows': rows,
+        'bytes_in': os.path.getsize(input_file),
+        'bytes_out': os.path.getsize(output_file),
+        'csv_module_rows': csv_module_rows,
+        'elapsed_sec': round(time.perf_counter() - start_time, 3),
+    }
+
+
+def _project_task(task):
+    input_file, output_file, keep_columns, drop_columns, block_size = task
+    return project_csv(input_file, output_file, keep_columns, drop_columns, block_size)
+
+
+def project_csv_files(jobs, keep_columns=None, drop_columns=None, block_size=BLOCK_SIZE, n_workers=1):
+    """
+    여러 CSV 파일의 컬럼 선택을 프로세스별로 병렬 실행
+
+    Args:
+        jobs (list): (입력 경로, 출력 경로) 목록
+        keep_columns (list, optional): 남길 컬럼
+        drop_columns (list, optional): 삭제할 컬럼
+        block_size (int): 블록 바이트 수
+        n_workers (int): 프로세스 수
+
+    Returns:
+        list: 파일별 project_csv 결과 (jobs 순서)
+    """
+    tasks = [(src, dst, keep_columns, drop_columns, block_size) for src, dst in jobs]
+    if n_workers > 1 and len(tasks) > 1:
+        with multiprocessing.Pool(min(n_workers, len(tasks))) as pool:
+            return pool.map(_project_task, tasks)
+    return [_project_task(task) for task in tasks]
@@ -0,0 +1,254 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# 파일별 컬럼 → 메모리에 둘 dtype
+# - 정수: 값 범위에 맞는 가장 작은 폭 (거래 id는 2^31 미만, 고객/카드 id와 mcc는 2^15 미만)
+# - 'category': 값 종류가 적은 문자열 (행마다 파이썬 문자열 객체를 두지 않고 정수 코드만 보관)
+# - 'str': 앞자리 0을 보존해야 하는 zip 등 문자열로 유지할 컬럼
+# - 금액은 float32 (센트 단위까지 정확한 범위: 약 16만 달러 미만)
+TRANSACTIONS_SCHEMA = {
+    'id': 'int32',
+    'client_id': 'int16',
+    'card_id': 'int16',
+    'amount': 'float32',
+    'use_chip': 'category',
+    'merchant_id': 'int32',
+    'merchant_city': 'category',
+    'merchant_state': 'category',
+    'zip': 'str',
+    'mcc': 'int16',
+    'errors': 'category',
+    'mcc_type': 'category',
+    'fraud': 'int8',
+}
+
+USERS_SCHEMA = {
+    'id': 'int16',
+    'current_age': 'int8',
+    'retirement_age': 'int8',
+    'birth_year': 'int16',
+    'birth_month': 'int8',
+    'gender': 'category',
+    'latitude': 'float32',
+    'longitude': 'float32',
+    'per_capita_income': 'float32',
+    'yearly_income': 'float32',
+    'total_debt': 'float32',
+    'credit_score': 'int16',
+    'num_credit_cards': 'int8',
+}
+
+CARDS_SCHEMA = {
+    'id': 'int16',
+    'client_id': 'int16',
+    'card_brand': 'category',
+    'card_type': 'category',
+    'cvv': 'int16',
+    'has_chip': 'category',
+    'num_cards_issued': 'int8',
+    'credit_limit': 'float32',
+    'year_pin_last_changed': 'int16',
+    'card_on_dark_web': 'category',
+}
+
+FRAUD_LABELS_SCHEMA = {
+    'id': 'int32',
+    'Status': 'category',
+}
+
+LOCATIONS_SCHEMA = {
+    'zip': 'str',
+}
+
+# Join된 거래 (고객/카드 컬럼 + 거래 컬럼, 이름이 겹치는 id/client_id는 거래 기준)
+JOINED_SCHEMA = {**USERS_SCHEMA, **CARDS_SCHEMA, **TRANSACTIONS_SCHEMA}
+
+# 파일 이름 → 스키마 (거래 파일은 이름이 transaction으로 시작하면 모두 거래 스키마)
+FILE_SCHEMAS = {
+    'users_data.csv': USERS_SCHEMA,
+    'cards_data.csv': CARDS_SCHEMA,
+    'sorted_fraud.csv': FRAUD_LABELS_SCHEMA,
+    'location_data_with_geo_final.csv': LOCATIONS_SCHEMA,
+}
+
+
+def schema_for(path):
+    """
+    파일 이름에 맞는 스키마
+
+    Args:
+        path (str): 파일 경로
+
+    Returns:
+        dict: 컬럼 → dtype (모르는 파일이면 빈 dict)
+    """
+    name = os.path.basename(path)
+    if name in FILE_SCHEMAS:
+        return FILE_SCHEMAS[name]
+    if name.startswith('transaction_joined'):
+        return JOINED_SCHEMA
+    if name.startswith('transaction'):
+        return TRANSACTIONS_SCHEMA
+    return {}
+
+
+def read_dtypes(schema, categorical=True):
+    """
+    read_csv에 넘길 dtype 인자 (문자열/범주형 컬럼만)
+    정수 컬럼은 read_csv에 좁은 폭을 지정하면 범위를 넘는 값이 경고 없이 잘리므로
+    기본 추론으로 읽은 뒤 compact_frame에서 범위를 확인하고 줄임
+
+    Args:
+        schema (dict): 컬럼 → dtype
+        categorical (bool): False면 범주형 컬럼도 문자열로 읽음 (청크마다 범주가 달라지면 안 되는 스트리밍 저장용)
+
+    Returns:
+        dict: 컬럼 → read_csv dtype
+    """
+    dtypes = {}
+    for col, dtype in schema.items():
+        if dtype == 'str':
+            dtypes[col] = str
+        elif dtype == 'category':
+            dtypes[col] = 'category' if categorical else str
+    return dtypes
+
+
+def compact_series(series, dtype):
+    """
+    컬럼 하나를 스키마 dtype으로 줄임 (값이 바뀌는 변환은 하지 않고 원래 컬럼을 그대로 반환)
+    - 정수: 값이 모두 범위 안의 정수일 때만 변환, 결측이 있으면 2^24 이하 정수에 한해 float32
+    - float32: 숫자 컬럼만 변환
+    - category: 문자열 컬럼만 변환
+    - str: 변환하지 않음
+
+    Args:
+        series (pd.Series): 컬럼
+        dtype (str): 스키마 dtype
+
+    Returns:
+        pd.Series: 변환된 컬럼
+    """
+    if dtype == 'str':
+        return series
+    if dtype == 'category':
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            return series.astype('category')
+        return series
+
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series
+    target = np.dtype(dtype)
+    if series.dtype == target:
+        return series
+    if target.kind == 'f':
+        return series.astype(target)
+
+    if pd.api.types.is_integer_dtype(series) and not series.hasnans:
+        values = series.to_numpy()
+    else:
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        present = values[~np.isnan(values)]
+        if not np.all(present == np.trunc(present)):
+            return series
+        if len(present) < len(values):
+            if len(present) and np.abs(present).max() > 2 ** 24:
+                return series
+            return series.astype(np.float32)
+    if len(values) == 0:
+        return series.astype(target)
+    info = np.iinfo(target)
+    if values.min() < info.min or values.max() > info.max:
+        return series
+    return series.astype(target)
+
+
+def compact_frame(df, schema, categorical=True):
+    """
+    데이터프레임의 스키마 컬럼을 작은 dtype으로 변환 (스키마에 없는 컬럼은 그대로)
+
+    Args:
+        df (pd.DataFrame): 데이터프레임
+        schema (dict): 컬럼 → dtype
+        categorical (bool): False면 범주형 변환은 하지 않음 (청크별 스트리밍 저장용)
+
+    Returns:
+        pd.DataFrame: 변환된 데이터프레임 (원본은 수정하지 않음)
+    """
+    df = df.copy(deep=False)
+    for col, dtype in schema.items():
+        if col not in df.columns or (dtype == 'category' and not categorical):
+            continue
+        df[col] = compact_series(df[col], dtype)
+    return df
+
+
+def add_categories(series, values):
+    """
+    범주형 컬럼에 새로 넣을 값을 범주로 추가 (범주형이 아니면 그대로)
+
+    Args:
+        series (pd.Series): 컬럼
+        values (list): 추가할 값
+
+    Returns:
+        pd.Series: 범주가 추가된 컬럼
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    new_values = [value for value in values if value not in series.cat.categories]
+    return series.cat.add_categories(new_values) if new_values else series
+
+
+def _default_dtype_bytes(series):
+    """pandas 기본 dtype(int64/float64, 파이썬 문자열 객체)으로 읽었을 때의 메모리 (memory_usage(deep=True) 기준)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        sizes = np.array([sys.getsizeof(value) for value in series.cat.categories], dtype=np.int64)
+        n_missing = int((codes < 0).sum())
+        return 8 * len(series) + int(counts @ sizes) + n_missing * sys.getsizeof(np.nan)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return 8 * len(series)
+    return series.memory_usage(deep=True, index=False)
+
+
+def memory_report(df):
+    """
+    컬럼별 메모리 사용량: pandas 기본 dtype 기준 추정치와 현재 dtype (memory_usage(deep=True))
+
+    Args:
+        df (pd.DataFrame): 데이터프레임
+
+    Returns:
+        pd.DataFrame: dtype, default_mb, compact_mb 컬럼 (마지막 행 'total'은 합계)
+    """
+    mb = 1 / 2 ** 20
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        'default_mb': [_default_dtype_bytes(df[col]) * mb for col in df.columns],
+        'compact_mb': df.memory_usage(deep=True, index=False) * mb,
+    })
+    report.loc['total'] = ['', report['default_mb'].sum(), report['compact_mb'].sum()]
+    return report
+
+
+def print_memory_report(df, title="메모리 사용량"):
+    """
+    memory_report를 출력하고 결과를 반환
+
+    Args:
+        df (pd.DataFrame): 데이터프레임
+        title (str): 출력 제목
+
+    Returns:
+        pd.DataFrame: memory_report 결과
+    """
+    report = memory_report(df)
+    default_mb, compact_mb = report.loc['total', ['default_mb', 'compact_mb']]
+    saved = 1 - compact_mb / default_mb if default_mb else 0.0
+    print(f"{title}: 기본 dtype {default_mb:,.1f}MB → {compact_mb:,.1f}MB ({saved:.0%} 감소)")
+    print(report.round(2).to_string())
+    return report
@@ -0,0 +1,477 @@
+import collections
+import json
+import math
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .encoding import EncodingRegistry, UNKNOWN_CODE
+from .geo import GeocodeIndex, EARTH_RADIUS_KM, MIN_GAP_HOURS
+from .importance import CATEGORICAL_COLS
+from .parsing import load_users, load_cards, parse_month_year
+from .velocity import VELOCITY_WINDOWS, velocity_columns
+from .validity import LOCATION_COLS
+from .zip_codes import US_STATES, COUNTRY_ZIP_MAP, OTHER_COUNTRY_ZIP, ONLINE_ZIP
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data')
+LOCATION_FILE_NAME = 'location_data_with_geo_final.csv'
+LOCATION_SUBDIR = '좌표 변환 기록 파일'
+
+# 전처리05 모델 입력 컬럼 (전처리04 build_extra_features 결과에서 fraud를 뺀 컬럼, 같은 순서)
+TRANSACTION_FEATURE_COLS = ['client_id', 'amount', 'use_chip', 'merchant_id', 'merchant_city', 'merchant_state',
+                            'mcc', 'errors']
+USER_FEATURE_COLS = ['gender', 'address', 'latitude', 'longitude', 'per_capita_income', 'yearly_income',
+                     'total_debt', 'credit_score', 'num_credit_cards']
+CARD_FEATURE_COLS = ['card_brand', 'card_type', 'has_chip', 'num_cards_issued', 'credit_limit',
+                     'year_pin_last_changed', 'expires_last_day']
+DERIVED_FEATURE_COLS = ['transaction_hour', 'transaction_dayofweek', 'account_age_days', 'months_to_expiry',
+                        'transaction_age', 'years_to_retirement', 'zip_prefix']
+MODEL_FEATURE_COLS = [*TRANSACTION_FEATURE_COLS, *velocity_columns(), *USER_FEATURE_COLS, *CARD_FEATURE_COLS,
+                      *DERIVED_FEATURE_COLS]
+
+# 카드별 상태 LRU 캐시 기본 상한 (카드 수)
+MAX_CARDS = 200_000
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+_US_STATES = frozenset(US_STATES)
+_MISSING_TEXT = ('', 'NULL')
+
+
+def _is_missing(value):
+    """결측 여부 (None, NaN, pd.NA, 원본 CSV의 빈 문자열 / 'NULL')"""
+    if value is None or value is pd.NA:
+        return True
+    if isinstance(value, float):
+        return value != value
+    return isinstance(value, str) and value in _MISSING_TEXT
+
+
+def _parse_datetime(value):
+    """거래 시각 → datetime ('YYYY-MM-DD HH:MM:SS' 문자열은 fromisoformat으로 빠르게 변환)"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def _parse_amount(value):
+    """금액 → 양수 float (원본 '$-12.34' 형식 포함, 배치 경로와 같이 float32로 반올림)"""
+    if isinstance(value, str):
+        value = value.replace('$', '').replace(',', '').strip()
+    return float(np.float32(abs(float(value))))
+
+
+def format_zip(value):
+    """
+    zip 값 하나를 5자리 문자열로 표준화 (common.zip_codes.format_zip_series와 같은 규칙)
+
+    Args:
+        value: 원본 zip 값 ('58523.0', 58523.0, 'MEX00' 등, 결측은 None)
+
+    Returns:
+        str: 표준화된 zip (결측이면 pd.NA)
+    """
+    if _is_missing(value):
+        return pd.NA
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return str(int(number)).zfill(5) if math.isfinite(number) else text
+
+
+def clean_location(merchant_city, merchant_state, zip_value):
+    """
+    거래 하나의 가맹점 위치 결측 처리 (전처리02 preprocess_and_clean_data와 같은 규칙)
+    - ONLINE 거래: merchant_state 결측 → 'ONLINE', zip 결측 → '00000'
+    - 해외 결제 (미국 주가 아닌 merchant_state): zip 결측 → 국가 가상 ZIP
+    - zip은 5자리 문자열로 표준화
+
+    Args:
+        merchant_city (str): 가맹점 도시
+        merchant_state (str): 가맹점 주/국가 (결측 가능)
+        zip_value: 원본 zip (결측 가능)
+
+    Returns:
+        tuple: (merchant_state, zip) (결측은 각각 None, pd.NA)
+    """
+    state = None if _is_missing(merchant_state) else merchant_state
+    zip_missing = _is_missing(zip_value)
+    if merchant_city == 'ONLINE':
+        if state is None:
+            state = 'ONLINE'
+        if zip_missing:
+            return state, ONLINE_ZIP
+    elif zip_missing and state is not None and state not in _US_STATES:
+        return state, COUNTRY_ZIP_MAP.get(str(state).upper().strip(), OTHER_COUNTRY_ZIP)
+    return state, format_zip(zip_value)
+
+
+def haversine_scalar(lat1, lon1, lat2, lon2):
+    """두 좌표 사이의 대원 거리 (km, common.geo.haversine_km의 스칼라 버전, 결측 좌표는 NaN)"""
+    if lat1 != lat1 or lon1 != lon1 or lat2 != lat2 or lon2 != lon2:
+        return math.nan
+    lat1, lon1, lat2, lon2 = math.radians(lat1), math.radians(lon1), math.radians(lat2), math.radians(lon2)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(max(a, 0.0), 1.0)))
+
+
+class CardState:
+    """
+    카드 하나의 최근 거래 상태
+    - events: 가장 긴 시간 창 안의 거래 (초, 금액, merchant_id, mcc), 시각 순
+    - last_seconds: 직전 거래 시각 (창 밖이어도 유지, card_secs_since_prev 계산용)
+    - last_location: 직전 좌표가 있는 거래의 (위도, 경도, 초)
+    """
+    __slots__ = ('events', 'last_seconds', 'last_location')
+
+    def __init__(self):
+        self.events = collections.deque()
+        self.last_seconds = None
+        self.last_location = None
+
+
+class CardStateCache:
+    """
+    카드별 상태 LRU 캐시
+    상한을 넘으면 가장 오래 조회되지 않은 카드 상태부터 삭제 (삭제된 카드가 다시 오면 빈 상태에서 시작하므로
+    최근 거래 기반 특성이 배치 결과보다 작게 나올 수 있음, evictions로 확인)
+    """
+
+    def __init__(self, max_cards=MAX_CARDS):
+        """
+        Args:
+            max_cards (int): 보관할 최대 카드 수
+        """
+        if max_cards < 1:
+            raise ValueError("max_cards는 1 이상이어야 합니다.")
+        self.max_cards = max_cards
+        self.states = collections.OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self.states)
+
+    def __contains__(self, key):
+        return key in self.states
+
+    def get(self, key):
+        """
+        카드 상태 조회 (없으면 새로 만들고, 상한을 넘으면 가장 오래된 상태 삭제)
+
+        Args:
+            key (tuple): (client_id, card_id)
+
+        Returns:
+            CardState: 카드 상태
+        """
+        state = self.states.get(key)
+        if state is not None:
+            self.states.move_to_end(key)
+            self.hits += 1
+            return state
+        self.misses += 1
+        state = self.states[key] = CardState()
+        if len(self.states) > self.max_cards:
+            self.states.popitem(last=False)
+            self.evictions += 1
+        return state
+
+    def stats(self):
+        """hits, misses, evictions, cards (현재 보관 카드 수)"""
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'cards': len(self.states)}
+
+
+class OnlineFeatureAssembler:
+    """
+    거래 하나를 전처리05 모델 입력 벡터로 바로 변환하는 온라인 특성 조립기
+    - 시작 시 고객/카드 테이블을 id → 특성 값 dict로, 좌표 테이블을 위치 조합 → 위도/경도 dict로,
+      MCC 코드를 코드 → 상점 유형 dict로 한 번만 만들어 둠 (거래마다 파일/데이터프레임을 다시 읽지 않음)
+    - 범주형 코드는 학습에 쓴 EncodingRegistry 어휘로 변환
+      (고객/카드 컬럼은 시작 시 테이블 전체를 미리 변환, 거래 컬럼은 어휘 문자열 → 코드 dict 조회)
+    - 카드별 속도 특성(common.velocity)과 직전 좌표는 CardStateCache(LRU)에 보관해 거래마다 갱신
+    - 결측 처리 → Join → 파생 특성 규칙은 전처리01~04 배치 경로와 같음
+
+    배치 경로와 같은 결과를 얻으려면 카드별로 시각 순으로 거래가 들어와야 함 (VelocityState와 같은 조건)
+    배치 경로는 사기 라벨이 없는 거래를 속도 특성 계산 전에 버리지만, 온라인 경로는 들어온 거래를 모두 반영함
+    """
+
+    def __init__(self, users_df, cards_df, registry, geocode=None, mcc_codes=None, feature_names=None,
+                 max_cards=MAX_CARDS, windows=VELOCITY_WINDOWS):
+        """
+        Args:
+            users_df (pd.DataFrame): 고객 데이터 (load_users 결과)
+            cards_df (pd.DataFrame): 카드 데이터 (load_cards 결과)
+            registry (EncodingRegistry): 학습에 쓴 범주형 어휘 (feature_names의 범주형 컬럼이 모두 있어야 함)
+            geocode (GeocodeIndex, optional): 좌표 테이블 (없으면 위치 특성은 NaN)
+            mcc_codes (dict, optional): MCC 코드 → 상점 유형
+            feature_names (list, optional): 모델 입력 컬럼 순서 (기본: MODEL_FEATURE_COLS)
+            max_cards (int): 카드별 상태 LRU 캐시 상한
+            windows (dict): 속도 특성 시간 창 이름 → 길이 (초)
+        """
+        self.feature_names = list(MODEL_FEATURE_COLS if feature_names is None else feature_names)
+        unknown = [name for name in self.feature_names if name not in MODEL_FEATURE_COLS]
+        if unknown:
+            raise ValueError(f"온라인 경로에서 만들 수 없는 특성입니다: {unknown}")
+        categorical = [name for name in self.feature_names if name in CATEGORICAL_COLS]
+        missing_vocab = [name for name in categorical if name not in registry]
+        if missing_vocab:
+            raise ValueError(f"어휘에 없는 범주형 컬럼입니다: {missing_vocab}")
+
+        self.registry = registry
+        self.windows = sorted(dict(windows).items(), key=lambda item: item[1])
+        self.longest = self.windows[-1][1]
+        self.cards = CardStateCache(max_cards)
+        self.mcc_codes = dict(mcc_codes or {})
+        # 정적 컬럼 값 → 코드 (테이블 변환 결과), 어휘 문자열 → 코드 (거래 컬럼, 정수/문자열 값은 str()이 어휘 문자열과 같음)
+        self.codes = {name: {} for name in categorical}
+        self.vocab_codes = {name: dict(zip(registry.vocabularies[name].tolist(),
+                                           range(UNKNOWN_CODE + 1, registry.size(name))))
+                            for name in categorical}
+        self.slots = [(name, self.codes.get(name), self.vocab_codes.get(name)) for name in self.feature_names]
+
+        # 고객/카드 조회 테이블 (전처리03 build_lookups / 전처리04 build_extra_features와 같은 컬럼)
+        # id → (특성 값 dict, 파생 특성 계산에 쓰는 값)
+        users_df = users_df.reset_index(drop=True)
+        cards_df = cards_df.reset_index(drop=True)
+        cards_df = cards_df.assign(expires_last_day=parse_month_year(cards_df['expires'], month_end=True))
+        self.users = dict(zip(users_df['id'].tolist(), zip(
+            self._static_records(users_df, USER_FEATURE_COLS),
+            users_df['birth_year'].tolist(),
+            users_df['retirement_age'].tolist(),
+        )))
+        self.card_info = dict(zip(cards_df['id'].tolist(), zip(
+            self._static_records(cards_df, CARD_FEATURE_COLS),
+            [value.to_pydatetime() for value in cards_df['acct_open_date']],
+            (cards_df['expires_last_day'].dt.year * 12 + cards_df['expires_last_day'].dt.month).tolist(),
+        )))
+
+        # 위치 조합 → (위도, 경도) (GeocodeIndex와 같이 컬럼 값을 문자열로 맞춘 키, ONLINE은 NaN)
+        self.locations = {}
+        if geocode is not None:
+            keys = zip(*(geocode.locations[col].astype(str).tolist() for col in LOCATION_COLS))
+            self.locations = dict(zip(keys, zip(geocode.latitude.tolist(), geocode.longitude.tolist())))
+
+    def _static_records(self, df, feature_cols):
+        """
+        정적 테이블 행별 {특성 컬럼: 값} 목록
+        범주형 컬럼은 테이블 컬럼 전체를 registry로 한 번에 변환해 값 → 코드 캐시에 미리 채움 (배치 경로와 같은 dtype으로 변환)
+        """
+        for col in feature_cols:
+            if col in self.codes:
+                self.codes[col].update(zip(df[col].tolist(), self.registry.encode(col, df[col]).tolist()))
+        return df[feature_cols].to_dict('records')
+
+    @classmethod
+    def from_files(cls, users_file, cards_file, registry_file, location_file=None, mcc_codes_file=None, **kwargs):
+        """
+        파일로 조립기 생성
+
+        Args:
+            users_file (str): users_data.csv 경로
+            cards_file (str): cards_data.csv 경로
+            registry_file (str): 범주형 어휘 파일 경로 (EncodingRegistry.save 결과)
+            location_file (str, optional): location_data_with_geo_final.csv 경로
+            mcc_codes_file (str, optional): mcc_codes.json 경로
+            **kwargs: OnlineFeatureAssembler 생성 인자 (feature_names, max_cards 등)
+
+        Returns:
+            OnlineFeatureAssembler: 생성된 조립기
+        """
+        registry = EncodingRegistry.load(registry_file, missing_ok=False)
+        geocode = GeocodeIndex.from_file(location_file) if location_file else None
+        mcc_codes = None
+        if mcc_codes_file:
+            with open(mcc_codes_file, 'r', encoding='utf-8') as f:
+                mcc_codes = json.load(f)
+        return cls(load_users(users_file), load_cards(cards_file), registry, geocode=geocode,
+                   mcc_codes=mcc_codes, **kwargs)
+
+    @classmethod
+    def from_data_dir(cls, registry_file, data_dir=DATA_DIR, **kwargs):
+        """
+        data/ 디렉터리의 기준 파일로 조립기 생성
+        좌표 테이블은 data_dir 바로 아래 또는 '좌표 변환 기록 파일' 하위 디렉터리에서 찾음
+
+        Args:
+            registry_file (str): 범주형 어휘 파일 경로
+            data_dir (str): users_data.csv, cards_data.csv, mcc_codes.json이 있는 디렉터리
+            **kwargs: OnlineFeatureAssembler 생성 인자
+
+        Returns:
+            OnlineFeatureAssembler: 생성된 조립기
+        """
+        location_file = os.path.join(data_dir, LOCATION_FILE_NAME)
+        if not os.path.exists(location_file):
+            location_file = os.path.join(data_dir, LOCATION_SUBDIR, LOCATION_FILE_NAME)
+        mcc_codes_file = os.path.join(data_dir, 'mcc_codes.json')
+        return cls.from_files(os.path.join(data_dir, 'users_data.csv'), os.path.join(data_dir, 'cards_data.csv'),
+                              registry_file, location_file if os.path.exists(location_file) else None,
+                              mcc_codes_file if os.path.exists(mcc_codes_file) else None, **kwargs)
+
+    def _velocity(self, state, seconds, amount, merchant_id, mcc, record):
+        """카드 상태에 거래를 추가하고 시간 창별 속도 특성 계산 (창은 (t - 길이, t], 현재 거래 포함)"""
+        events = state.events
+        while events and events[0][0] <= seconds - self.longest:
+            events.popleft()
+        events.append((seconds, amount, merchant_id, mcc))
+        record['card_secs_since_prev'] = math.nan if state.last_seconds is None else float(seconds - state.last_seconds)
+        state.last_seconds = seconds
+
+        # 최신 거래부터 거꾸로 보며 짧은 창부터 차례로 마감
+        total = 0.0
+        amounts, merchants, mccs = [], set(), set()
+        window_iter = iter(self.windows)
+        name, length = next(window_iter)
+        for event_seconds, event_amount, event_merchant, event_mcc in reversed(events):
+            while event_seconds <= seconds - length:
+                self._close_window(record, name, total, amounts, merchants, mccs)
+                name, length = next(window_iter, (None, None))
+                if name is None:
+                    return
+            total += event_amount
+            amounts.append(event_amount)
+            merchants.add(event_merchant)
+            mccs.add(event_mcc)
+        while name is not None:
+            self._close_window(record, name, total, amounts, merchants, mccs)
+            name, length = next(window_iter, (None, None))
+
+    @staticmethod
+    def _close_window(record, name, total, amounts, merchants, mccs):
+        count = len(amounts)
+        mean = total / count
+        if count > 1:
+            std = math.sqrt(sum((value - mean) ** 2 for value in amounts) / (count - 1))
+        else:
+            std = math.nan
+        record[f'card_txn_count_{name}'] = count
+        record[f'card_amount_sum_{name}'] = total
+        record[f'card_amount_mean_{name}'] = mean
+        record[f'card_amount_std_{name}'] = std
+        record[f'card_merchant_nunique_{name}'] = len(merchants)
+        record[f'card_mcc_nunique_{name}'] = len(mccs)
+
+    def _geo(self, state, home, seconds, merchant_state, zip_value, merchant_city, record):
+        """가맹점 좌표, 소유자 주소 거리, 같은 카드 직전 좌표 거래와의 거리/시간 간격/이동 속도 (common.geo와 같은 규칙)"""
+        # 배치 경로의 astype(str)과 같은 키 (merchant_state 결측은 'nan', zip 결측은 '<NA>')
+        state_key = 'nan' if merchant_state is None else str(merchant_state)
+        latitude, longitude = self.locations.get((str(zip_value), state_key, str(merchant_city)),
+                                                 (math.nan, math.nan))
+        record['merchant_latitude'] = latitude
+        record['merchant_longitude'] = longitude
+        record['home_distance_km'] = haversine_scalar(home['latitude'], home['longitude'], latitude, longitude)
+        if state.last_location is None:
+            prev_distance = gap_hours = speed = math.nan
+        else:
+            prev_latitude, prev_longitude, prev_seconds = state.last_location
+            prev_distance = haversine_scalar(prev_latitude, prev_longitude, latitude, longitude)
+            gap_hours = (seconds - prev_seconds) / 3600
+            if gap_hours < 0:
+                gap_hours = math.nan
+            speed = math.nan if gap_hours != gap_hours else prev_distance / max(gap_hours, MIN_GAP_HOURS)
+        record['prev_distance_km'] = prev_distance
+        record['prev_gap_hours'] = gap_hours
+        record['travel_speed_kmh'] = speed
+        if latitude == latitude:
+            state.last_location = (latitude, longitude, seconds)
+
+    def features(self, transaction):
+        """
+        원본 거래 하나의 특성 값 계산 (카드 상태 갱신)
+
+        Args:
+            transaction (dict): 원본 거래 (transactions_data.csv 한 행: date, client_id, card_id, amount, use_chip,
+                merchant_id, merchant_city, merchant_state, zip, mcc, errors, 문자열 그대로여도 됨)
+
+        Returns:
+            dict: MODEL_FEATURE_COLS + GEO_FEATURE_COLS + mcc_type 값 (범주형은 변환 전 값)
+        """
+        client_id = int(transaction['client_id'])
+        card_id = int(transaction['card_id'])
+        user = self.users.get(client_id)
+        card = self.card_info.get(card_id)
+        if user is None or card is None:
+            raise KeyError(f"고객/카드 테이블에 없는 거래입니다: client_id={client_id}, card_id={card_id}")
+        user_features, birth_year, retirement_age = user
+        card_features, acct_open_date, expiry_month = card
+
+        date = _parse_datetime(transaction['date'])
+        seconds = (date - _EPOCH) // _SECOND
+        amount = _parse_amount(transaction['amount'])
+        merchant_id = int(transaction['merchant_id'])
+        mcc = int(transaction['mcc'])
+        merchant_city = transaction['merchant_city']
+        merchant_state, zip_value = clean_location(merchant_city, transaction.get('merchant_state'),
+                                                   transaction.get('zip'))
+        errors = transaction.get('errors')
+
+        record = {
+            'client_id': client_id,
+            'amount': amount,
+            'use_chip': transaction['use_chip'],
+            'merchant_id': merchant_id,
+            'merchant_city': merchant_city,
+            'merchant_state': merchant_state,
+            'mcc': mcc,
+            'errors': 'No Error' if _is_missing(errors) else errors,
+            'mcc_type': self.mcc_codes.get(str(mcc), 'Unknown'),
+        }
+        state = self.cards.get((client_id, card_id))
+        self._velocity(state, seconds, amount, merchant_id, mcc, record)
+        record.update(user_features)
+        record.update(card_features)
+        self._geo(state, user_features, seconds, merchant_state, zip_value, merchant_city, record)
+
+        # 파생 특성 (전처리04 build_extra_features와 같은 식)
+        transaction_age = date.year - birth_year
+        record['transaction_hour'] = date.hour
+        record['transaction_dayofweek'] = date.weekday()
+        record['account_age_days'] = (date - acct_open_date).days
+        record['months_to_expiry'] = expiry_month - (date.year * 12 + date.month)
+        record['transaction_age'] = transaction_age
+        record['years_to_retirement'] = retirement_age - transaction_age
+        # 배치 경로와 같이 zip 결측(pd.NA)도 문자열로 바꾼 뒤 앞 3자리 사용
+        record['zip_prefix'] = str(zip_value)[:3]
+        return record
+
+    @staticmethod
+    def _code(cache, vocab, value):
+        if _is_missing(value):
+            return UNKNOWN_CODE
+        code = cache.get(value)
+        if code is None:
+            code = vocab.get(str(value), UNKNOWN_CODE)
+        return code
+
+    def encode(self, record):
+        """
+        특성 값 → 모델 입력 벡터 (common.importance.encode_features와 같은 변환)
+
+        Args:
+            record (dict): features 결과
+
+        Returns:
+            np.ndarray: float32 벡터 (feature_names 순서, 어휘에 없는 범주/결측 범주는 UNKNOWN_CODE)
+        """
+        code = self._code
+        values = [code(cache, vocab, record[name]) if cache is not None else record[name]
+                  for name, cache, vocab in self.slots]
+        return np.array(values, dtype=np.float32)
+
+    def assemble(self, transaction):
+        """
+        원본 거래 하나 → 모델 입력 벡터 (features + encode)
+
+        Args:
+            transaction (dict): 원본 거래
+
+        Returns:
+            np.ndarray: float32 벡터 (feature_names 순서)
+        """
+        return self.encode(self.features(transaction))
@@ -0,0 +1,240 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+from .storage import save_frame, load_frame
+from .schema import TRANSACTIONS_SCHEMA, compact_frame
+from .augmentation import normalize_transactions, augment_fraud, pad_fraud, finalize_training_set
+from .undersampling import knn_undersample
+from .tracing import span
+
+# 카드 그룹을 나눌 샤드 수 (작업 프로세스 수와 무관하게 고정해야 결과가 같음)
+N_SHARDS = 16
+
+CARD_KEY_COLS = ('client_id', 'card_id')
+
+
+def _mix64(x):
+    """splitmix64 최종 혼합 함수 (uint64 배열, 곱셈 오버플로는 의도된 동작)"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def shard_of(df, n_shards=N_SHARDS, key_cols=CARD_KEY_COLS):
+    """
+    키 컬럼 조합의 해시로 샤드 번호 계산 (같은 카드는 항상 같은 샤드, 실행/dtype과 무관하게 같은 값)
+
+    Args:
+        df (pd.DataFrame): 키 컬럼을 가진 데이터
+        n_shards (int): 샤드 수
+        key_cols (tuple): 키 컬럼 (정수)
+
+    Returns:
+        np.ndarray: 행별 샤드 번호 (int64)
+    """
+    key = np.zeros(len(df), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for col in key_cols:
+            key = _mix64(key ^ df[col].to_numpy(dtype=np.int64).astype(np.uint64))
+    return (key % np.uint64(n_shards)).astype(np.int64)
+
+
+def shard_seeds(random_state, n_shards=N_SHARDS):
+    """
+    마스터 시드에서 샤드별 독립 난수 스트림 시드 생성 (샤드 번호로 정해지므로 작업 수와 무관)
+
+    Args:
+        random_state (int, optional): 마스터 시드
+        n_shards (int): 샤드 수
+
+    Returns:
+        list: 샤드별 np.random.SeedSequence
+    """
+    return np.random.SeedSequence(random_state).spawn(n_shards)
+
+
+def partition_frames(chunks, shard_dir, n_shards=N_SHARDS, key_cols=CARD_KEY_COLS):
+    """
+    청크를 순서대로 받아 카드 해시 샤드별 파일로 나눠 저장 (청크 하나만 메모리에 유지)
+    샤드 안의 행 순서는 원래 파일 순서를 유지
+
+    Args:
+        chunks (iterable): 데이터프레임 청크
+        shard_dir (str): 샤드 파일 디렉터리 (shard_000/part_00000.parquet ...)
+        n_shards (int): 샤드 수
+        key_cols (tuple): 샤드 키 컬럼
+
+    Returns:
+        tuple: (샤드별 파일 목록, 샤드별 행 수)
+    """
+    shard_files = [[] for _ in range(n_shards)]
+    shard_rows = np.zeros(n_shards, dtype=np.int64)
+    for part, chunk in enumerate(chunks):
+        shards = shard_of(chunk, n_shards, key_cols)
+        order = np.argsort(shards, kind='stable')
+        bounds = np.searchsorted(shards[order], np.arange(n_shards + 1))
+        for shard in range(n_shards):
+            rows = order[bounds[shard]:bounds[shard + 1]]
+            if len(rows) == 0:
+                continue
+            path = os.path.join(shard_dir, f"shard_{shard:03d}", f"part_{part:05d}.parquet")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            save_frame(chunk.iloc[rows].reset_index(drop=True), path)
+            shard_files[shard].append(path)
+            shard_rows[shard] += len(rows)
+    return shard_files, shard_rows
+
+
+def load_shard(files):
+    """
+    샤드 파일들을 순서대로 읽어 하나로 합침
+
+    Args:
+        files (list): partition_frames가 만든 샤드 파일 목록
+
+    Returns:
+        pd.DataFrame: 샤드 데이터 (청크마다 범주가 달라 범주형 컬럼은 object가 될 수 있음)
+    """
+    return pd.concat([load_frame(path) for path in files], ignore_index=True)
+
+
+def augment_shard(task):
+    """
+    샤드 하나의 정규화 → 유효성 검사 → 사기 거래 윈도우 증강 (프로세스 풀 작업 함수)
+    정상 거래는 normal_file에 저장하고 KNN 검색에 필요한 키 컬럼만 반환
+
+    Args:
+        task (tuple): (샤드 파일 목록, 정상 거래 저장 경로, ValidityIndex, 샤드 SeedSequence, 증강 파라미터 dict)
+
+    Returns:
+        dict: fraud(원본 + 증강 사기 거래), normal_keys(mcc/zip 범주형, amount), rows, valid, orig_fraud, window_rows
+    """
+    files, normal_file, validity_index, seed, params = task
+    df = normalize_transactions(compact_frame(load_shard(files), TRANSACTIONS_SCHEMA))
+    is_valid = validity_index.is_valid(df)
+    fraud_df, orig_fraud, window_rows = augment_fraud(df, is_valid, random_state=seed, **params)
+
+    normal_df = df[df['fraud'] == 0].reset_index(drop=True)
+    save_frame(normal_df, normal_file)
+    normal_keys = pd.DataFrame({
+        'mcc': normal_df['mcc'].astype('category'),
+        'zip': normal_df['zip'].astype('category'),
+        'amount': normal_df['amount'],
+    })
+    return {
+        'fraud': fraud_df, 'normal_keys': normal_keys, 'rows': len(df), 'valid': int(is_valid.sum()),
+        'orig_fraud': orig_fraud, 'window_rows': window_rows,
+    }
+
+
+def _union_keys(parts):
+    """샤드별 정상 거래 키를 범주 목록을 합쳐 연결 (shard, pos 컬럼 추가)"""
+    keys = {}
+    for col in ('mcc', 'zip'):
+        keys[col] = pd.api.types.union_categoricals([part[col] for part in parts], ignore_order=True)
+    keys['amount'] = np.concatenate([part['amount'].to_numpy() for part in parts])
+    keys['shard'] = np.repeat([shard for shard, _ in enumerate(parts)], [len(part) for part in parts])
+    keys['pos'] = np.concatenate([np.arange(len(part)) for part in parts])
+    return pd.DataFrame(keys)
+
+
+def _gather_rows(normal_files, shards, positions):
+    """(샤드, 샤드 내 위치) 목록의 정상 거래 행을 샤드 파일을 하나씩 읽어 모음 (입력 순서 유지)"""
+    order = np.argsort(shards, kind='stable')
+    bounds = np.searchsorted(shards[order], np.arange(len(normal_files) + 1))
+    parts = []
+    for shard, path in enumerate(normal_files):
+        rows = order[bounds[shard]:bounds[shard + 1]]
+        if len(rows):
+            parts.append(load_frame(path).iloc[positions[rows]])
+    if not parts:
+        # 선택된 행이 없으면 샤드 파일 스키마의 빈 데이터프레임
+        return load_frame(normal_files[0]).iloc[:0].reset_index(drop=True) if normal_files else pd.DataFrame()
+    gathered = pd.concat(parts, ignore_index=True)
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.arange(len(order))
+    return gathered.iloc[inverse].reset_index(drop=True)
+
+
+def augment_sharded(chunks, validity_index, work_dir=None, n_shards=N_SHARDS, n_workers=1, window_size=5, stride=1,
+                    amount_noise_rate=0.1, date_noise_min=-30, date_noise_max=30, random_state=None,
+                    knn_batch_size=1_000_000, knn_n_jobs=1):
+    """
+    카드 해시 샤드 단위로 나눠 프로세스 풀에서 정규화/증강하는 학습용 데이터 생성
+    - 입력 청크를 카드(client_id, card_id) 해시로 n_shards개 파일에 나눠 저장 (한 프로세스가 전체 행을 들지 않음)
+    - 샤드별 노이즈 난수는 마스터 시드에서 샤드 번호로 파생하므로 n_workers와 무관하게 결과가 같음
+    - 결과는 샤드 번호 순서로 합침
+    - 정상 거래 KNN 언더샘플링은 전체 정상 거래의 (mcc, zip, amount) 키만 모아 검색한 뒤 선택된 행만 샤드 파일에서 읽음
+
+    Args:
+        chunks (iterable): 결측치 처리된 거래 데이터 청크
+        validity_index (ValidityIndex): 위치/MCC 유효성 인덱스
+        work_dir (str, optional): 샤드 임시 파일을 만들 디렉터리 (끝나면 삭제)
+        n_shards (int): 샤드 수 (결과에 영향을 주므로 실행마다 같게 유지)
+        n_workers (int): 프로세스 수 (결과에 영향 없음)
+        window_size (int): 슬라이딩 윈도우 크기
+        stride (int): 윈도우 이동 간격
+        amount_noise_rate (float): amount 노이즈 비율
+        date_noise_min (int): date 노이즈 최솟값(분)
+        date_noise_max (int): date 노이즈 최댓값(분)
+        random_state (int, optional): 마스터 시드
+        knn_batch_size (int): KNN 검색 배치 크기
+        knn_n_jobs (int): KNN 검색 스레드 수
+
+    Returns:
+        tuple:
+            pd.DataFrame: 증강 사기 거래 + 선택된 정상 거래 (섞인 순서, id 신규 부여)
+            dict: rows, valid, window_rows, fraud_dedup, fraud_final, normal_target, KNN 통계
+    """
+    params = {'window_size': window_size, 'stride': stride, 'amount_noise_rate': amount_noise_rate,
+              'date_noise_min': date_noise_min, 'date_noise_max': date_noise_max}
+    shard_dir = tempfile.mkdtemp(prefix='augment_shards_', dir=work_dir)
+    try:
+        with span("샤드 분할") as sp:
+            shard_files, counts = partition_frames(chunks, os.path.join(shard_dir, 'input'), n_shards)
+            sp.set_rows(rows_in=sum(counts), rows_out=sum(counts))
+        seeds = shard_seeds(random_state, n_shards)
+        normal_files = [os.path.join(shard_dir, f"normal_{shard:03d}.parquet") for shard in range(n_shards)]
+        tasks = [(shard_files[shard], normal_files[shard], validity_index, seeds[shard], params)
+                 for shard in range(n_shards) if shard_files[shard]]
+        normal_files = [task[1] for task in tasks]
+
+        # 프로세스 풀에서 실행하면 샤드 안의 하위 구간은 기록되지 않고 이 구간 하나로만 남음
+        with span("샤드 증강", shards=len(tasks), workers=n_workers):
+            if n_workers > 1 and len(tasks) > 1:
+                with multiprocessing.Pool(min(n_workers, len(tasks))) as pool:
+                    results = pool.map(augment_shard, tasks)
+            else:
+                results = [augment_shard(task) for task in tasks]
+
+        stats = {key: sum(result[key] for result in results) for key in ('rows', 'valid', 'window_rows')}
+        aug_fraud_df = pd.concat([result['fraud'] for result in results], ignore_index=True)
+        stats['fraud_dedup'] = len(aug_fraud_df)
+        aug_fraud_df = pad_fraud(aug_fraud_df, sum(result['orig_fraud'] for result in results),
+                                 random_state=random_state)
+        stats['fraud_final'] = len(aug_fraud_df)
+
+        # 사기 거래 키는 정상 거래 범주 목록으로 맞춤 (목록에 없는 값은 결측 → 해당 블록에서 매칭 안 됨, 기존과 같음)
+        normal_keys = _union_keys([result.pop('normal_keys') for result in results])
+        query_keys = pd.DataFrame({
+            col: pd.Categorical(aug_fraud_df[col], categories=normal_keys[col].cat.categories)
+            for col in ('mcc', 'zip')
+        })
+        query_keys['amount'] = aug_fraud_df['amount'].to_numpy()
+        stats['normal_target'] = len(aug_fraud_df) * 9
+        selected, knn_stats = knn_undersample(normal_keys, query_keys, stats['normal_target'],
+                                              random_state=random_state, batch_size=knn_batch_size,
+                                              n_jobs=knn_n_jobs)
+        stats.update(knn_stats)
+        del normal_keys
+
+        with span("선택 행 수집", rows_in=selected) as sp:
+            sel_normal_df = _gather_rows(normal_files, selected['shard'].to_numpy(), selected['pos'].to_numpy())
+            sp.set_rows(rows_out=sel_normal_df)
+        return finalize_training_set(aug_fraud_df, sel_normal_df, random_state), stats
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
@@ -0,0 +1,249 @@
+import os
+import pandas as pd
+
+from .zip_codes import format_zip_series
+
+# 확장자별 저장 형식 (parquet/feather는 dtype이 보존되는 컬럼 기반 형식)
+FORMAT_BY_EXT = {
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.csv': 'csv',
+}
+
+# CSV로 읽을 때 항상 문자열로 유지해야 하는 컬럼 (앞자리 0 보존)
+CSV_STR_COLUMNS = {'zip': str}
+
+
+def resolve_format(path):
+    """
+    파일 확장자로 저장 형식 판별
+
+    Args:
+        path (str): 파일 경로
+
+    Returns:
+        str: 'parquet', 'feather', 'csv' 중 하나
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMAT_BY_EXT:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: '{path}' (지원: {', '.join(FORMAT_BY_EXT)})")
+    return FORMAT_BY_EXT[ext]
+
+
+def _prepare_for_storage(df):
+    """zip은 숫자로 추론되지 않도록 문자열 컬럼으로 고정"""
+    if 'zip' in df.columns and pd.api.types.is_numeric_dtype(df['zip']):
+        zip_col = df['zip']
+        df = df.copy(deep=False)
+        df['zip'] = format_zip_series(zip_col)
+    return df
+
+
+def save_frame(df, path, csv_export=False, **csv_kwargs):
+    """
+    데이터프레임을 확장자에 맞는 형식으로 저장
+    - .parquet / .feather: dtype(카테고리, datetime, 문자열 zip 등)을 그대로 보존
+    - .csv: 기존 방식과 동일한 CSV 저장
+
+    Args:
+        df (pd.DataFrame): 저장할 데이터프레임
+        path (str): 저장 경로
+        csv_export (bool): True면 컬럼 기반 형식과 함께 같은 이름의 .csv도 저장
+        **csv_kwargs: CSV 저장 시 to_csv에 전달할 인자 (encoding, quoting 등)
+    """
+    fmt = resolve_format(path)
+    df = _prepare_for_storage(df)
+
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False)
+    elif fmt == 'feather':
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False, **csv_kwargs)
+
+    if csv_export and fmt != 'csv':
+        df.to_csv(os.path.splitext(path)[0] + '.csv', index=False, **csv_kwargs)
+
+
+def load_frame(path, columns=None, **csv_kwargs):
+    """
+    확장자에 맞는 형식으로 데이터프레임 로드
+
+    Args:
+        path (str): 파일 경로
+        columns (list, optional): 읽을 컬럼 목록 (지정 시 해당 컬럼만 읽음)
+        **csv_kwargs: CSV 로드 시 read_csv에 전달할 인자
+
+    Returns:
+        pd.DataFrame: 로드된 데이터프레임
+    """
+    fmt = resolve_format(path)
+
+    if fmt == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    if fmt == 'feather':
+        return pd.read_feather(path, columns=columns)
+
+    dtype = dict(CSV_STR_COLUMNS)
+    dtype.update(csv_kwargs.pop('dtype', None) or {})
+    return pd.read_csv(path, usecols=columns, dtype=dtype, **csv_kwargs)
+
+
+def iter_frames(path, chunksize, columns=None, **csv_kwargs):
+    """
+    파일을 chunksize 행 단위 데이터프레임으로 나눠 순서대로 읽음 (전체를 메모리에 올리지 않음)
+
+    Args:
+        path (str): 파일 경로
+        chunksize (int): 청크 행 수 (feather는 저장 시 record batch 단위를 그대로 사용)
+        columns (list, optional): 읽을 컬럼 목록
+        **csv_kwargs: CSV 로드 시 read_csv에 전달할 인자
+
+    Yields:
+        pd.DataFrame: 청크 데이터프레임
+    """
+    fmt = resolve_format(path)
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == 'feather':
+        import pyarrow as pa
+        with pa.memory_map(path, 'r') as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                yield batch.to_pandas()
+    else:
+        dtype = dict(CSV_STR_COLUMNS)
+        dtype.update(csv_kwargs.pop('dtype', None) or {})
+        yield from pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunksize, **csv_kwargs)
+
+
+class FrameWriter:
+    """
+    데이터프레임을 청크 단위로 이어서 저장하는 writer (전체 데이터를 메모리에 올리지 않음)
+    - .parquet: row group 단위로 추가
+    - .feather: Arrow IPC record batch 단위로 추가
+    - .csv: 헤더는 첫 청크에서 한 번만 기록
+
+    첫 청크의 스키마를 기준으로 이후 청크를 맞추며, 첫 청크에서 전부 결측이던 컬럼은 문자열로 취급
+    임시 파일에 쓴 뒤 정상 종료(close) 시 os.replace로 교체하므로 중간에 실패해도 잘린 파일이 남지 않음
+    (with 블록에서 예외가 나면 임시 파일만 삭제)
+    청크가 하나도 없으면 columns 컬럼만 있는 빈 파일을 저장
+
+    사용 예:
+        with FrameWriter('../raw/out.parquet') as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path, csv_export=False, columns=None, **csv_kwargs):
+        """
+        Args:
+            path (str): 저장 경로 (.parquet, .feather, .csv)
+            csv_export (bool): True면 컬럼 기반 형식과 함께 같은 이름의 CSV도 저장
+            columns (list, optional): 청크가 하나도 없을 때 빈 파일에 기록할 컬럼
+            **csv_kwargs: CSV 저장 시 to_csv에 전달할 인자
+        """
+        self.path = path
+        self.fmt = resolve_format(path)
+        self.columns = list(columns) if columns is not None else []
+        self.csv_kwargs = csv_kwargs
+        self.rows_written = 0
+        self._header_written = False
+        self._schema = None
+        self._writer = None
+        self._csv_handles = []
+        # 임시 경로 → 최종 경로 (close 시 교체)
+        self._targets = {}
+        self._closed = False
+
+        if self.fmt == 'csv':
+            self._csv_handles.append(self._open_csv(path))
+        elif csv_export:
+            self._csv_handles.append(self._open_csv(os.path.splitext(path)[0] + '.csv'))
+
+    def _tmp_path(self, path):
+        root, ext = os.path.splitext(path)
+        tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+        self._targets[tmp_path] = path
+        return tmp_path
+
+    def _open_csv(self, path):
+        encoding = self.csv_kwargs.pop('encoding', 'utf-8')
+        self.csv_kwargs['encoding'] = encoding
+        return open(self._tmp_path(path), 'w', encoding=encoding, newline='')
+
+    def _to_arrow(self, df):
+        import pyarrow as pa
+
+        if self._schema is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            fields = [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]
+            self._schema = pa.schema(fields).remove_metadata()
+        return pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+    def write(self, df):
+        """
+        청크 하나를 파일 끝에 추가
+
+        Args:
+            df (pd.DataFrame): 저장할 청크
+        """
+        df = _prepare_for_storage(df)
+
+        if self.fmt in ('parquet', 'feather'):
+            table = self._to_arrow(df)
+            if self._writer is None:
+                if self.fmt == 'parquet':
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self._tmp_path(self.path), self._schema)
+                else:
+                    import pyarrow as pa
+                    self._writer = pa.ipc.new_file(self._tmp_path(self.path), self._schema)
+            self._writer.write_table(table)
+
+        csv_kwargs = {k: v for k, v in self.csv_kwargs.items() if k != 'encoding'}
+        for handle in self._csv_handles:
+            df.to_csv(handle, index=False, header=not self._header_written, **csv_kwargs)
+
+        self._header_written = True
+        self.rows_written += len(df)
+
+    def close(self, commit=True):
+        """
+        열린 파일을 모두 닫고 임시 파일을 최종 경로로 교체
+
+        Args:
+            commit (bool): False면 임시 파일을 삭제하고 최종 경로는 그대로 둠
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if commit and not self._header_written:
+            # 청크가 없었으면 알려진 컬럼만 있는 빈 파일 저장
+            self.write(pd.DataFrame(columns=self.columns))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for handle in self._csv_handles:
+            handle.close()
+        self._csv_handles = []
+
+        for tmp_path, path in self._targets.items():
+            if commit:
+                os.replace(tmp_path, path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._targets = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(commit=exc_type is None)
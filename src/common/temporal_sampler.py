@@ -0,0 +1,227 @@
+from collections import deque
+import multiprocessing
+import numpy as np
+
+from .graph_store import GraphStore, segment_searchsorted
+
+SAMPLING_STRATEGIES = ('recent', 'uniform')
+
+
+def expand_ranges(starts, counts):
+    """
+    구간 [starts[i], starts[i] + counts[i]) 들을 하나의 위치 배열로 펼침
+
+    Args:
+        starts (np.ndarray): 구간 시작 위치
+        counts (np.ndarray): 구간 길이
+
+    Returns:
+        tuple: (위치별 구간 번호, 위치 배열)
+    """
+    owner = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.asarray(starts)[owner] + offsets
+
+
+def sample_without_replacement(n_items, k, rng):
+    """
+    행마다 range(n_items[i]) 에서 k개를 비복원 추출 (Floyd 알고리즘을 배치 전체에 벡터화, n_items > k)
+
+    Args:
+        n_items (np.ndarray): 행별 후보 수 (모두 k보다 커야 함)
+        k (int): 행별 추출 수
+        rng (np.random.Generator): 난수 생성기
+
+    Returns:
+        np.ndarray: (행 수, k) 추출된 위치
+    """
+    n_items = np.asarray(n_items, dtype=np.int64)
+    chosen = np.empty((len(n_items), k), dtype=np.int64)
+    for i in range(k):
+        upper = n_items - k + i
+        pick = np.floor(rng.random(len(n_items)) * (upper + 1)).astype(np.int64)
+        # 이미 뽑힌 값이면 upper를 선택 (upper는 이전 단계에서 뽑힐 수 없었던 값)
+        duplicate = (chosen[:, :i] == pick[:, None]).any(axis=1)
+        chosen[:, i] = np.where(duplicate, upper, pick)
+    return chosen
+
+
+class TemporalNeighborSampler:
+    """
+    시각 순으로 정렬된 CSR 관계에서 기준 시각 이전 간선만 이웃으로 추출하는 배치 샘플러
+    - 기준 시각 이전 간선 범위: 노드별 timestamp 구간 이진 탐색 (timestamp < 기준 시각, 같은 시각은 제외)
+    - recent: 기준 시각에 가장 가까운 최근 k개 / uniform: 이전 간선 중 k개 비복원 균등 추출
+    """
+
+    def __init__(self, relation, fanout=10, strategy='recent', random_state=None):
+        """
+        Args:
+            relation (RelationView): timestamp 배열이 있는 관계 (예: card__pays__merchant)
+            fanout (int): 시작 노드별 최대 이웃 수
+            strategy (str): 'recent' 또는 'uniform'
+            random_state (int, optional): uniform 추출 시드
+        """
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"지원하지 않는 샘플링 방식입니다: {strategy} (가능: {SAMPLING_STRATEGIES})")
+        if not relation.has_time():
+            raise ValueError(f"'{relation.name}' 관계에 timestamp 배열이 없습니다.")
+        self.relation = relation
+        self.fanout = fanout
+        self.strategy = strategy
+        self.rng = np.random.default_rng(random_state)
+
+    def sample(self, nodes, times, rng=None):
+        """
+        시작 노드별로 times 이전 간선 중 최대 fanout개 추출
+
+        Args:
+            nodes (np.ndarray): 시작 노드 id (관계의 출발 노드)
+            times (int or np.ndarray): 시작 노드별 기준 시각 (초)
+            rng (np.random.Generator, optional): 이번 배치에 쓸 난수 생성기 (기본: 샘플러 생성기)
+
+        Returns:
+            dict:
+                seed (np.ndarray): 간선별 시작 노드 위치 (nodes 배열 기준)
+                edge (np.ndarray): 간선 위치 (간선 속성 배열 조회용)
+                neighbor (np.ndarray): 이웃 노드 id
+                count (np.ndarray): 시작 노드별 추출 간선 수
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts, ends = self.relation.bounds(nodes)
+        ends = segment_searchsorted(self.relation['timestamp'], starts, ends, times)
+        degree = ends - starts
+        count = np.minimum(degree, self.fanout)
+
+        if self.strategy == 'recent':
+            # 가장 최근 간선부터 (ends - 1, ends - 2, ...)
+            seed, offsets = expand_ranges(np.zeros(len(nodes), dtype=np.int64), count)
+            edge = ends[seed] - 1 - offsets
+        else:
+            rng = self.rng if rng is None else rng
+            full = degree <= self.fanout
+            seed_full, edge_full = expand_ranges(starts[full], degree[full])
+            seed_full = np.flatnonzero(full)[seed_full]
+
+            partial = np.flatnonzero(~full)
+            picked = sample_without_replacement(degree[partial], self.fanout, rng)
+            seed_part = np.repeat(partial, self.fanout)
+            edge_part = (starts[partial][:, None] + picked).ravel()
+
+            seed = np.concatenate([seed_full, seed_part])
+            edge = np.concatenate([edge_full, edge_part])
+            order = np.argsort(seed, kind='stable')
+            seed, edge = seed[order], edge[order]
+
+        return {
+            'seed': seed,
+            'edge': edge,
+            'neighbor': np.asarray(self.relation.indices[edge], dtype=np.int64),
+            'count': count,
+        }
+
+    def sample_hops(self, samplers, nodes, times, rng=None):
+        """
+        여러 단계 이웃 추출 (각 단계의 기준 시각은 처음 시작 노드의 기준 시각을 그대로 사용해 미래 정보 차단)
+
+        Args:
+            samplers (list): 2단계부터 사용할 샘플러 목록 (이전 단계 도착 노드 유형에서 출발하는 관계)
+            nodes (np.ndarray): 시작 노드 id
+            times (int or np.ndarray): 시작 노드별 기준 시각
+            rng (np.random.Generator, optional): 난수 생성기
+
+        Returns:
+            list: 단계별 sample 결과 (seed는 이전 단계 neighbor 배열 기준 위치)
+        """
+        times = np.broadcast_to(np.asarray(times, dtype=np.int64), np.shape(nodes))
+        hops = [self.sample(nodes, times, rng)]
+        for sampler in samplers:
+            prev = hops[-1]
+            hops.append(sampler.sample(prev['neighbor'], times[prev['seed']], rng))
+            times = times[prev['seed']]
+        return hops
+
+
+def seeds_from_edges(relation, edge_positions):
+    """
+    거래 간선 위치 → (출발 노드, 도착 노드, 거래 시각) (예: 학습 대상 거래를 시작 노드로 사용)
+
+    Args:
+        relation (RelationView): 거래 관계 (예: card__pays__merchant)
+        edge_positions (np.ndarray): 간선 위치
+
+    Returns:
+        tuple: (출발 노드 id, 도착 노드 id, 거래 시각)
+    """
+    edge_positions = np.asarray(edge_positions, dtype=np.int64)
+    src = np.searchsorted(relation.indptr, edge_positions, side='right') - 1
+    dst = np.asarray(relation.indices[edge_positions], dtype=np.int64)
+    times = np.asarray(relation['timestamp'][edge_positions], dtype=np.int64)
+    return src, dst, times
+
+
+# 프리페치 작업 프로세스별 샘플러 (프로세스마다 그래프를 memmap으로 한 번만 엶)
+_worker_sampler = None
+_worker_seed = None
+
+
+def _init_worker(graph_dir, relation_name, fanout, strategy, random_state):
+    global _worker_sampler, _worker_seed
+    store = GraphStore(graph_dir)
+    _worker_sampler = TemporalNeighborSampler(store[relation_name], fanout, strategy)
+    _worker_seed = random_state
+
+
+def _sample_batch(task):
+    batch_index, nodes, times = task
+    # 배치 번호로 난수를 정해 작업 프로세스 수와 관계없이 같은 결과
+    rng = np.random.default_rng([_worker_seed or 0, batch_index])
+    return _worker_sampler.sample(nodes, times, rng)
+
+
+class PrefetchSampler:
+    """
+    여러 작업 프로세스에서 배치 샘플링을 미리 수행하는 반복자
+    - 작업 프로세스는 그래프를 memmap으로 열어 배열 페이지를 공유
+    - 최대 prefetch개 배치를 앞서 계산하고, 결과는 입력 배치 순서대로 반환
+    """
+
+    def __init__(self, graph_dir, relation_name, fanout=10, strategy='recent', num_workers=2, prefetch=4,
+                 random_state=None):
+        """
+        Args:
+            graph_dir (str): 그래프 저장 디렉터리
+            relation_name (str): 샘플링할 관계 이름
+            fanout (int): 시작 노드별 최대 이웃 수
+            strategy (str): 'recent' 또는 'uniform'
+            num_workers (int): 작업 프로세스 수
+            prefetch (int): 미리 계산해 둘 배치 수
+            random_state (int, optional): uniform 추출 시드
+        """
+        self.init_args = (graph_dir, relation_name, fanout, strategy, random_state)
+        self.num_workers = num_workers
+        self.prefetch = max(prefetch, 1)
+
+    def iterate(self, batches):
+        """
+        배치 목록을 받아 샘플링 결과를 순서대로 반환
+
+        Args:
+            batches (iterable): (시작 노드 id 배열, 기준 시각 배열) 튜플
+
+        Yields:
+            dict: TemporalNeighborSampler.sample 결과
+        """
+        if self.num_workers <= 0:
+            _init_worker(*self.init_args)
+            for batch_index, (nodes, times) in enumerate(batches):
+                yield _sample_batch((batch_index, nodes, times))
+            return
+
+        with multiprocessing.Pool(self.num_workers, initializer=_init_worker, initargs=self.init_args) as pool:
+            pending = deque()
+            for batch_index, (nodes, times) in enumerate(batches):
+                pending.append(pool.apply_async(_sample_batch, ((batch_index, nodes, times),)))
+                if len(pending) >= self.prefetch:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
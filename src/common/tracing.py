@@ -0,0 +1,396 @@
+import collections
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:  # psutil이 없으면 RSS 변화량은 기록하지 않음
+    psutil = None
+
+# 구간별 프로파일링 방식: cProfile(.prof, 함수별 누적 시간) / 호출 스택 샘플링(.folded, flame graph)
+PROFILE_MODES = ('cprofile', 'sample')
+
+# 현재 활성 트레이서 (None이면 span()은 아무것도 하지 않는 공용 객체를 반환)
+_TRACER = None
+
+
+class _NoopSpan:
+    """트레이싱이 꺼져 있을 때 span()이 반환하는 공용 객체 (시간/메모리 측정 없음)"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_rows(self, rows_out=None, rows_in=None):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _count(rows):
+    """행 수 (데이터프레임/배열이면 len, 정수면 그대로)"""
+    if rows is None:
+        return None
+    return len(rows) if hasattr(rows, '__len__') else int(rows)
+
+
+_PROCESS = {}
+
+
+def _current_rss():
+    """현재 프로세스 RSS (psutil.Process 객체는 pid별로 재사용, fork된 작업 프로세스는 새로 생성)"""
+    if psutil is None:
+        return None
+    pid = os.getpid()
+    process = _PROCESS.get(pid)
+    if process is None:
+        _PROCESS.clear()
+        process = _PROCESS[pid] = psutil.Process(pid)
+    return process.memory_info().rss
+
+
+def span(name, rows_in=None, **attrs):
+    """
+    하위 단계 측정 구간 (with 문으로 사용)
+    트레이싱이 꺼져 있으면 전역 변수 확인 한 번 후 공용 no-op 객체를 반환하므로 비용이 거의 없음
+
+        with span("zip 처리", rows_in=df) as sp:
+            ...
+            sp.set_rows(rows_out=result)
+
+    Args:
+        name (str): 구간 이름 (같은 이름은 요약에서 합산, Tracer.profile에 있으면 프로파일링)
+        rows_in (int or sized, optional): 입력 행 수 (데이터프레임이면 len)
+        **attrs: 트레이스 이벤트에 함께 기록할 값
+
+    Returns:
+        Span or _NoopSpan: 구간 객체
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, rows_in, attrs)
+
+
+class Span:
+    """
+    측정 구간 하나: 벽시계 시간, 프로세스 CPU 시간, 입출력 행 수, RSS 변화량
+    """
+    __slots__ = ('tracer', 'name', 'rows_in', 'rows_out', 'attrs', 'depth', 'start_ns', 'cpu_start_ns',
+                 'rss_start', 'profiler', 'wall', 'cpu')
+
+    def __init__(self, tracer, name, rows_in=None, attrs=None):
+        self.tracer = tracer
+        self.name = name
+        self.rows_in = _count(rows_in)
+        self.rows_out = None
+        self.attrs = attrs or {}
+        self.profiler = None
+        self.wall = self.cpu = None
+
+    def set_rows(self, rows_out=None, rows_in=None):
+        """
+        입출력 행 수 기록 (구간 안에서 결과가 나온 뒤 호출)
+
+        Args:
+            rows_out (int or sized, optional): 출력 행 수
+            rows_in (int or sized, optional): 입력 행 수 (span 생성 시 모를 때)
+        """
+        if rows_out is not None:
+            self.rows_out = _count(rows_out)
+        if rows_in is not None:
+            self.rows_in = _count(rows_in)
+
+    def __enter__(self):
+        self.depth = self.tracer._push(self)
+        self.profiler = self.tracer._start_profiler(self.name)
+        self.rss_start = _current_rss()
+        self.cpu_start_ns = time.process_time_ns()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        cpu_ns = time.process_time_ns() - self.cpu_start_ns
+        rss_end = _current_rss()
+        self.tracer._stop_profiler(self.name, self.profiler)
+        self.tracer._pop()
+        self.wall = (end_ns - self.start_ns) / 1e9
+        self.cpu = cpu_ns / 1e9
+        self.tracer._record(self, rss_end, failed=exc_type is not None)
+        return False
+
+
+class SamplingProfiler:
+    """
+    일정 간격으로 대상 스레드의 호출 스택을 샘플링하는 간단한 프로파일러 (외부 패키지 없이 동작)
+    결과는 flamegraph.pl / speedscope가 읽는 folded 형식 ("함수;함수;함수 샘플 수")
+    NumPy/pandas처럼 GIL을 놓는 연산도 호출한 파이썬 함수 위치로 잡힘
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.counts = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Tracer:
+    """
+    측정 구간 기록 모음
+    - 끝난 구간은 Chrome Trace Event 형식 이벤트로 모아 save()로 저장 (chrome://tracing, Perfetto, speedscope에서 flame chart)
+    - log_file을 지정하면 구간이 끝날 때마다 JSON 한 줄씩 기록 (구조화 로그)
+    - profile에 지정한 구간 이름은 cProfile(.prof) 또는 샘플링(.folded) 결과를 profile_dir에 저장
+      (프로파일러는 한 번에 하나만 동작하므로 프로파일링 중인 구간 안의 다른 지정 구간은 건너뜀)
+    - 이벤트는 현재 프로세스 기록만 모음 (프로세스 풀 작업 안의 구간은 기록되지 않음)
+    """
+
+    def __init__(self, trace_file=None, log_file=None, profile=None, profile_dir=None, sample_interval=0.005,
+                 echo=False):
+        """
+        Args:
+            trace_file (str, optional): 종료 시 저장할 트레이스 JSON 경로
+            log_file (str, optional): 구간별 JSON 로그 경로 (JSON Lines, 이어 쓰기)
+            profile (dict, optional): 구간 이름 → 'cprofile' 또는 'sample'
+            profile_dir (str, optional): 프로파일 결과 디렉터리 (기본: trace_file 디렉터리 또는 현재 디렉터리)
+            sample_interval (float): 샘플링 프로파일러 간격(초)
+            echo (bool): True면 구간이 끝날 때마다 한 줄 요약 출력
+        """
+        for name, mode in (profile or {}).items():
+            if mode not in PROFILE_MODES:
+                raise ValueError(f"지원하지 않는 프로파일 방식입니다: {name}={mode} (가능: {PROFILE_MODES})")
+        self.trace_file = trace_file
+        self.log_file = log_file
+        self.profile = dict(profile or {})
+        if profile_dir is None:
+            profile_dir = os.path.dirname(os.path.abspath(trace_file)) if trace_file else os.getcwd()
+        self.profile_dir = profile_dir
+        self.sample_interval = sample_interval
+        self.echo = echo
+        self.events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiling = False
+        self._origin_ns = time.perf_counter_ns()
+        self._log = open(log_file, 'a', encoding='utf-8') if log_file else None
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, span_obj):
+        stack = self._stack()
+        stack.append(span_obj.name)
+        return len(stack) - 1
+
+    def _pop(self):
+        self._stack().pop()
+
+    def _start_profiler(self, name):
+        mode = self.profile.get(name)
+        if mode is None or self._profiling:
+            return None
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = SamplingProfiler(self.sample_interval)
+            profiler.start()
+        self._profiling = True
+        return profiler
+
+    def _stop_profiler(self, name, profiler):
+        if profiler is None:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, re.sub(r'[^\w.-]+', '_', name))
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            profiler.dump_stats(f"{base}.prof")
+        else:
+            profiler.stop()
+            profiler.save(f"{base}.folded")
+        self._profiling = False
+
+    def _record(self, span_obj, rss_end, failed=False):
+        rss_delta_mb = None
+        if span_obj.rss_start is not None and rss_end is not None:
+            rss_delta_mb = round((rss_end - span_obj.rss_start) / 2 ** 20, 1)
+        args = {
+            'cpu_sec': round(span_obj.cpu, 6),
+            'rows_in': span_obj.rows_in,
+            'rows_out': span_obj.rows_out,
+            'rss_delta_mb': rss_delta_mb,
+            'rss_mb': round(rss_end / 2 ** 20, 1) if rss_end is not None else None,
+            'depth': span_obj.depth,
+            **span_obj.attrs,
+        }
+        if failed:
+            args['failed'] = True
+        event = {
+            'name': span_obj.name, 'cat': 'stage', 'ph': 'X',
+            'ts': (span_obj.start_ns - self._origin_ns) / 1e3, 'dur': span_obj.wall * 1e6,
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+        }
+        with self._lock:
+            self.events.append(event)
+            if self._log is not None:
+                self._log.write(json.dumps({'name': span_obj.name, 'wall_sec': round(span_obj.wall, 6), **args},
+                                           ensure_ascii=False, default=str) + '\n')
+                self._log.flush()
+        if self.echo:
+            rows = ""
+            if span_obj.rows_in is not None or span_obj.rows_out is not None:
+                rows_in = '-' if span_obj.rows_in is None else f"{span_obj.rows_in:,}"
+                rows_out = '-' if span_obj.rows_out is None else f"{span_obj.rows_out:,}"
+                rows = f", 행 {rows_in} → {rows_out}"
+            rss = "" if rss_delta_mb is None else f", RSS {rss_delta_mb:+,.1f}MB"
+            print(f"{'  ' * span_obj.depth}[{span_obj.name}] {span_obj.wall:.2f}초 "
+                  f"(CPU {span_obj.cpu:.2f}초){rows}{rss}")
+
+    def summary(self):
+        """
+        구간 이름별 합계 (호출 수, 벽시계/CPU 시간 합, 최대 RSS 변화량)
+
+        Returns:
+            list: dict(name, calls, wall_sec, cpu_sec, max_rss_delta_mb) 목록 (처음 기록된 순서)
+        """
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(event['name'], {'name': event['name'], 'calls': 0, 'wall_sec': 0.0,
+                                                      'cpu_sec': 0.0, 'max_rss_delta_mb': None})
+            total['calls'] += 1
+            total['wall_sec'] += event['dur'] / 1e6
+            total['cpu_sec'] += event['args']['cpu_sec']
+            delta = event['args']['rss_delta_mb']
+            if delta is not None:
+                previous = total['max_rss_delta_mb']
+                total['max_rss_delta_mb'] = delta if previous is None else max(previous, delta)
+        return list(totals.values())
+
+    def save(self, path=None):
+        """
+        Chrome Trace Event 형식 JSON 저장
+
+        Args:
+            path (str, optional): 저장 경로 (기본: trace_file)
+
+        Returns:
+            str: 저장 경로 (경로가 없으면 None)
+        """
+        path = path or self.trace_file
+        if path is None:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': sorted(self.events, key=lambda e: e['ts']), 'displayTimeUnit': 'ms'}, f,
+                      ensure_ascii=False, default=str)
+        return path
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+def enable(trace_file=None, log_file=None, profile=None, profile_dir=None, sample_interval=0.005, echo=False):
+    """
+    트레이싱 시작 (이후 span() 구간이 기록됨, 인자는 Tracer 참고)
+
+    Returns:
+        Tracer: 활성 트레이서
+    """
+    global _TRACER
+    if _TRACER is not None:
+        disable()
+    _TRACER = Tracer(trace_file, log_file, profile, profile_dir, sample_interval, echo)
+    return _TRACER
+
+
+def disable():
+    """
+    트레이싱 종료 (trace_file이 있으면 저장)
+
+    Returns:
+        Tracer: 종료된 트레이서 (활성 트레이서가 없었으면 None)
+    """
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    if tracer is not None:
+        tracer.save()
+        tracer.close()
+    return tracer
+
+
+def current():
+    """활성 트레이서 (없으면 None)"""
+    return _TRACER
+
+
+@contextmanager
+def tracing(trace_file=None, log_file=None, profile=None, profile_dir=None, sample_interval=0.005, echo=False):
+    """
+    with 블록 동안 트레이싱 (끝나면 trace_file 저장, 인자는 Tracer 참고)
+
+        with tracing('../raw/trace.json', profile={'augment': 'sample'}):
+            ...
+
+    Yields:
+        Tracer: 활성 트레이서
+    """
+    tracer = enable(trace_file, log_file, profile, profile_dir, sample_interval, echo)
+    try:
+        yield tracer
+    finally:
+        disable()
+
+
+def print_summary(tracer):
+    """
+    구간 이름별 합계 출력
+
+    Args:
+        tracer (Tracer): 트레이서
+    """
+    print(f"\n{'구간':<24}{'호출':>6}{'시간(초)':>12}{'CPU(초)':>12}{'RSS 증가(MB)':>15}")
+    for total in tracer.summary():
+        rss = "-" if total['max_rss_delta_mb'] is None else f"{total['max_rss_delta_mb']:+,.1f}"
+        print(f"{total['name']:<24}{total['calls']:>6}{total['wall_sec']:>12.2f}{total['cpu_sec']:>12.2f}{rss:>15}")
@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from .tracing import span
+
+
+def encode_blocks(ref_df, query_df, block_cols):
+    """
+    기준/조회 데이터의 블록 키(block_cols 조합)를 같은 정수 코드 체계로 변환
+
+    Args:
+        ref_df (pd.DataFrame): 기준(정상 거래) 데이터
+        query_df (pd.DataFrame): 조회(사기 거래) 데이터
+        block_cols (list): 블록 컬럼 목록 (예: ['mcc', 'zip'])
+
+    Returns:
+        tuple: (기준 블록 코드, 조회 블록 코드) int64 배열, 결측이 있는 행은 -1
+    """
+    n_ref = len(ref_df)
+    block = np.zeros(n_ref + len(query_df), dtype=np.int64)
+    has_na = np.zeros(n_ref + len(query_df), dtype=bool)
+    for col in block_cols:
+        values = pd.concat([ref_df[col], query_df[col]], ignore_index=True)
+        codes, uniques = pd.factorize(values)
+        block = block * (len(uniques) + 1) + codes
+        has_na |= codes < 0
+    block[has_na] = -1
+    return block[:n_ref], block[n_ref:]
+
+
+def nearest_in_blocks(ref_block, ref_amount, query_block, query_amount, batch_size=1_000_000, n_jobs=1):
+    """
+    같은 블록 안에서 amount가 가장 가까운 기준 행 검색
+    블록 코드와 amount 순위를 하나의 정렬 키로 합쳐 searchsorted로 조회하므로 블록 수와 무관하게 한 번에 처리
+
+    Args:
+        ref_block (np.ndarray): 기준 행 블록 코드 (-1은 검색 대상에서 제외)
+        ref_amount (np.ndarray): 기준 행 amount
+        query_block (np.ndarray): 조회 행 블록 코드
+        query_amount (np.ndarray): 조회 행 amount
+        batch_size (int): 한 번에 조회할 행 수 (메모리 사용량 상한)
+        n_jobs (int): 조회 배치를 병렬로 처리할 스레드 수
+
+    Returns:
+        np.ndarray: 조회 행별 최근접 기준 행 위치 (같은 블록에 기준 행이 없으면 -1)
+    """
+    keep = ref_block >= 0
+    ref_pos = np.flatnonzero(keep)
+    ref_block, ref_amount = ref_block[keep], ref_amount[keep]
+    n_ref = len(ref_pos)
+    if n_ref == 0:
+        return np.full(len(query_block), -1, dtype=np.int64)
+
+    with span("KNN fit", rows_in=n_ref):
+        # amount 순위 (기준/조회 공통) → 블록 코드와 결합한 정렬 키
+        amounts, inverse = np.unique(np.concatenate([ref_amount, query_amount]), return_inverse=True)
+        n_rank = len(amounts)
+        ref_key = ref_block * n_rank + inverse[:n_ref]
+        query_rank = inverse[n_ref:]
+
+        order = np.argsort(ref_key, kind='stable')
+        sorted_key = ref_key[order]
+        sorted_block = ref_block[order]
+        sorted_amount = ref_amount[order]
+
+    def search(start):
+        q_block = query_block[start:start + batch_size]
+        q_amount = query_amount[start:start + batch_size]
+        q_key = q_block * n_rank + query_rank[start:start + batch_size]
+
+        right = np.searchsorted(sorted_key, q_key, side='left')
+        left = right - 1
+        right_c = np.minimum(right, n_ref - 1)
+        left_c = np.maximum(left, 0)
+
+        right_ok = (right < n_ref) & (sorted_block[right_c] == q_block) & (q_block >= 0)
+        left_ok = (left >= 0) & (sorted_block[left_c] == q_block) & (q_block >= 0)
+        right_dist = np.where(right_ok, np.abs(sorted_amount[right_c] - q_amount), np.inf)
+        left_dist = np.where(left_ok, np.abs(sorted_amount[left_c] - q_amount), np.inf)
+
+        # 거리가 같으면 amount가 작은 쪽(left)을 선택해 결과를 결정적으로 유지
+        nearest = np.where(left_dist <= right_dist, left_c, right_c)
+        return np.where(left_ok | right_ok, ref_pos[order[nearest]], -1)
+
+    starts = range(0, len(query_block), batch_size)
+    with span("KNN 검색", rows_in=query_block):
+        if n_jobs > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(search, starts))
+        else:
+            results = [search(start) for start in starts]
+    return np.concatenate(results) if results else np.empty(0, dtype=np.int64)
+
+
+def knn_undersample(normal_df, query_df, n_target, block_levels=(('mcc', 'zip'), ('mcc',)),
+                    random_state=None, batch_size=1_000_000, n_jobs=1):
+    """
+    사기 거래(query_df)와 유사한 정상 거래를 골라 n_target건으로 언더샘플링
+    - 1차: (mcc, zip)이 같은 블록 안에서 amount 최근접 정상 거래
+    - 이후 단계: 이전 단계에서 못 찾은 사기 거래만 더 넓은 블록(mcc)에서 검색
+    - 중복 제거한 최근접 정상 거래가 n_target보다 적으면 나머지 정상 거래에서 랜덤 추가
+
+    범주 코드는 거리 계산에 쓰지 않고 블록 분할에만 사용하므로, 라벨 인코딩 값의 크기가 거리를 좌우하지 않음
+
+    Args:
+        normal_df (pd.DataFrame): 정상 거래
+        query_df (pd.DataFrame): 기준이 되는 사기 거래
+        n_target (int): 목표 정상 거래 수
+        block_levels (tuple): 단계별 블록 컬럼 (앞 단계일수록 좁은 블록)
+        random_state (int, optional): 랜덤 추가 추출 시드
+        batch_size (int): 한 번에 조회할 사기 거래 수
+        n_jobs (int): 조회 병렬 스레드 수
+
+    Returns:
+        tuple:
+            pd.DataFrame: 선택된 정상 거래 (최근접 → 랜덤 추가 순)
+            dict: 단계별 매칭 수, 고유 최근접 수, 랜덤 추가 수 통계
+    """
+    ref_amount = normal_df['amount'].to_numpy(dtype=float)
+    query_amount = query_df['amount'].to_numpy(dtype=float)
+
+    matched = np.full(len(query_df), -1, dtype=np.int64)
+    stats = {'queries': len(query_df)}
+    for level, block_cols in enumerate(block_levels):
+        todo = np.flatnonzero(matched < 0)
+        if len(todo) == 0:
+            stats[f"matched_{'_'.join(block_cols)}"] = 0
+            continue
+        with span("KNN 블록 인코딩", rows_in=len(normal_df) + len(todo), level='_'.join(block_cols)):
+            ref_block, query_block = encode_blocks(normal_df, query_df.iloc[todo], list(block_cols))
+        found = nearest_in_blocks(ref_block, ref_amount, query_block, query_amount[todo],
+                                  batch_size=batch_size, n_jobs=n_jobs)
+        matched[todo] = found
+        stats[f"matched_{'_'.join(block_cols)}"] = int((found >= 0).sum())
+    stats['unmatched'] = int((matched < 0).sum())
+
+    neighbor_pos = np.unique(matched[matched >= 0])
+    stats['unique_neighbors'] = len(neighbor_pos)
+
+    extra_needed = max(n_target - len(neighbor_pos), 0)
+    rest_pos = np.setdiff1d(np.arange(len(normal_df)), neighbor_pos, assume_unique=True)
+    stats['shortage'] = max(extra_needed - len(rest_pos), 0)
+    extra_needed = min(extra_needed, len(rest_pos))
+
+    rng = np.random.default_rng(random_state)
+    extra_pos = rng.choice(rest_pos, size=extra_needed, replace=False) if extra_needed else np.empty(0, dtype=np.int64)
+    stats['backfilled'] = len(extra_pos)
+
+    selected = normal_df.iloc[np.concatenate([neighbor_pos, extra_pos])]
+    return selected, stats
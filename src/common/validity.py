@@ -0,0 +1,125 @@
+import json
+import numpy as np
+import pandas as pd
+
+from .schema import LOCATIONS_SCHEMA, read_dtypes
+from .tracing import span
+
+LOCATION_COLS = ['zip', 'merchant_state', 'merchant_city']
+
+
+class ValidityIndex:
+    """
+    (zip, merchant_state, merchant_city) 조합과 MCC 코드의 유효성 인덱스
+    - 각 컬럼 값을 정수 코드로 바꾸고, 세 코드를 하나의 int64 키로 합쳐 정렬 배열로 보관
+    - 검사 대상 데이터도 같은 방식으로 키를 만들어 searchsorted 한 번으로 조회
+    """
+
+    def __init__(self, locations, mccs):
+        """
+        Args:
+            locations (pd.DataFrame): 유효한 위치 조합 (zip, merchant_state, merchant_city 컬럼 포함)
+            mccs (iterable): 유효한 MCC 코드 목록
+        """
+        locations = locations.dropna(subset=LOCATION_COLS)
+        locations = locations.drop_duplicates(subset=LOCATION_COLS).reset_index(drop=True)
+        self.locations = locations
+
+        self.vocabs = {col: pd.Index(pd.unique(locations[col].astype(str))) for col in LOCATION_COLS}
+        self.mcc_vocab = pd.Index(pd.unique(pd.Series(list(mccs), dtype=str)))
+
+        keys = self._combine(self._encode_columns(locations))
+        self._key_order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[self._key_order]
+
+    @classmethod
+    def from_reference(cls, location_file, mcc_codes_file):
+        """
+        외부 기준 파일로 인덱스 생성
+
+        Args:
+            location_file (str): location_data_with_geo_final.csv 경로
+            mcc_codes_file (str): mcc_codes.json 경로
+
+        Returns:
+            ValidityIndex: 생성된 인덱스
+        """
+        locations = pd.read_csv(location_file, dtype=read_dtypes(LOCATIONS_SCHEMA))
+        with open(mcc_codes_file, 'r', encoding='utf-8') as f:
+            mcc_codes = json.load(f)
+        return cls(locations, mcc_codes.keys())
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        거래 데이터 자체에 등장한 조합/MCC로 인덱스 생성 (기준 파일이 없을 때 사용)
+
+        Args:
+            df (pd.DataFrame): 거래 데이터
+
+        Returns:
+            ValidityIndex: 생성된 인덱스
+        """
+        return cls(df[LOCATION_COLS], df['mcc'].dropna().astype(str).unique())
+
+    def _encode_columns(self, df):
+        """컬럼별 정수 코드 (어휘에 없거나 결측이면 -1)"""
+        codes = []
+        for col in LOCATION_COLS:
+            values = df[col]
+            col_codes = self.vocabs[col].get_indexer(values.astype(str))
+            col_codes[values.isna().to_numpy()] = -1
+            codes.append(col_codes.astype(np.int64))
+        return codes
+
+    def _combine(self, codes):
+        """컬럼별 코드를 하나의 int64 키로 결합 (하나라도 -1이면 -1)"""
+        zip_codes, state_codes, city_codes = codes
+        n_state = len(self.vocabs['merchant_state'])
+        n_city = len(self.vocabs['merchant_city'])
+        keys = (zip_codes * n_state + state_codes) * n_city + city_codes
+        keys[(zip_codes < 0) | (state_codes < 0) | (city_codes < 0)] = -1
+        return keys
+
+    def lookup_location(self, df):
+        """
+        각 행의 위치 조합이 인덱스의 몇 번째 행(self.locations 기준)인지 조회
+
+        Args:
+            df (pd.DataFrame): zip, merchant_state, merchant_city 컬럼을 가진 데이터
+
+        Returns:
+            np.ndarray: self.locations 행 위치 (없는 조합은 -1)
+        """
+        keys = self._combine(self._encode_columns(df))
+        if len(self._sorted_keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+
+        pos = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self._sorted_keys) - 1)
+        found = (keys >= 0) & (self._sorted_keys[pos] == keys)
+        return np.where(found, self._key_order[pos], -1)
+
+    def is_valid_mcc(self, mcc):
+        """
+        MCC 코드 유효 여부
+
+        Args:
+            mcc (pd.Series): mcc 컬럼
+
+        Returns:
+            np.ndarray: 행별 유효 여부 (bool)
+        """
+        return (self.mcc_vocab.get_indexer(mcc.astype(str)) >= 0) & mcc.notna().to_numpy()
+
+    def is_valid(self, df):
+        """
+        위치 조합과 MCC가 모두 유효한지 한 번에 계산
+
+        Args:
+            df (pd.DataFrame): zip, merchant_state, merchant_city, mcc 컬럼을 가진 데이터
+
+        Returns:
+            np.ndarray: 행별 유효 여부 (bool)
+        """
+        with span("유효성 검사", rows_in=df):
+            return (self.lookup_location(df) >= 0) & self.is_valid_mcc(df['mcc'])
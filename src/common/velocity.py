@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+
+from .graph import stable_argsort_int
+from .storage import save_frame, load_frame
+
+# 시간 창 이름 → 길이 (초)
+VELOCITY_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 7 * 86400}
+
+VELOCITY_KEY_COLS = ('client_id', 'card_id')
+VELOCITY_DISTINCT_COLS = {'merchant': 'merchant_id', 'mcc': 'mcc'}
+
+# 카드 키 id를 상위 비트에, 시각(초)을 하위 34비트에 담은 정렬 키 (시각 범위 약 540년)
+_TIME_BITS = 34
+
+
+def velocity_columns(windows=VELOCITY_WINDOWS, distinct_cols=VELOCITY_DISTINCT_COLS):
+    """
+    생성되는 속도 특성 컬럼 이름 목록
+
+    Args:
+        windows (dict): 시간 창 이름 → 길이 (초)
+        distinct_cols (dict): 고유값 수를 셀 특성 이름 → 컬럼 이름
+
+    Returns:
+        list: 컬럼 이름 목록
+    """
+    columns = ['card_secs_since_prev']
+    for window in windows:
+        columns += [f'card_txn_count_{window}', f'card_amount_sum_{window}',
+                    f'card_amount_mean_{window}', f'card_amount_std_{window}']
+        columns += [f'card_{name}_nunique_{window}' for name in distinct_cols]
+    return columns
+
+
+def _previous_same(group_sorted, values_sorted):
+    """정렬된 순서에서 같은 카드·같은 값이 직전에 나온 위치 (없으면 -1)"""
+    value_codes, uniques = pd.factorize(values_sorted)
+    codes = group_sorted * (len(uniques) + 1) + value_codes
+    order = stable_argsort_int(codes)
+    prev = np.full(len(codes), -1, dtype=np.int64)
+    same = codes[order[1:]] == codes[order[:-1]]
+    prev[order[1:][same]] = order[:-1][same]
+    return prev
+
+
+def compute_velocity_features(df, windows=VELOCITY_WINDOWS, key_cols=VELOCITY_KEY_COLS, time_col='date',
+                              amount_col='amount', distinct_cols=VELOCITY_DISTINCT_COLS):
+    """
+    카드별 최근 시간 창(1h/24h/7d) 거래 속도 특성 계산
+    - (카드, 시각) 순으로 한 번만 정렬한 뒤 누적합 차이로 창별 건수/합계/평균/표준편차 계산
+    - 창 시작 위치는 (카드, 시각) 정렬 키에서 이진 탐색
+    - 고유 가맹점/mcc 수 = 창 안 건수 - 창 안에서 같은 값이 이미 나온 건수
+    - 창은 (t - 길이, t] 이며 현재 거래를 포함 (pandas rolling('1h')와 같은 기준)
+
+    Args:
+        df (pd.DataFrame): 거래 데이터 (key_cols, time_col, amount_col, distinct_cols 컬럼)
+        windows (dict): 시간 창 이름 → 길이 (초)
+        key_cols (tuple): 카드 구분 컬럼
+        time_col (str): 거래 시각 컬럼
+        amount_col (str): 금액 컬럼 (숫자)
+        distinct_cols (dict): 고유값 수를 셀 특성 이름 → 컬럼 이름
+
+    Returns:
+        pd.DataFrame: 속도 특성 (df와 같은 index, 행 순서)
+    """
+    n_rows = len(df)
+    group = df.groupby(list(key_cols), sort=False).ngroup().to_numpy(np.int64)
+    seconds = pd.to_datetime(df[time_col]).to_numpy('datetime64[s]').astype(np.int64)
+    seconds = seconds - (seconds.min() if n_rows else 0)
+
+    # (카드, 시각) 순 안정 정렬 (같은 시각은 원래 행 순서 유지)
+    order = stable_argsort_int(group, order=stable_argsort_int(seconds))
+    group_s, seconds_s = group[order], seconds[order]
+    sort_key = (group_s << _TIME_BITS) | seconds_s
+    group_start = np.searchsorted(group_s, group_s, side='left')
+    positions = np.arange(n_rows)
+
+    amount = df[amount_col].to_numpy(np.float64)[order]
+    # 카드별 평균을 빼고 누적합 (큰 누적합끼리의 뺄셈에서 생기는 분산 계산 오차 방지)
+    group_mean = np.bincount(group_s, weights=amount) / np.maximum(np.bincount(group_s), 1)
+    centered = amount - group_mean[group_s]
+    cum_sum = np.concatenate([[0.0], np.cumsum(centered)])
+    cum_sq = np.concatenate([[0.0], np.cumsum(centered ** 2)])
+
+    features = {}
+    gap = np.diff(seconds_s, prepend=0).astype(np.float64)
+    gap[positions == group_start] = np.nan
+    features['card_secs_since_prev'] = gap
+
+    lefts, counts = {}, {}
+    for window, length in windows.items():
+        left = np.maximum(np.searchsorted(sort_key, sort_key - length, side='right'), group_start)
+        count = positions + 1 - left
+        total = cum_sum[positions + 1] - cum_sum[left]
+        mean = total / count
+        # 표본 표준편차 (ddof=1, 1건이면 NaN)
+        variance = (cum_sq[positions + 1] - cum_sq[left] - count * mean ** 2) / np.maximum(count - 1, 1)
+        std = np.sqrt(np.maximum(variance, 0.0))
+        std[count < 2] = np.nan
+
+        features[f'card_txn_count_{window}'] = count.astype(np.int32)
+        features[f'card_amount_sum_{window}'] = (total + count * group_mean[group_s]).astype(np.float32)
+        features[f'card_amount_mean_{window}'] = (mean + group_mean[group_s]).astype(np.float32)
+        features[f'card_amount_std_{window}'] = std.astype(np.float32)
+        lefts[window], counts[window] = left, count
+
+    # 창 안 중복 건수: 직전 같은 값 위치가 창 시작 이후인 거래 수
+    # 가장 긴 창의 건수만큼 지연(lag)을 늘려가며, 아직 창 안에 거래가 남은 행만 벡터 연산
+    prev_same = {name: _previous_same(group_s, df[col].to_numpy()[order]) for name, col in distinct_cols.items()}
+    duplicates = {(name, window): np.zeros(n_rows, dtype=np.int32) for name in distinct_cols for window in windows}
+    longest = max(windows, key=windows.get)
+    active = positions
+    lag = 0
+    while len(active):
+        active = active[counts[longest][active] > lag]
+        past = active - lag
+        for window in windows:
+            in_window = counts[window][active] > lag
+            for name in distinct_cols:
+                repeated = in_window & (prev_same[name][past] >= lefts[window][active])
+                duplicates[name, window][active] += repeated
+        lag += 1
+
+    for window in windows:
+        for name in distinct_cols:
+            features[f'card_{name}_nunique_{window}'] = (counts[window] - duplicates[name, window]).astype(np.int32)
+
+    # 원래 행 순서로 되돌림
+    inverse = np.empty(n_rows, dtype=np.int64)
+    inverse[order] = positions
+    result = pd.DataFrame({col: values[inverse] for col, values in features.items()}, index=df.index)
+    return result[velocity_columns(windows, distinct_cols)]
+
+
+class VelocityState:
+    """
+    새 거래가 들어올 때 과거 전체를 다시 계산하지 않고 속도 특성을 갱신하는 상태
+    - 카드별로 가장 긴 시간 창 안의 최근 거래만 보관
+    - update: 보관 중인 거래 + 새 거래로만 특성을 계산하고 보관 거래를 갱신
+    - 각 카드의 새 거래는 보관 중인 거래보다 늦거나 같은 시각이어야 전체 재계산과 같은 결과
+    """
+
+    def __init__(self, windows=VELOCITY_WINDOWS, key_cols=VELOCITY_KEY_COLS, time_col='date', amount_col='amount',
+                 distinct_cols=VELOCITY_DISTINCT_COLS, history=None):
+        """
+        Args:
+            windows (dict): 시간 창 이름 → 길이 (초)
+            key_cols (tuple): 카드 구분 컬럼
+            time_col (str): 거래 시각 컬럼
+            amount_col (str): 금액 컬럼
+            distinct_cols (dict): 고유값 수를 셀 특성 이름 → 컬럼 이름
+            history (pd.DataFrame, optional): 이전에 저장한 보관 거래
+        """
+        self.windows = dict(windows)
+        self.key_cols = tuple(key_cols)
+        self.time_col = time_col
+        self.amount_col = amount_col
+        self.distinct_cols = dict(distinct_cols)
+        self.columns = [*self.key_cols, time_col, amount_col, *self.distinct_cols.values()]
+        if history is None:
+            history = pd.DataFrame({col: pd.Series(dtype='float64') for col in self.columns})
+            history[time_col] = pd.Series(dtype='datetime64[ns]')
+        self.history = history[self.columns].reset_index(drop=True)
+
+    def __len__(self):
+        return len(self.history)
+
+    def update(self, df):
+        """
+        새 거래의 속도 특성을 계산하고 상태 갱신
+
+        Args:
+            df (pd.DataFrame): 새 거래 (self.columns 컬럼)
+
+        Returns:
+            pd.DataFrame: 새 거래의 속도 특성 (df와 같은 index)
+        """
+        new_rows = df[self.columns]
+        if len(self.history):
+            combined = pd.concat([self.history, new_rows], ignore_index=True)
+        else:
+            combined = new_rows.reset_index(drop=True)
+        combined[self.time_col] = pd.to_datetime(combined[self.time_col])
+        features = compute_velocity_features(combined, self.windows, self.key_cols, self.time_col,
+                                             self.amount_col, self.distinct_cols)
+        result = features.iloc[len(self.history):].set_axis(df.index)
+
+        # 카드별 마지막 거래 시각 기준으로 가장 긴 창 안의 거래만 보관
+        seconds = combined[self.time_col].to_numpy('datetime64[s]').astype(np.int64)
+        last_seconds = pd.Series(seconds).groupby([combined[col] for col in self.key_cols]).transform('max')
+        keep = seconds > last_seconds.to_numpy() - max(self.windows.values())
+        self.history = combined[keep].reset_index(drop=True)
+        return result
+
+    def save(self, path):
+        """
+        보관 거래 저장
+
+        Args:
+            path (str): 저장 경로 (storage 형식)
+        """
+        save_frame(self.history, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """
+        저장한 보관 거래로 상태 복원
+
+        Args:
+            path (str): 저장 경로
+            **kwargs: VelocityState 생성 인자 (windows 등, 저장할 때와 같아야 함)
+
+        Returns:
+            VelocityState: 복원된 상태
+        """
+        return cls(history=load_frame(path), **kwargs)
@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+US_STATES = [
+    'AA','AK','AL','AR','AZ','CA','CO','CT','DC','DE','FL','GA','HI','IA',
+    'ID','IL','IN','KS','KY','LA','MA','MD','ME','MI','MN','MO','MS','MT',
+    'NC','ND','NE','NH','NJ','NM','NV','NY','OH','OK','OR','PA','RI','SC',
+    'SD','TN','TX','UT','VA','VT','WA','WI','WV','WY'
+]
+
+# 해외 국가명 → 가상 ZIP 코드 (국가 코드 3자리 + '00')
+COUNTRY_ZIP_MAP = {
+    'MEXICO': 'MEX00', 'VATICAN CITY': 'VAT00', 'DOMINICAN REPUBLIC': 'DOM00',
+    'CANADA': 'CAN00', 'ALBANIA': 'ALB00', 'ALGERIA': 'ALG00', 'ANDORRA': 'AND00',
+    'ARGENTINA': 'ARG00', 'ARUBA': 'ARU00', 'AUSTRALIA': 'AUS00',
+    'AUSTRIA': 'AUT00', 'AZERBAIJAN': 'AZE00', 'BAHRAIN': 'BAH00',
+    'BANGLADESH': 'BGD00', 'BARBADOS': 'BRB00', 'BELGIUM': 'BEL00',
+    'BELIZE': 'BLZ00', 'BENIN': 'BEN00', 'BOSNIA AND HERZEGOVINA': 'BIH00',
+    'BRAZIL': 'BRA00', 'BRUNEI': 'BRN00', 'BURKINA FASO': 'BFA00',
+    'CABO VERDE': 'CPV00', 'CAMEROON': 'CMR00', 'CHILE': 'CHL00',
+    'CHINA': 'CHN00', 'COLOMBIA': 'COL00', 'COSTA RICA': 'CRI00',
+    'COTE D IVOIRE': 'CIV00', 'CROATIA': 'HRV00', 'CYPRUS': 'CYP00',
+    'CZECH REPUBLIC': 'CZE00', 'DENMARK': 'DNK00', 'EAST TIMOR (TIMOR-LESTE)': 'TLS00',
+    'ECUADOR': 'ECU00', 'EGYPT': 'EGY00', 'EQUATORIAL GUINEA': 'GNQ00',
+    'ERITREA': 'ERI00', 'ESTONIA': 'EST00', 'ETHIOPIA': 'ETH00',
+    'FIJI': 'FJI00', 'FINLAND': 'FIN00', 'FRANCE': 'FRA00',
+    'GABON': 'GAB00', 'GEORGIA': 'GEO00', 'GERMANY': 'DEU00',
+    'GHANA': 'GHA00', 'GREECE': 'GRC00', 'GUATEMALA': 'GTM00',
+    'GUINEA': 'GIN00', 'GUYANA': 'GUY00', 'HAITI': 'HTI00',
+    'HONDURAS': 'HND00', 'HONG KONG': 'HKG00', 'HUNGARY': 'HUN00',
+    'ICELAND': 'ISL00', 'INDIA': 'IND00', 'INDONESIA': 'IDN00',
+    'IRAN': 'IRN00', 'IRAQ': 'IRQ00', 'IRELAND': 'IRL00',
+    'ISRAEL': 'ISR00', 'ITALY': 'ITA00', 'JAMAICA': 'JAM00',
+    'JAPAN': 'JPN00', 'JORDAN': 'JOR00', 'KENYA': 'KEN00',
+    'KOSOVO': 'KOS00', 'KYRGYZSTAN': 'KGZ00', 'LATVIA': 'LVA00',
+    'LEBANON': 'LBN00', 'LIBERIA': 'LBR00', 'LITHUANIA': 'LTU00',
+    'LUXEMBOURG': 'LUX00', 'MACEDONIA': 'MKD00', 'MALAYSIA': 'MYS00',
+    'MALDIVES': 'MDV00', 'MALI': 'MLI00', 'MALTA': 'MLT00',
+    'MARSHALL ISLANDS': 'MHL00', 'MICRONESIA': 'FSM00', 'MOLDOVA': 'MDA00',
+    'MONACO': 'MCO00', 'MONGOLIA': 'MNG00', 'MONTENEGRO': 'MNE00',
+    'MOROCCO': 'MAR00', 'MOZAMBIQUE': 'MOZ00', 'MYANMAR (BURMA)': 'MMR00',
+    'NAURU': 'NRU00', 'NETHERLANDS': 'NLD00', 'NEW ZEALAND': 'NZL00',
+    'NIGER': 'NER00', 'NIGERIA': 'NGA00', 'NORWAY': 'NOR00',
+    'OMAN': 'OMN00', 'PAKISTAN': 'PAK00', 'PANAMA': 'PAN00',
+    'PAPUA NEW GUINEA': 'PNG00', 'PERU': 'PER00', 'PHILIPPINES': 'PHL00',
+    'POLAND': 'POL00', 'PORTUGAL': 'PRT00', 'QATAR': 'QAT00',
+    'REPUBLIC OF THE CONGO': 'COG00', 'ROMANIA': 'ROU00', 'RUSSIA': 'RUS00',
+    'SAINT VINCENT AND THE GRENADINES': 'VCT00', 'SAMOA': 'WSM00',
+    'SAUDI ARABIA': 'SAU00', 'SENEGAL': 'SEN00', 'SERBIA': 'SRB00',
+    'SEYCHELLES': 'SYC00', 'SIERRA LEONE': 'SLE00', 'SINGAPORE': 'SGP00',
+    'SLOVAKIA': 'SVK00', 'SLOVENIA': 'SVN00', 'SOLOMON ISLANDS': 'SLB00',
+    'SOUTH AFRICA': 'ZAF00', 'SOUTH KOREA': 'KOR00', 'SOUTH SUDAN': 'SSD00',
+    'SPAIN': 'ESP00', 'SRI LANKA': 'LKA00', 'SUDAN': 'SDN00',
+    'SURINAME': 'SUR00', 'SWAZILAND': 'SWZ00', 'SWEDEN': 'SWE00',
+    'SWITZERLAND': 'CHE00', 'TAIWAN': 'TWN00', 'THAILAND': 'THA00',
+    'THE BAHAMAS': 'BHS00', 'TONGA': 'TON00', 'TRINIDAD AND TOBAGO': 'TTO00',
+    'TUNISIA': 'TUN00', 'TURKEY': 'TUR00', 'TUVALU': 'TUV00',
+    'UKRAINE': 'UKR00', 'UNITED ARAB EMIRATES': 'ARE00', 'UNITED KINGDOM': 'GBR00',
+    'URUGUAY': 'URY00', 'UZBEKISTAN': 'UZB00', 'VANUATU': 'VUT00',
+    'VENEZUELA': 'VEN00', 'VIETNAM': 'VNM00', 'YEMEN': 'YEM00',
+    'ZAMBIA': 'ZMB00', 'ZIMBABWE': 'ZWE00'
+}
+OTHER_COUNTRY_ZIP = 'OTH00'
+ONLINE_ZIP = '00000'
+
+
+def map_foreign_zip(merchant_state):
+    """
+    해외 결제의 merchant_state(국가명)를 가상 ZIP 코드로 일괄 변환
+    매핑에 없는 국가는 'OTH00'으로 처리
+
+    Args:
+        merchant_state (pd.Series): 국가명이 들어 있는 merchant_state 컬럼
+
+    Returns:
+        pd.Series: 가상 ZIP 코드 (입력과 같은 index)
+    """
+    state_upper = merchant_state.astype(str).str.upper().str.strip()
+    return state_upper.map(COUNTRY_ZIP_MAP).fillna(OTHER_COUNTRY_ZIP)
+
+
+def _format_zip_text(text):
+    """공백을 제거한 zip 문자열 하나 표준화 (기존 행 단위 처리와 같은 float() → int() 규칙)"""
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    # inf / nan은 정수로 바꿀 수 없으므로 문자열 그대로 유지
+    return str(int(number)).zfill(5) if math.isfinite(number) else text
+
+
+def format_zip_series(zip_col):
+    """
+    zip 컬럼 전체를 5자리 문자열로 표준화
+    - 숫자로 해석되는 값('58523.0' 등)은 정수로 바꾼 뒤 앞을 0으로 채움
+    - 숫자가 아닌 값('MEX00' 등)은 앞뒤 공백만 제거
+    - 결측값은 pd.NA 유지
+
+    고유값 단위로 한 번만 변환한 뒤 코드로 펼치므로 행 수가 많아도 고유 zip 수만큼만 연산함
+    숫자 해석은 파이썬 float()/int()를 그대로 쓰므로 기존 행 단위 처리와 결과가 같음
+    ('1_000' → '01000', '1e20' → '100000000000000000000' 등 int64 범위 밖 값 포함)
+
+    Args:
+        zip_col (pd.Series): 원본 zip 컬럼
+
+    Returns:
+        pd.Series: 표준화된 zip 컬럼 (object dtype)
+    """
+    codes, uniques = pd.factorize(zip_col, use_na_sentinel=True)
+    formatted = np.array([_format_zip_text(str(value).strip()) for value in uniques] + [pd.NA], dtype=object)
+    # 결측값(-1)은 마지막 칸의 pd.NA로 조회
+    return pd.Series(formatted[codes], index=zip_col.index, dtype=object, name=zip_col.name)
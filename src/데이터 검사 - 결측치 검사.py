@@ -1,17 +1,28 @@
+import os
 import pandas as pd
 
-def analyze_csv_missing_values(file_path):
+from common.data_profile import profile_csv, save_report
+
+### 배치 바이트 수 / 병렬로 읽을 바이트 구간(프로세스) 수
+BLOCK_SIZE = 32 << 20
+N_WORKERS = os.cpu_count() or 1
+
+def analyze_csv_missing_values(file_path, report_path=None, block_size=BLOCK_SIZE, n_workers=N_WORKERS):
     """
-    CSV 파일을 읽어 빈 값(NaN)을 분석하고 결과 출력
+    CSV 파일을 배치 단위로 읽어 빈 값(NaN)을 분석하고 결과 출력 (파일 전체를 메모리에 올리지 않음)
+    결측 외에 컬럼별 고유값 추정, 최솟값/최댓값, 빈도 상위 값도 함께 JSON 보고서로 저장
 
     Args:
         file_path (str): 분석할 CSV 파일의 경로
+        report_path (str, optional): JSON 보고서 저장 경로 (None이면 저장하지 않음)
+        block_size (int): 배치 바이트 수
+        n_workers (int): 병렬로 읽을 바이트 구간 수
 
     Returns:
-        None
+        dict: 데이터 품질 보고서 (읽지 못하면 None)
     """
     try:
-        df = pd.read_csv(file_path)
+        report = profile_csv(file_path, block_size=block_size, n_workers=n_workers)
     except FileNotFoundError:
         print(f"오류: '{file_path}' 파일을 찾을 수 없습니다. 파일 경로를 확인해 주세요.")
         return
@@ -22,16 +33,14 @@ def analyze_csv_missing_values(file_path):
         print(f"CSV 파일을 읽는 중 오류가 발생했습니다: {e}")
         return
 
-    print(f"--- '{file_path}' 파일 빈 값 분석 결과 ---")
+    columns = report['columns']
+    print(f"--- '{file_path}' 파일 빈 값 분석 결과 ({report['rows']:,}행, {report['elapsed_sec']:.2f}초) ---")
     print("\n## 1. 각 열의 빈 값 개수:")
-    missing_values_per_column = df.isnull().sum()
+    missing_values_per_column = pd.Series({col: stats['null_count'] for col, stats in columns.items()})
     print(missing_values_per_column[missing_values_per_column > 0])
 
     print("\n## 2. 전체 빈 값이 있는 열:")
-    columns_with_all_missing = []
-    for col in df.columns:
-        if df[col].isnull().all():
-            columns_with_all_missing.append(col)
+    columns_with_all_missing = [col for col, stats in columns.items() if stats['all_null']]
 
     if columns_with_all_missing:
         print(f"  - 전체 빈 값인 열: {', '.join(columns_with_all_missing)}")
@@ -39,10 +48,25 @@ def analyze_csv_missing_values(file_path):
         print("  - 전체 빈 값인 열이 없습니다.")
 
     print("\n## 3. 전체 빈 값 개수:")
-    total_missing_values = df.isnull().sum().sum()
+    total_missing_values = missing_values_per_column.sum()
     print(f"  - 파일 전체의 빈 값 개수: {total_missing_values}개")
 
+    print("\n## 4. 열별 고유값 추정 / 최솟값 / 최댓값:")
+    summary = pd.DataFrame({
+        'distinct_estimate': {col: stats['distinct_estimate'] for col, stats in columns.items()},
+        'min': {col: stats['min'] for col, stats in columns.items()},
+        'max': {col: stats['max'] for col, stats in columns.items()},
+        'top_value': {col: stats['top_values'][0][0] if stats['top_values'] else None
+                      for col, stats in columns.items()},
+    })
+    print(summary.to_string())
+
+    if report_path is not None:
+        save_report(report, report_path)
+        print(f"\n보고서 저장 완료: {report_path}")
+    return report
+
 if __name__ == "__main__":
     csv_file_path = '../raw/transactions_data.csv'
 
-    analyze_csv_missing_values(csv_file_path)
\ No newline at end of file
+    analyze_csv_missing_values(csv_file_path, '../raw/transactions_data_profile.json')
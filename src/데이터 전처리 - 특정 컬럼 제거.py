@@ -1,47 +1,74 @@
-import pandas as pd
+import os
+
+from common.projection import read_header, project_csv, project_csv_files
+
+### 여러 파일을 처리할 때 병렬 프로세스 수
+N_WORKERS = os.cpu_count() or 1
 
 def delete_columns(input_file, output_file, columns_to_delete):
     """
     CSV 파일에서 지정된 컬럼들을 삭제
+    파일 전체를 데이터프레임으로 읽지 않고 블록 단위로 남길 필드의 원래 문자열만 복사 (common.projection)
     
     Args:
         input_file (str): 입력 CSV 파일 경로
         output_file (str): 출력 CSV 파일 경로
         columns_to_delete (str or list): 삭제할 컬럼명 (문자열) 또는 컬럼명 리스트
+
+    Returns:
+        dict: 처리 결과 (kept, dropped, rows, bytes_in, bytes_out, elapsed_sec 등, 오류 시 None)
     """
     try:
-        # CSV 파일 읽기
-        df = pd.read_csv(input_file)
+        # 헤더만 읽어 컬럼 확인
+        columns, _, _ = read_header(input_file)
         
         # 문자열로 들어온 경우 리스트로 변환
         if isinstance(columns_to_delete, str):
             columns_to_delete = [columns_to_delete]
         
         # 존재하는 컬럼만 필터링
-        existing_columns = [col for col in columns_to_delete if col in df.columns]
-        non_existing_columns = [col for col in columns_to_delete if col not in df.columns]
+        existing_columns = [col for col in columns_to_delete if col in columns]
+        non_existing_columns = [col for col in columns_to_delete if col not in columns]
         
         if non_existing_columns:
             print(f"경고: 다음 컬럼들이 파일에 존재하지 않습니다: {non_existing_columns}")
         
-        # 컬럼 삭제
+        # 컬럼 삭제 (남길 컬럼만 새 파일로 복사)
+        stats = project_csv(input_file, output_file, drop_columns=existing_columns)
         if existing_columns:
-            df = df.drop(columns=existing_columns)
             print(f"삭제된 컬럼: {existing_columns}")
         else:
             print("삭제할 컬럼이 없습니다.")
         
-        # 수정된 데이터를 새 파일로 저장
-        df.to_csv(output_file, index=False)
-        print(f"결과가 {output_file}에 저장되었습니다.")
+        print(f"결과가 {output_file}에 저장되었습니다. ({stats['rows']:,}행, {stats['elapsed_sec']:.2f}초)")
         
-        return df
+        return stats
         
     except Exception as e:
         print(f"오류 발생: {e}")
         return None
 
 
+def delete_columns_files(jobs, columns_to_delete, n_workers=N_WORKERS):
+    """
+    여러 CSV 파일에서 같은 컬럼들을 파일별 프로세스로 병렬 삭제
+
+    Args:
+        jobs (list): (입력 CSV 경로, 출력 CSV 경로) 목록
+        columns_to_delete (str or list): 삭제할 컬럼명 (문자열) 또는 컬럼명 리스트
+        n_workers (int): 병렬 프로세스 수
+
+    Returns:
+        list: 파일별 처리 결과 (jobs 순서)
+    """
+    if isinstance(columns_to_delete, str):
+        columns_to_delete = [columns_to_delete]
+    results = project_csv_files(jobs, drop_columns=columns_to_delete, n_workers=n_workers)
+    for stats in results:
+        print(f"{stats['input']} → {stats['output']}: 삭제된 컬럼 {stats['dropped']} ({stats['rows']:,}행, {stats['elapsed_sec']:.2f}초)")
+    return results
+
+
 if __name__ == "__main__":
     # 파일 경로 설정
     input_file = "../raw/transaction_joined.csv"
@@ -52,3 +79,7 @@ if __name__ == "__main__":
     
     # 여러 컬럼 삭제
     delete_columns(input_file, output_file, ["client_id_card", "card_on_dark_web"])
+
+    # 여러 파일에서 같은 컬럼 삭제 (파일별 병렬)
+    #delete_columns_files([(input_file, output_file), ("../raw/다른파일.csv", "../raw/다른파일_select_column.csv")],
+    #                     ["client_id_card", "card_on_dark_web"])
@@ -0,0 +1,132 @@
+import contextlib
+import io
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from common.pipeline import load_script, find_script
+from common.zip_codes import US_STATES, COUNTRY_ZIP_MAP
+
+PREPROCESS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '01 초기 데이터 전처리')
+
+# 파이썬 float()/int() 해석이 필요한 zip (밑줄 구분 숫자, int64 범위 밖 값, 숫자가 아닌 값)
+EDGE_ZIPS = ['1_000', '1e20', ' 0501 ', '12345-6789', 'nan']
+
+
+def make_synthetic_zip_data(n_rows, seed=42):
+    """
+    zip 정규화 비교용 합성 거래 데이터 생성
+    - 미국 결제: '58523.0', '501', ' 10001 ' 등 여러 형태의 zip
+    - 해외 결제: 매핑된 국가명 / 매핑에 없는 국가명, zip 결측
+    - 온라인 결제: merchant_city 'ONLINE', zip 결측
+    - 일부 미국 결제 zip은 EDGE_ZIPS 값으로 교체
+
+    Args:
+        n_rows (int): 생성할 행 수
+        seed (int): 난수 시드
+
+    Returns:
+        pd.DataFrame: zip, merchant_state, merchant_city 컬럼을 가진 데이터프레임
+    """
+    rng = np.random.default_rng(seed)
+    kind = rng.choice(['us', 'foreign', 'online'], size=n_rows, p=[0.85, 0.03, 0.12])
+
+    # 실제 데이터처럼 고유 zip 수는 약 2.5만 개로 제한
+    zip_pool = rng.integers(501, 99950, size=25_000)
+    zip_num = zip_pool[rng.integers(0, len(zip_pool), size=n_rows)]
+    zip_fmt = rng.integers(0, 3, size=n_rows)
+    zip_vals = np.where(zip_fmt == 0, np.char.add(zip_num.astype(str), '.0'),
+                        np.where(zip_fmt == 1, zip_num.astype(str),
+                                 np.char.add(np.char.add(' ', zip_num.astype(str)), ' ')))
+    zip_vals = zip_vals.astype(object)
+    edge_rows = rng.choice(n_rows, size=min(n_rows, 10 * len(EDGE_ZIPS)), replace=False)
+    zip_vals[edge_rows] = np.array(EDGE_ZIPS, dtype=object)[np.arange(len(edge_rows)) % len(EDGE_ZIPS)]
+
+    countries = list(COUNTRY_ZIP_MAP.keys())[:20] + ['Atlantis', ' Italy ']
+    state_vals = np.array(US_STATES, dtype=object)[rng.integers(0, len(US_STATES), size=n_rows)]
+    foreign_states = np.array(countries, dtype=object)[rng.integers(0, len(countries), size=n_rows)]
+    city_vals = np.full(n_rows, 'Springfield', dtype=object)
+
+    is_foreign = kind == 'foreign'
+    is_online = kind == 'online'
+    state_vals[is_foreign] = foreign_states[is_foreign]
+    zip_vals[is_foreign | is_online] = np.nan
+    state_vals[is_online] = np.nan
+    city_vals[is_online] = 'ONLINE'
+
+    return pd.DataFrame({'zip': zip_vals, 'merchant_state': state_vals, 'merchant_city': city_vals})
+
+
+def legacy_zip_normalize(df):
+    """기존 preprocess_and_clean_data의 행 단위(apply) zip 처리"""
+    online_cond = df['merchant_city'] == 'ONLINE'
+    df.loc[online_cond & df['merchant_state'].isna(), 'merchant_state'] = 'ONLINE'
+    df.loc[online_cond & df['zip'].isna(), 'zip'] = '00000'
+
+    intl_cond = (df['merchant_state'].notna()) & \
+                (~df['merchant_state'].isin(US_STATES)) & \
+                (df['merchant_city'] != 'ONLINE')
+    intl_zip_na = intl_cond & df['zip'].isna()
+
+    def assign_foreign_zip(row):
+        if pd.isna(row['zip']) and intl_zip_na[row.name]:
+            state_upper = str(row['merchant_state']).upper().strip()
+            return COUNTRY_ZIP_MAP.get(state_upper, 'OTH00')
+        return row['zip']
+    df['zip'] = df.apply(assign_foreign_zip, axis=1)
+
+    def format_zip(zip_val):
+        if pd.isna(zip_val):
+            return pd.NA
+        str_val = str(zip_val).strip()
+        try:
+            return str(int(float(str_val))).zfill(5)
+        except ValueError:
+            return str_val
+    df['zip'] = df['zip'].apply(format_zip)
+    return df
+
+
+def stage_zip_normalize(clean_module, df):
+    """전처리02 preprocess_and_clean_data 실행 (zip / merchant_state 처리 결과 비교용, 단계 출력은 숨김)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return clean_module.preprocess_and_clean_data(df)
+
+
+def as_values(series):
+    """범주형/object 컬럼을 결측 표기까지 맞춘 object 컬럼으로 변환 (dtype 차이 없이 값만 비교)"""
+    values = series.astype(object)
+    return values.where(values.notna(), None).reset_index(drop=True)
+
+
+def run_benchmark(sizes=(10_000, 100_000, 1_000_000)):
+    """
+    합성 데이터에서 기존 zip 처리와 전처리02 preprocess_and_clean_data의 결과가 같은지 확인하고 수행 시간 비교
+    (전처리02 시간은 dtype 변환 등 단계 전체 시간)
+
+    Args:
+        sizes (tuple): 비교할 행 수 목록
+    """
+    clean_module = load_script(find_script(PREPROCESS_DIR, '데이터 전처리02'))
+    for n_rows in sizes:
+        base_df = make_synthetic_zip_data(n_rows)
+
+        start_time = time.perf_counter()
+        legacy_df = legacy_zip_normalize(base_df.copy())
+        legacy_sec = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        new_df = stage_zip_normalize(clean_module, base_df.copy())
+        new_sec = time.perf_counter() - start_time
+
+        # 결과 동일성 검증 (값, 결측 위치, 단계는 범주형으로 저장하므로 dtype은 비교하지 않음)
+        for col in ['zip', 'merchant_state']:
+            pd.testing.assert_series_equal(as_values(legacy_df[col]), as_values(new_df[col]))
+
+        print(f"{n_rows:>10,}건 | 기존: {legacy_sec:8.3f}초 | 전처리02: {new_sec:8.3f}초 | "
+              f"{legacy_sec / max(new_sec, 1e-9):6.1f}배 | 결과 동일")
+
+
+if __name__ == "__main__":
+    run_benchmark()
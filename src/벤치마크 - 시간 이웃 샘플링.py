@@ -0,0 +1,116 @@
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from common.graph import build_transaction_graph
+from common.graph_store import GraphStore
+from common.temporal_sampler import TemporalNeighborSampler, PrefetchSampler, seeds_from_edges
+
+
+def make_synthetic_transactions(n_rows, n_cards=50_000, n_merchants=20_000, seed=42):
+    """
+    샘플러 비교용 합성 거래 데이터 생성
+    - 카드별 거래 수는 실제 데이터처럼 치우친 분포 (일부 카드에 거래 집중)
+    - 거래 시각은 10년 범위에서 무작위
+
+    Args:
+        n_rows (int): 생성할 거래 수
+        n_cards (int): 카드 수
+        n_merchants (int): 가맹점 수
+        seed (int): 난수 시드
+
+    Returns:
+        pd.DataFrame: build_transaction_graph 입력 컬럼을 가진 거래 데이터
+    """
+    rng = np.random.default_rng(seed)
+    card_id = np.minimum(rng.zipf(1.3, size=n_rows), n_cards) - 1
+    card_id = (card_id * 7919 + rng.integers(0, 50, size=n_rows)) % n_cards
+    merchant_id = rng.integers(0, n_merchants, size=n_rows)
+    start = np.datetime64('2010-01-01T00:00:00', 's').astype(np.int64)
+    seconds = start + rng.integers(0, 10 * 365 * 86400, size=n_rows)
+
+    return pd.DataFrame({
+        'id': np.arange(n_rows),
+        'date': seconds.astype('datetime64[s]'),
+        'client_id': card_id // 3,
+        'card_id': card_id,
+        'amount': rng.gamma(2.0, 30.0, size=n_rows).astype(np.float32),
+        'merchant_id': merchant_id,
+        'zip': (merchant_id % 5_000).astype(str),
+        'merchant_state': 'CA',
+        'merchant_city': 'Springfield',
+        'mcc': merchant_id % 100 + 5000,
+        'fraud': (rng.random(n_rows) < 0.002).astype(np.int8),
+    })
+
+
+def loop_sample_recent(relation, nodes, times, fanout):
+    """시작 노드마다 이진 탐색 후 최근 k개를 고르는 단건 반복 방식 (비교 기준)"""
+    indptr, timestamp = relation.indptr, relation['timestamp']
+    edges = []
+    for node, before in zip(nodes, times):
+        start, end = int(indptr[node]), int(indptr[node + 1])
+        end = start + int(np.searchsorted(timestamp[start:end], before, side='left'))
+        edges.append(np.arange(end - 1, max(end - fanout, start) - 1, -1))
+    return np.concatenate(edges)
+
+
+def run_benchmark(n_rows=2_000_000, batch_size=1024, n_batches=200, fanout=10, workers=(0, 2, 4)):
+    """
+    합성 그래프에서 배치 샘플러의 초당 추출 간선 수 비교
+    - 반복 방식 / 배치 recent / 배치 uniform / 작업 프로세스 수별 프리페치
+
+    Args:
+        n_rows (int): 합성 거래 수
+        batch_size (int): 배치당 시작 거래 수
+        n_batches (int): 측정할 배치 수
+        fanout (int): 시작 노드별 최대 이웃 수
+        workers (tuple): 비교할 작업 프로세스 수 목록 (0은 현재 프로세스에서 실행)
+    """
+    with tempfile.TemporaryDirectory() as graph_dir:
+        start_time = time.perf_counter()
+        build_transaction_graph(make_synthetic_transactions(n_rows)).save(graph_dir)
+        print(f"합성 그래프 생성: 거래 {n_rows:,}건 ({time.perf_counter() - start_time:.1f}초)")
+
+        store = GraphStore(graph_dir)
+        pays = store['card__pays__merchant']
+        rng = np.random.default_rng(0)
+        batches = []
+        for _ in range(n_batches):
+            # 학습 대상 거래를 시작점으로: 해당 카드의 거래 시각 이전 이웃만 추출
+            src, _, times = seeds_from_edges(pays, rng.integers(0, pays.num_edges, size=batch_size))
+            batches.append((src, times))
+
+        def report(label, elapsed, n_edges, n_seeds):
+            print(f"{label:<22} | {n_seeds / elapsed:12,.0f} 시작점/초 | {n_edges / elapsed:14,.0f} 간선/초")
+
+        # 반복 방식은 느리므로 일부 배치만 측정
+        loop_batches = batches[:max(n_batches // 20, 1)]
+        start_time = time.perf_counter()
+        n_edges = sum(len(loop_sample_recent(pays, nodes, times, fanout)) for nodes, times in loop_batches)
+        report('반복 방식 recent', time.perf_counter() - start_time, n_edges, len(loop_batches) * batch_size)
+
+        for strategy in ('recent', 'uniform'):
+            sampler = TemporalNeighborSampler(pays, fanout=fanout, strategy=strategy, random_state=0)
+            # 결과 검증: 모든 간선이 기준 시각 이전, recent는 반복 방식과 같은 간선
+            check = sampler.sample(*batches[0])
+            assert (pays['timestamp'][check['edge']] < batches[0][1][check['seed']]).all()
+            if strategy == 'recent':
+                assert np.array_equal(check['edge'], loop_sample_recent(pays, *batches[0], fanout))
+
+            start_time = time.perf_counter()
+            n_edges = sum(len(sampler.sample(nodes, times)['edge']) for nodes, times in batches)
+            report(f"배치 {strategy}", time.perf_counter() - start_time, n_edges, n_batches * batch_size)
+
+        for num_workers in workers:
+            prefetcher = PrefetchSampler(graph_dir, pays.name, fanout=fanout, strategy='uniform',
+                                         num_workers=num_workers, prefetch=8, random_state=0)
+            start_time = time.perf_counter()
+            n_edges = sum(len(result['edge']) for result in prefetcher.iterate(batches))
+            report(f"프리페치 uniform x{num_workers}", time.perf_counter() - start_time, n_edges,
+                   n_batches * batch_size)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,51 @@
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SRC_DIR)
+from benchmark.synthetic import generate_dataset
+from benchmark.online import check_parity, raw_transactions, measure_latency
+from common.parsing import load_users, load_cards
+from common.geo import GeocodeIndex
+from common.scoring import OnlineFeatureAssembler
+
+### 합성 데이터 규모 (거래 수) / 시드 / 디렉터리 (같은 파라미터면 재사용)
+N_ROWS = 200_000
+SEED = 42
+WORK_DIR = os.path.join(SRC_DIR, 'raw', 'benchmark', 'online')
+
+### 지연 시간 측정: 앞쪽 준비 거래 수 / 카드 상태 캐시 상한 (카드 수보다 작게 하면 삭제 후 재생성 비용 포함)
+WARMUP = 1_000
+MAX_CARDS = 200_000
+
+### 목표: 거래 하나 조립 p99 지연 시간 (마이크로초)
+P99_TARGET_US = 1_000
+
+
+if __name__ == "__main__":
+    manifest = generate_dataset(WORK_DIR, N_ROWS, seed=SEED)
+    files = manifest['files']
+    print(f"합성 데이터: 거래 {manifest['rows']:,}건, 고객 {manifest['users']:,}명, 카드 {manifest['cards']:,}장")
+
+    # 1) 배치 경로와 같은 벡터인지 확인
+    parity = check_parity(files)
+    print(f"\n[일치 검사] 학습 행 {parity['rows']:,}건 / 조립 거래 {parity['transactions']:,}건")
+    print(f"   > 컬럼 순서 일치: {parity['feature_columns_match']}")
+    print(f"   > 모델 입력 불일치 컬럼: {parity['mismatches'] or '없음'} (최대 차이 {parity['max_abs_diff']:.3g})")
+    print(f"   > 위치 특성 불일치 컬럼: {parity['geo_mismatches'] or '없음'} (최대 차이 {parity['geo_max_abs_diff']:.3g})")
+
+    # 2) 거래 하나씩 조립하는 지연 시간 (시작 시 기준 테이블/어휘를 한 번만 준비)
+    assembler = OnlineFeatureAssembler(load_users(files['users_data.csv']), load_cards(files['cards_data.csv']),
+                                       parity['registry'],
+                                       geocode=GeocodeIndex.from_file(files['location_data_with_geo_final.csv']),
+                                       max_cards=MAX_CARDS)
+    latency = measure_latency(assembler, raw_transactions(files['transactions_data.csv']), WARMUP)
+    print(f"\n[지연 시간] {latency['count']:,}건, 초당 {latency['per_sec']:,}건")
+    print(f"   > 평균 {latency['mean_us']}us, p50 {latency['p50_us']}us, p90 {latency['p90_us']}us, "
+          f"p99 {latency['p99_us']}us, p99.9 {latency['p999_us']}us, 최대 {latency['max_us']}us")
+    print(f"   > 카드 상태 캐시: {latency['cache']}")
+
+    if not parity['passed'] or latency['p99_us'] > P99_TARGET_US:
+        print("\n실패: 배치 경로와 다르거나 p99 목표를 넘었습니다.")
+        sys.exit(1)
+    print("\n통과")
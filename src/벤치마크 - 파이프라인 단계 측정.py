@@ -0,0 +1,35 @@
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SRC_DIR)
+from benchmark.harness import run_benchmark, save_result, load_result, compare_results, print_comparison
+
+### 합성 데이터 규모 (거래 수, 1e5 ~ 1e8) / 사기 거래 비율 / 시드
+SIZES = (100_000, 1_000_000)
+FRAUD_RATE = 0.0015
+SEED = 42
+
+### 합성 데이터 디렉터리 (같은 파라미터면 재사용) / 결과 JSON 디렉터리 (커밋 해시별 파일)
+WORK_DIR = os.path.join(SRC_DIR, 'raw', 'benchmark')
+RESULT_DIR = os.path.join(WORK_DIR, 'results')
+
+### 비교 기준 결과 JSON (None이면 비교하지 않음, 예: os.path.join(RESULT_DIR, 'a22653a.json'))
+BASELINE_PATH = None
+
+### 성능 저하 판정 기준: 허용 증가 비율 / 최소 차이
+TIME_TOLERANCE, MEMORY_TOLERANCE = 0.2, 0.2
+MIN_SECONDS, MIN_MB = 0.5, 50.0
+
+
+if __name__ == "__main__":
+    result = run_benchmark(SIZES, WORK_DIR, seed=SEED, fraud_rate=FRAUD_RATE)
+    result_path = os.path.join(RESULT_DIR, f"{result['environment']['commit'] or 'local'}.json")
+    save_result(result, result_path)
+    print(f"\n결과 저장: {result_path}")
+
+    if BASELINE_PATH is not None:
+        baseline = load_result(BASELINE_PATH)
+        comparison = compare_results(baseline, result, TIME_TOLERANCE, MEMORY_TOLERANCE, MIN_SECONDS, MIN_MB)
+        if print_comparison(comparison, baseline, result):
+            sys.exit(1)
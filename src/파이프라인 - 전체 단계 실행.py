@@ -0,0 +1,259 @@
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(SRC_DIR)
+from common.pipeline import Pipeline, Stage, load_script, find_script, print_report
+from common.cache import StageCache
+from common.parsing import load_users, load_cards
+from common.validity import ValidityIndex
+from common.geocode_cache import GeocodeCache
+from common.encoding import EncodingRegistry
+from common.importance import CATEGORICAL_COLS
+from common.tracing import tracing, print_summary
+
+PREPROCESS_DIR = os.path.join(SRC_DIR, '01 초기 데이터 전처리')
+AUGMENT_DIR = os.path.join(SRC_DIR, '02 거래 데이터 증강 및 좌표 변환 파일 생성')
+
+### 원본/결과 파일 경로 (단계 스크립트의 ../raw 와 같은 위치)
+RAW_DIR = os.path.join(SRC_DIR, 'raw')
+TRANSACTIONS_PATH = os.path.join(RAW_DIR, 'transactions_data.csv')
+FRAUD_LABELS_PATH = os.path.join(RAW_DIR, 'sorted_fraud.csv')
+MCC_CODES_PATH = os.path.join(RAW_DIR, 'mcc_codes.json')
+USERS_PATH = os.path.join(RAW_DIR, 'users_data.csv')
+CARDS_PATH = os.path.join(RAW_DIR, 'cards_data.csv')
+LOCATION_REF_PATH = os.path.join(RAW_DIR, 'location_data_with_geo_final.csv')
+
+### 파이프라인 실행 기록 (노드 지문, 입력 파일 해시, 실행 시간/최대 RSS)
+STATE_PATH = os.path.join(RAW_DIR, 'pipeline_state.json')
+
+### 단계 출력 캐시 (지문이 같은 출력은 다시 계산하지 않음, 상한을 넘으면 오래 쓰지 않은 항목부터 삭제)
+CACHE_DIR = os.path.join(RAW_DIR, '.stage_cache')
+CACHE_MAX_BYTES = 20 * 2 ** 30
+CACHE_MAX_ENTRIES = 64
+
+### 좌표 테이블에 없는 위치 조합의 대체 좌표 캐시
+GEOCODE_CACHE_DIR = os.path.join(RAW_DIR, '.geocode_cache')
+
+### 범주형 어휘 (중요도 계산/그래프 노드가 같은 정수 코드를 쓰도록 공유)
+ENCODING_REGISTRY_PATH = os.path.join(RAW_DIR, 'categorical_vocab.parquet')
+
+### 구간 측정 (노드 + 노드 안의 하위 단계): 끄면 span()은 비용이 거의 없는 no-op
+### 트레이스는 chrome://tracing, Perfetto(ui.perfetto.dev), speedscope에서 flame chart로 확인
+TRACE_ENABLED = False
+TRACE_PATH = os.path.join(RAW_DIR, 'pipeline_trace.json')
+TRACE_LOG_PATH = os.path.join(RAW_DIR, 'pipeline_trace.jsonl')   # 구간별 JSON 로그 (이어 쓰기)
+### 구간 이름 → 'cprofile'(.prof, snakeviz/pstats) 또는 'sample'(.folded, flamegraph/speedscope), 결과는 PROFILE_DIR에 저장
+PROFILE_SPANS = {}   # 예: {'augment': 'sample', 'KNN 검색': 'cprofile'}
+PROFILE_DIR = os.path.join(RAW_DIR, 'profiles')
+
+### 증강 파라미터 (바뀌면 augment 노드만 다시 실행)
+AUGMENT_PARAMS = {
+    'window_size': 5,
+    'stride': 1,
+    'amount_noise_rate': 0.1,
+    'date_noise_min': -30,
+    'date_noise_max': 30,
+    'random_state': 42,
+}
+
+### 디스크에 남길 checkpoint (None이면 메모리로만 전달하고 저장하지 않음, 저장하지 않은 노드는 캐시에 있을 때만 건너뜀)
+CHECKPOINTS = {
+    'label': None,
+    'clean': os.path.join(RAW_DIR, 'transactions_fraud_label_preprocess.parquet'),
+    'join': None,
+    'features': os.path.join(RAW_DIR, 'transaction_joined_balance_feature_preprocess.parquet'),
+    'importance': os.path.join(RAW_DIR, 'feature_importance_summary.csv'),
+    'xgb_importance': os.path.join(RAW_DIR, 'shap_feature_importance.csv'),
+    'rf_importance': os.path.join(RAW_DIR, 'random_forest_feature_importance.csv'),
+    'augment': os.path.join(RAW_DIR, 'augmented_for_train.parquet'),
+    'geo': os.path.join(RAW_DIR, 'transactions_geo_features.parquet'),
+}
+
+
+# 노드별 단계 스크립트
+SCRIPTS = {
+    'label': find_script(PREPROCESS_DIR, '데이터 전처리01'),
+    'clean': find_script(PREPROCESS_DIR, '데이터 전처리02'),
+    'join': find_script(PREPROCESS_DIR, '데이터 전처리03'),
+    'features': find_script(PREPROCESS_DIR, '데이터 전처리04'),
+    'vocab': find_script(PREPROCESS_DIR, '데이터 전처리05 - 중요 특성 선택 병렬'),
+    'importance': find_script(PREPROCESS_DIR, '데이터 전처리05 - 중요 특성 선택 병렬'),
+    'xgb_importance': find_script(PREPROCESS_DIR, '데이터 전처리05 - 중요 특성 선택 병렬'),
+    'rf_importance': find_script(PREPROCESS_DIR, '데이터 전처리05 - 중요 특성 선택 병렬'),
+    'augment': find_script(AUGMENT_DIR, '데이터 증강'),
+    'geo': find_script(AUGMENT_DIR, '좌표 특성'),
+}
+
+
+def code_files(name):
+    """코드 버전 계산 대상: 노드의 단계 스크립트 + 공통 모듈"""
+    common_dir = os.path.join(SRC_DIR, 'common')
+    common_files = [os.path.join(common_dir, f) for f in sorted(os.listdir(common_dir)) if f.endswith('.py')]
+    return (SCRIPTS[name], *common_files)
+
+
+def label_stage(transactions_file, fraud_labels_file, mcc_codes_file):
+    module = load_script(SCRIPTS['label'])
+    return module.prepare_transaction_data(transactions_file, fraud_labels_file, mcc_codes_file, None)
+
+
+def clean_stage(df):
+    module = load_script(SCRIPTS['clean'])
+    return module.preprocess_and_clean_data(df)
+
+
+def join_stage(df, users_file, cards_file):
+    module = load_script(SCRIPTS['join'])
+    return module.join_and_balance(df, load_users(users_file), load_cards(cards_file))
+
+
+def features_stage(df):
+    module = load_script(SCRIPTS['features'])
+    return module.build_extra_features(df)
+
+
+def vocab_stage(df, registry_file):
+    # 저장된 어휘 + 이번 데이터의 새 값 (코드는 이어 붙이기만 하므로 결과는 어휘 파일 내용에 따라 달라짐)
+    registry = EncodingRegistry.load(registry_file)
+    registry.update(df, CATEGORICAL_COLS)
+    return registry.to_frame()
+
+
+def importance_stage(df, vocab):
+    # XGBoost / 랜덤포레스트를 한 번의 인코딩으로 함께 학습 (xgboost는 이 노드를 실행할 때만 필요)
+    module = load_script(SCRIPTS['importance'])
+    return module.compute_all_importance(df, registry=EncodingRegistry.from_frame(vocab))
+
+
+def save_vocab(vocab, registry_file=ENCODING_REGISTRY_PATH):
+    """
+    vocab 노드 출력(실행/캐시 모두)을 어휘 파일에 반영 (파이프라인 실행 후 매번 호출, 캐시하지 않음)
+
+    Args:
+        vocab (pd.DataFrame): vocab 노드 출력 (EncodingRegistry.to_frame 형식)
+        registry_file (str): 어휘 파일 경로
+    """
+    if not EncodingRegistry.load(registry_file).to_frame().equals(vocab):
+        EncodingRegistry.from_frame(vocab).save(registry_file)
+        print(f"범주형 어휘 저장: {registry_file}")
+
+
+def xgb_importance_stage(combined):
+    module = load_script(SCRIPTS['xgb_importance'])
+    return module.select_importance(combined, 'xgb_shap')
+
+
+def rf_importance_stage(combined):
+    module = load_script(SCRIPTS['rf_importance'])
+    return module.select_importance(combined, 'random_forest')
+
+
+def augment_stage(df, location_file, mcc_codes_file, **augment_params):
+    module = load_script(SCRIPTS['augment'])
+    df = module.normalize_columns(df)
+    return module.augment_for_train(df, ValidityIndex.from_reference(location_file, mcc_codes_file),
+                                    **augment_params)
+
+
+def geo_stage(df, location_file, users_file):
+    module = load_script(SCRIPTS['geo'])
+    geocode = GeocodeCache.from_file(location_file, GEOCODE_CACHE_DIR)
+    return module.geo_features_frame(df, geocode, load_users(users_file))
+
+
+def build_pipeline(state_file=STATE_PATH, cache_dir=CACHE_DIR):
+    """
+    전처리01 → 02 → 03 → 04 → 범주형 어휘 → 05(XGBoost/랜덤포레스트 통합 실행 → 모델별 결과), 02 → 증강, 02 → 위치 특성 순서의 DAG 구성
+
+    Args:
+        state_file (str): 파이프라인 실행 기록 경로
+        cache_dir (str, optional): 단계 출력 캐시 디렉터리 (None이면 캐시 사용 안 함)
+
+    Returns:
+        Pipeline: 구성된 파이프라인
+    """
+    cache = None
+    if cache_dir is not None:
+        cache = StageCache(cache_dir, max_bytes=CACHE_MAX_BYTES, max_entries=CACHE_MAX_ENTRIES)
+    pipeline = Pipeline(state_file, cache=cache)
+
+    # 어휘 파일은 vocab 노드 지문에 들어가므로 없으면 빈 어휘로 생성
+    if not os.path.exists(ENCODING_REGISTRY_PATH):
+        EncodingRegistry().save(ENCODING_REGISTRY_PATH)
+
+    pipeline.add(Stage(
+        'label', label_stage,
+        files=(TRANSACTIONS_PATH, FRAUD_LABELS_PATH, MCC_CODES_PATH),
+        params={'transactions_file': TRANSACTIONS_PATH, 'fraud_labels_file': FRAUD_LABELS_PATH,
+                'mcc_codes_file': MCC_CODES_PATH},
+        checkpoint=CHECKPOINTS['label'], code_files=code_files('label'),
+    ))
+    pipeline.add(Stage(
+        'clean', clean_stage, inputs=('label',),
+        checkpoint=CHECKPOINTS['clean'], code_files=code_files('clean'),
+    ))
+    pipeline.add(Stage(
+        'join', join_stage, inputs=('clean',),
+        files=(USERS_PATH, CARDS_PATH),
+        params={'users_file': USERS_PATH, 'cards_file': CARDS_PATH},
+        checkpoint=CHECKPOINTS['join'], code_files=code_files('join'),
+    ))
+    pipeline.add(Stage(
+        'features', features_stage, inputs=('join',),
+        checkpoint=CHECKPOINTS['features'], code_files=code_files('features'),
+    ))
+    pipeline.add(Stage(
+        'vocab', vocab_stage, inputs=('features',),
+        files=(ENCODING_REGISTRY_PATH,),
+        params={'registry_file': ENCODING_REGISTRY_PATH},
+        code_files=code_files('vocab'),
+    ))
+    pipeline.add(Stage(
+        'importance', importance_stage, inputs=('features', 'vocab'),
+        checkpoint=CHECKPOINTS['importance'], code_files=code_files('importance'),
+    ))
+    pipeline.add(Stage(
+        'xgb_importance', xgb_importance_stage, inputs=('importance',),
+        checkpoint=CHECKPOINTS['xgb_importance'], code_files=code_files('xgb_importance'),
+    ))
+    pipeline.add(Stage(
+        'rf_importance', rf_importance_stage, inputs=('importance',),
+        checkpoint=CHECKPOINTS['rf_importance'], code_files=code_files('rf_importance'),
+    ))
+    pipeline.add(Stage(
+        'augment', augment_stage, inputs=('clean',),
+        files=(LOCATION_REF_PATH, MCC_CODES_PATH),
+        params={'location_file': LOCATION_REF_PATH, 'mcc_codes_file': MCC_CODES_PATH, **AUGMENT_PARAMS},
+        checkpoint=CHECKPOINTS['augment'], code_files=code_files('augment'),
+    ))
+    pipeline.add(Stage(
+        'geo', geo_stage, inputs=('clean',),
+        files=(LOCATION_REF_PATH, USERS_PATH),
+        params={'location_file': LOCATION_REF_PATH, 'users_file': USERS_PATH},
+        checkpoint=CHECKPOINTS['geo'], code_files=code_files('geo'),
+    ))
+    return pipeline
+
+
+if __name__ == "__main__":
+    # 결과가 필요한 노드 (None이면 다른 노드의 입력으로 쓰이지 않는 최종 노드 전체, 예: ['rf_importance', 'augment'])
+    targets = None
+    force = False   # True면 입력이 바뀌지 않았어도 전부 다시 실행
+
+    pipeline = build_pipeline()
+    # 어휘 파일 갱신은 캐시/checkpoint로 건너뛴 경우에도 해야 하므로 vocab 노드 출력을 항상 받음
+    targets = pipeline.sinks() if targets is None else list(targets)
+    if 'vocab' in pipeline.order(targets) and 'vocab' not in targets:
+        targets.append('vocab')
+    if TRACE_ENABLED:
+        with tracing(TRACE_PATH, log_file=TRACE_LOG_PATH, profile=PROFILE_SPANS, profile_dir=PROFILE_DIR) as tracer:
+            results, report = pipeline.run(targets=targets, force=force)
+        print_report(report)
+        print_summary(tracer)
+        print(f"트레이스 저장: {TRACE_PATH}")
+    else:
+        results, report = pipeline.run(targets=targets, force=force)
+        print_report(report)
+    if 'vocab' in results:
+        save_vocab(results['vocab'])